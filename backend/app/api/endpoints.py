@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
 import json
+import threading
 try:
     from backend.app.services.gemini_service import GeminiService
     from backend.app.services.rag_service import RAGService
@@ -12,6 +14,7 @@ import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
+_service_lock = threading.Lock()
 
 
 def _extract_json_payload(raw_text: str) -> Dict[str, Any]:
@@ -62,11 +65,47 @@ def _toolkit_fallback() -> Dict[str, Any]:
         }
     }
 
-def get_gemini_service():
-    return GeminiService()
-
-def get_rag_service():
-    return RAGService()
+def _shared_service(request: Request, attribute: str, factory):
+    # Services are loaded once in the background by the app lifespan; until
+    # that finishes requests get a 503. Fall back to building them on first
+    # use when the lifespan did not run (e.g. plain TestClient).
+    service = getattr(request.app.state, attribute, None)
+    if service is not None:
+        return service
+
+    readiness = getattr(request.app.state, "readiness", None)
+    if readiness is not None:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Service is {readiness.status}; retry shortly.",
+            headers={"Retry-After": "5"},
+        )
+
+    with _service_lock:
+        service = getattr(request.app.state, attribute, None)
+        if service is None:
+            service = factory()
+            setattr(request.app.state, attribute, service)
+    return service
+
+def get_gemini_service(request: Request) -> GeminiService:
+    return _shared_service(request, "gemini_service", GeminiService)
+
+def get_rag_service(request: Request) -> RAGService:
+    return _shared_service(request, "rag_service", RAGService)
+
+@router.get("/health")
+async def health(request: Request):
+    # Liveness: answers as soon as the server is up, even while models load.
+    readiness = getattr(request.app.state, "readiness", None)
+    return {"status": "ok", "readiness": readiness.status if readiness else "unknown"}
+
+@router.get("/ready")
+async def ready(request: Request):
+    readiness = getattr(request.app.state, "readiness", None)
+    if readiness is None:
+        return {"status": "ready"}
+    return JSONResponse(status_code=200 if readiness.is_ready else 503, content=readiness.snapshot())
 
 class QueryRequest(BaseModel):
     query: str
@@ -94,7 +133,7 @@ async def analyze_crime(
 
     try:
         logger.info("Step 1: Running multilingual retrieval...")
-        documents = rag_service.query_similar_documents(request.query)
+        documents = await rag_service.query_similar_documents_async(request.query)
 
         if not documents:
             logger.warning("No relevant documents found.")
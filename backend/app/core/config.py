@@ -30,6 +30,9 @@ class Settings:
     LOCAL_EMBEDDING_MODEL = os.getenv("LOCAL_EMBEDDING_MODEL", "law-ai/InLegalBERT")
     EMBEDDING_DEVICE = os.getenv("EMBEDDING_DEVICE", "")
     EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+    # Documents are sorted by token length and batched up to this many padded
+    # tokens per forward pass; 0 uses fixed EMBEDDING_BATCH_SIZE batches.
+    EMBEDDING_TOKEN_BUDGET = int(os.getenv("EMBEDDING_TOKEN_BUDGET", "16384"))
     QUERY_EMBEDDING_PREFIX = os.getenv("QUERY_EMBEDDING_PREFIX", "")
     MODEL_CACHE_DIR = os.getenv(
         "MODEL_CACHE_DIR",
@@ -41,22 +44,115 @@ class Settings:
         "yes",
         "on",
     }
+    # "torch" runs SentenceTransformer; "onnx" exports the model (with mean
+    # pooling and normalisation) to ONNX under MODEL_CACHE_DIR and runs it with
+    # ONNX Runtime, optionally int8-quantised. An export whose cosine parity
+    # with torch is below EMBEDDING_ONNX_MIN_PARITY is not used.
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").strip().lower()
+    EMBEDDING_ONNX_QUANTIZE = os.getenv("EMBEDDING_ONNX_QUANTIZE", "false").strip().lower() in {
+        "1",
+        "true",
+        "yes",
+        "on",
+    }
+    EMBEDDING_ONNX_MIN_PARITY = float(os.getenv("EMBEDDING_ONNX_MIN_PARITY", "0.99"))
+    EMBEDDING_ONNX_THREADS = int(os.getenv("EMBEDDING_ONNX_THREADS", "0"))
+    # Path of the embedding server's Unix socket (scripts/embedding_server.py).
+    # When set, API workers send texts to that one process instead of each
+    # loading the model; empty loads the model in process.
+    EMBEDDING_SERVER_SOCKET = os.getenv("EMBEDDING_SERVER_SOCKET", "").strip()
+    EMBEDDING_SERVER_TIMEOUT = float(os.getenv("EMBEDDING_SERVER_TIMEOUT", "30"))
+    # Extra seconds per text allowed for document requests on top of the timeout.
+    EMBEDDING_SERVER_DOCUMENT_TIMEOUT = float(os.getenv("EMBEDDING_SERVER_DOCUMENT_TIMEOUT", "1"))
+    EMBEDDING_SERVER_CONNECT_TIMEOUT = float(os.getenv("EMBEDDING_SERVER_CONNECT_TIMEOUT", "120"))
     EMBEDDING_CACHE_PATH = os.getenv(
         "EMBEDDING_CACHE_PATH",
         os.path.join(VECTOR_STORE_DIR, "embedding_cache.sqlite3"),
     )
+    # Least recently used rows are evicted past either cap (0 = no cap);
+    # EMBEDDING_MEMORY_CACHE_SIZE hot query vectors are also kept in process.
+    EMBEDDING_CACHE_MAX_ROWS = int(os.getenv("EMBEDDING_CACHE_MAX_ROWS", "100000"))
+    EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+    EMBEDDING_MEMORY_CACHE_SIZE = int(os.getenv("EMBEDDING_MEMORY_CACHE_SIZE", "2048"))
+    # Concurrent query embeddings are coalesced into one model call, waiting
+    # at most EMBEDDING_QUERY_BATCH_WAIT_MS (0 disables) for up to
+    # EMBEDDING_QUERY_BATCH_SIZE texts.
+    EMBEDDING_QUERY_BATCH_WAIT_MS = float(os.getenv("EMBEDDING_QUERY_BATCH_WAIT_MS", "2"))
+    EMBEDDING_QUERY_BATCH_SIZE = int(os.getenv("EMBEDDING_QUERY_BATCH_SIZE", "32"))
 
     # Ingestion chunking
     INGEST_CHUNK_SIZE_WORDS = int(os.getenv("INGEST_CHUNK_SIZE_WORDS", "220"))
     INGEST_CHUNK_OVERLAP_WORDS = int(os.getenv("INGEST_CHUNK_OVERLAP_WORDS", "40"))
+    # More than one worker embeds chunks in that many processes, each pinned
+    # to INGEST_EMBEDDING_THREADS intra-op threads (0 = cores / workers).
+    INGEST_EMBEDDING_WORKERS = int(os.getenv("INGEST_EMBEDDING_WORKERS", "1"))
+    INGEST_EMBEDDING_THREADS = int(os.getenv("INGEST_EMBEDDING_THREADS", "0"))
+    INGEST_EMBEDDING_SHARD_SIZE = int(os.getenv("INGEST_EMBEDDING_SHARD_SIZE", "256"))
 
     # Retrieval
     RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "5"))
     # Minimum hybrid relevance score to keep a result.
     # Set to 0.0 to disable the threshold.
     MIN_RELEVANCE_SCORE = float(os.getenv("MIN_RELEVANCE_SCORE", "0.72"))
+    # How vector and BM25 scores are combined: "probabilistic_or", "weighted"
+    # (FUSION_VECTOR_WEIGHT * vector + rest * BM25) or "rrf" (reciprocal rank).
+    FUSION_METHOD = os.getenv("FUSION_METHOD", "probabilistic_or").strip().lower()
+    FUSION_VECTOR_WEIGHT = float(os.getenv("FUSION_VECTOR_WEIGHT", "0.5"))
+    FUSION_RRF_K = int(os.getenv("FUSION_RRF_K", "60"))
+    # In-process LRU of retrieval results; 0 entries disables it, TTL 0 = never expire.
+    RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", "1024"))
+    RETRIEVAL_CACHE_TTL_SECONDS = int(os.getenv("RETRIEVAL_CACHE_TTL_SECONDS", "3600"))
+    # retrieve_async runs the dense and BM25 branches on a shared pool of this
+    # size; a branch slower than its timeout (ms, 0 = wait forever) is dropped.
+    RETRIEVAL_BRANCH_WORKERS = int(os.getenv("RETRIEVAL_BRANCH_WORKERS", "8"))
+    RETRIEVAL_DENSE_TIMEOUT_MS = int(os.getenv("RETRIEVAL_DENSE_TIMEOUT_MS", "2000"))
+    RETRIEVAL_LEXICAL_TIMEOUT_MS = int(os.getenv("RETRIEVAL_LEXICAL_TIMEOUT_MS", "1000"))
+    # Answer "section 303" / "BNS 318(4)" / exact-title queries from the
+    # section index without embedding them.
+    SECTION_LOOKUP_ENABLED = os.getenv("SECTION_LOOKUP_ENABLED", "true").strip().lower() in {
+        "1",
+        "true",
+        "yes",
+        "on",
+    }
+    # Optional cross-encoder pass over the fused top RERANK_TOP_N. If scoring
+    # takes longer than RERANK_BUDGET_MS the fused order is returned as is.
+    RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").strip().lower() in {
+        "1",
+        "true",
+        "yes",
+        "on",
+    }
+    RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+    RERANK_TOP_N = int(os.getenv("RERANK_TOP_N", "20"))
+    RERANK_BUDGET_MS = int(os.getenv("RERANK_BUDGET_MS", "150"))
+    RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "8"))
+    RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "4096"))
+    # Query issued once at startup to warm the model and indexes.
+    RETRIEVAL_WARMUP_QUERY = os.getenv("RETRIEVAL_WARMUP_QUERY", "someone stole my mobile phone")
 
     # ChromaDB
     COLLECTION_NAME = "bharatiya_nyaya_sanhita"
+    # "chroma" queries the HNSW index; "flat" does exact cosine search over an
+    # in-memory embedding matrix (float32 or float16) written at ingestion.
+    # FLAT_INDEX_DTYPE "int8" or "pca" (FLAT_INDEX_PCA_DIM components) keeps
+    # only compressed vectors in memory and rescores the top
+    # k * FLAT_INDEX_RESCORE_FACTOR candidates against the memory-mapped
+    # full-precision matrix.
+    VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").strip().lower()
+    FLAT_INDEX_DTYPE = os.getenv("FLAT_INDEX_DTYPE", "float32").strip().lower()
+    FLAT_INDEX_PCA_DIM = int(os.getenv("FLAT_INDEX_PCA_DIM", "128"))
+    FLAT_INDEX_RESCORE_FACTOR = int(os.getenv("FLAT_INDEX_RESCORE_FACTOR", "4"))
+    FLAT_INDEX_DIR = os.getenv("FLAT_INDEX_DIR", os.path.join(VECTOR_STORE_DIR, "flat_index"))
+    # BM25 snapshot written at ingestion and memory-mapped by the retriever.
+    LEXICAL_INDEX_DIR = os.getenv("LEXICAL_INDEX_DIR", os.path.join(VECTOR_STORE_DIR, "lexical_index"))
+    # Unseen query terms are matched to vocabulary terms up to this edit
+    # distance (1 for words up to 7 letters); 0 turns typo tolerance off.
+    BM25_MAX_EDIT_DISTANCE = int(os.getenv("BM25_MAX_EDIT_DISTANCE", "2"))
+    # plain_language synonyms in a query add their sections' number and title
+    # terms to the BM25 query, each weighted at most QUERY_EXPANSION_WEIGHT
+    # (0 disables), keeping the QUERY_EXPANSION_MAX_TERMS strongest.
+    QUERY_EXPANSION_WEIGHT = float(os.getenv("QUERY_EXPANSION_WEIGHT", "0.5"))
+    QUERY_EXPANSION_MAX_TERMS = int(os.getenv("QUERY_EXPANSION_MAX_TERMS", "8"))
 
 settings = Settings()
@@ -0,0 +1,50 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class Readiness:
+    """Start-up state of the services loaded in the background by the lifespan.
+
+    ``status`` moves from ``"loading"`` to ``"ready"`` or ``"failed"``; the
+    API reports it on ``/ready`` and answers 503 until it is ``"ready"``.
+    """
+
+    LOADING = "loading"
+    READY = "ready"
+    FAILED = "failed"
+
+    def __init__(self):
+        self.status = self.LOADING
+        self.error: Optional[str] = None
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._done = threading.Event()
+
+    @property
+    def is_ready(self) -> bool:
+        return self.status == self.READY
+
+    def mark_ready(self) -> None:
+        self._finish(self.READY)
+
+    def mark_failed(self, error: str) -> None:
+        self.error = error
+        self._finish(self.FAILED)
+
+    def _finish(self, status: str) -> None:
+        self.finished_at = time.time()
+        self.status = status
+        self._done.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until loading finishes; ``True`` if the services are ready."""
+        self._done.wait(timeout)
+        return self.is_ready
+
+    def snapshot(self) -> Dict[str, Any]:
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        snapshot: Dict[str, Any] = {"status": self.status, "elapsed_seconds": round(elapsed, 3)}
+        if self.error:
+            snapshot["error"] = self.error
+        return snapshot
@@ -7,6 +7,8 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'
 import uvicorn
 import os
 import sys
+import threading
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -21,9 +23,15 @@ for import_path in (PROJECT_ROOT, BACKEND_DIR):
 try:
     from backend.app.api import endpoints
     from backend.app.core.config import settings
+    from backend.app.core.readiness import Readiness
+    from backend.app.services.gemini_service import GeminiService
+    from backend.app.services.rag_service import RAGService
 except ModuleNotFoundError:
     from app.api import endpoints
     from app.core.config import settings
+    from app.core.readiness import Readiness
+    from app.services.gemini_service import GeminiService
+    from app.services.rag_service import RAGService
 import logging
 
 # Configure Logging
@@ -32,7 +40,41 @@ logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
 )
 
-app = FastAPI(title=settings.PROJECT_NAME)
+logger = logging.getLogger(__name__)
+
+
+def _load_services(app: FastAPI, readiness: Readiness) -> None:
+    try:
+        logger.info("Initialising shared services...")
+        gemini_service = GeminiService()
+        rag_service = RAGService()
+        rag_service.warm_up()
+        app.state.gemini_service = gemini_service
+        app.state.rag_service = rag_service
+    except Exception as error:
+        logger.exception("Shared services failed to load.")
+        readiness.mark_failed(str(error))
+        return
+    readiness.mark_ready()
+    logger.info("Shared services ready after %.1fs.", readiness.finished_at - readiness.started_at)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the heavy services once per process, but on a background thread so
+    # the server answers health probes straight away; requests that need them
+    # get a 503 until /ready reports "ready".
+    app.state.readiness = Readiness()
+    threading.Thread(
+        target=_load_services,
+        args=(app, app.state.readiness),
+        name="service-loader",
+        daemon=True,
+    ).start()
+    yield
+
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 # CORS
 allowed_origins = [
@@ -0,0 +1,112 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+def token_budget_batches(lengths: Sequence[int], token_budget: int) -> List[List[int]]:
+    """Group text indices, longest first, into batches of at most ``token_budget`` padded tokens.
+
+    A batch pads every text to its longest one, so sorting by length keeps
+    padding low and a budget rather than a fixed count lets short texts
+    share large batches. A text longer than the budget gets a batch of its own.
+    """
+    order = sorted(range(len(lengths)), key=lambda index: -lengths[index])
+    batches: List[List[int]] = []
+    for index in order:
+        # Sorted descending, so a batch's first text is its longest.
+        if batches and (len(batches[-1]) + 1) * max(1, lengths[batches[-1][0]]) <= token_budget:
+            batches[-1].append(index)
+        else:
+            batches.append([index])
+    return batches
+
+
+class MicroBatcher:
+    """Coalesces concurrent ``encode`` calls into one model batch.
+
+    Callers block in ``submit``; a single worker thread takes the first
+    pending request, waits up to ``max_wait_ms`` for others until
+    ``max_batch_size`` texts are queued, runs ``encode`` once and hands each
+    caller its rows. An error in ``encode`` is raised in every caller.
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[List[str]], np.ndarray],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+        name: str = "micro-batcher",
+    ):
+        self.encode = encode
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.name = name
+        self._queue: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._counters = {"requests": 0, "batches": 0, "texts": 0}
+
+    def submit(self, texts: List[str]) -> np.ndarray:
+        """Encode ``texts`` as part of the next batch and return their rows."""
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((list(texts), future))
+        return future.result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._counters)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> List[Tuple[List[str], Future]]:
+        pending = [self._queue.get()]
+        size = len(pending[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            pending.append(item)
+            size += len(item[0])
+        return pending
+
+    def _run(self) -> None:
+        while True:
+            pending = self._collect()
+            texts = [text for item_texts, _ in pending for text in item_texts]
+            try:
+                encoded = np.asarray(self.encode(texts), dtype=np.float32)
+            except Exception as error:
+                logger.warning("Batched encode of %d texts failed: %s", len(texts), error)
+                for _, future in pending:
+                    future.set_exception(error)
+                continue
+
+            with self._lock:
+                self._counters["requests"] += len(pending)
+                self._counters["batches"] += 1
+                self._counters["texts"] += len(texts)
+            start = 0
+            for item_texts, future in pending:
+                future.set_result(encoded[start:start + len(item_texts)])
+                start += len(item_texts)
@@ -0,0 +1,418 @@
+import json
+import logging
+import os
+import re
+import shutil
+from collections import Counter
+from itertools import chain
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from backend.app.services import spelling
+    from backend.app.services.spelling import SymSpellIndex
+except ModuleNotFoundError as error:
+    if not (error.name or "").startswith("backend"):
+        raise
+    from app.services import spelling
+    from app.services.spelling import SymSpellIndex
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the on-disk layout written by BM25Index.save changes.
+BM25_FORMAT_VERSION = 2
+_MANIFEST_FILE = "manifest.json"
+_ARRAY_FIELDS = ("indptr", "doc_ids", "weights", "upper_bounds", "document_lengths")
+# Upper bound on the dense (queries x documents) score block in top_k_many.
+_MAX_BATCH_CELLS = 4_000_000
+# Relative tolerance on the MaxScore threshold, far above float64 rounding error.
+_PRUNE_SLACK = 1e-9
+# Query-weight multiplier for a typo expansion at edit distance 1 and 2, and
+# how many vocabulary terms one unseen query term may expand to.
+_TYPO_WEIGHTS = {1: 0.6, 2: 0.35}
+_MAX_TYPO_EXPANSIONS = 3
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z0-9]+")
+
+
+def tokenize_text(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+class BM25Index:
+    """Okapi BM25 over a compressed-sparse-row (CSR) postings layout.
+
+    Terms are interned to integer ids. The postings of term ``t`` are the
+    document ids ``doc_ids[indptr[t]:indptr[t + 1]]`` together with the
+    matching precomputed ``idf * tf * (k1 + 1) / (tf + k1 * norm(dl))``
+    weights, so scoring a query is a NumPy scatter-add over a few slices.
+
+    Query terms missing from the vocabulary are expanded to the nearest
+    in-vocabulary terms (edit distance up to ``max_edit_distance``) through a
+    symmetric-delete index built alongside the postings; 0 disables it.
+    """
+
+    # Optional QueryExpansions attached by the retriever; adds weighted
+    # section terms for plain-language synonyms found in the query.
+    expansions = None
+
+    def __init__(
+        self,
+        records: List[Dict[str, Any]],
+        k1: float = 1.5,
+        b: float = 0.75,
+        max_edit_distance: int = 2,
+    ):
+        self.k1 = k1
+        self.b = b
+        self.max_edit_distance = max_edit_distance
+        self.document_count = len(records)
+        self.vocabulary: Dict[str, int] = {}
+
+        term_documents: List[List[int]] = []
+        term_frequencies: List[List[int]] = []
+        document_lengths = np.zeros(self.document_count, dtype=np.int32)
+
+        for index, record in enumerate(records):
+            tokens = tokenize_text(str(record.get("document", "")))
+            document_lengths[index] = len(tokens)
+            for term, frequency in Counter(tokens).items():
+                term_id = self.vocabulary.setdefault(term, len(term_documents))
+                if term_id == len(term_documents):
+                    term_documents.append([])
+                    term_frequencies.append([])
+                term_documents[term_id].append(index)
+                term_frequencies[term_id].append(frequency)
+
+        self.document_lengths = document_lengths
+        self.average_document_length = float(document_lengths.mean()) if self.document_count else 0.0
+
+        document_frequencies = np.fromiter(
+            (len(documents) for documents in term_documents),
+            dtype=np.int64,
+            count=len(term_documents),
+        )
+        posting_count = int(document_frequencies.sum())
+
+        self.indptr = np.zeros(len(term_documents) + 1, dtype=np.int64)
+        np.cumsum(document_frequencies, out=self.indptr[1:])
+        self.doc_ids = np.fromiter(chain.from_iterable(term_documents), dtype=np.int32, count=posting_count)
+        frequencies = np.fromiter(chain.from_iterable(term_frequencies), dtype=np.float64, count=posting_count)
+
+        inverse_document_frequencies = np.log1p(
+            (self.document_count - document_frequencies + 0.5) / (document_frequencies + 0.5)
+        )
+        average_length = self.average_document_length or 1.0
+        length_norms = self.k1 * (1.0 - self.b + self.b * (document_lengths / average_length))
+        self.weights = (
+            np.repeat(inverse_document_frequencies, document_frequencies)
+            * (frequencies * (self.k1 + 1.0))
+            / (frequencies + length_norms[self.doc_ids])
+        ).astype(np.float32)
+        self.upper_bounds = (
+            np.maximum.reduceat(self.weights, self.indptr[:-1])
+            if posting_count
+            else np.zeros(0, dtype=np.float32)
+        )
+        self.spelling = SymSpellIndex(self.terms(), max_edit_distance)
+
+    def terms(self) -> List[str]:
+        """Vocabulary terms indexed by term id."""
+        terms = [""] * len(self.vocabulary)
+        for term, term_id in self.vocabulary.items():
+            terms[term_id] = term
+        return terms
+
+    def save(self, directory: str, index_version: str, record_ids: Sequence[str]) -> None:
+        """Persist the index as ``.npy`` arrays plus a JSON manifest.
+
+        The snapshot is written to a sibling temp directory and swapped in
+        afterwards so readers never see a half-written index.
+        """
+        staging_directory = f"{directory}.tmp"
+        shutil.rmtree(staging_directory, ignore_errors=True)
+        os.makedirs(staging_directory)
+
+        for field in _ARRAY_FIELDS:
+            np.save(os.path.join(staging_directory, f"{field}.npy"), getattr(self, field))
+        for field in spelling.ARRAY_FIELDS:
+            np.save(os.path.join(staging_directory, f"{field}.npy"), getattr(self.spelling, field))
+
+        manifest = {
+            "format_version": BM25_FORMAT_VERSION,
+            "index_version": index_version,
+            "k1": self.k1,
+            "b": self.b,
+            "max_edit_distance": self.max_edit_distance,
+            "document_count": self.document_count,
+            "average_document_length": self.average_document_length,
+            "vocabulary": self.terms(),
+            "record_ids": list(record_ids),
+        }
+        with open(os.path.join(staging_directory, _MANIFEST_FILE), "w", encoding="utf-8") as file:
+            json.dump(manifest, file)
+
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(staging_directory, directory)
+
+    @classmethod
+    def load(cls, directory: str, index_version: str) -> Optional[Tuple["BM25Index", List[str]]]:
+        """Memory-map a snapshot written by :meth:`save`.
+
+        Returns ``(index, record_ids)``, or ``None`` when the snapshot is
+        missing, unreadable or was built for a different index version.
+        """
+        manifest_path = os.path.join(directory, _MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            return None
+
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as file:
+                manifest = json.load(file)
+            if manifest.get("format_version") != BM25_FORMAT_VERSION:
+                logger.info("Ignoring BM25 snapshot with format version %s", manifest.get("format_version"))
+                return None
+            if manifest.get("index_version") != index_version:
+                logger.info("Ignoring stale BM25 snapshot built for index version %s", manifest.get("index_version"))
+                return None
+
+            index = cls.__new__(cls)
+            index.k1 = float(manifest["k1"])
+            index.b = float(manifest["b"])
+            index.max_edit_distance = int(manifest["max_edit_distance"])
+            index.document_count = int(manifest["document_count"])
+            index.average_document_length = float(manifest["average_document_length"])
+            index.vocabulary = {term: term_id for term_id, term in enumerate(manifest["vocabulary"])}
+            for field in _ARRAY_FIELDS:
+                setattr(index, field, np.load(os.path.join(directory, f"{field}.npy"), mmap_mode="r"))
+            index.spelling = SymSpellIndex.from_arrays(
+                manifest["vocabulary"],
+                index.max_edit_distance,
+                {
+                    field: np.load(os.path.join(directory, f"{field}.npy"), mmap_mode="r")
+                    for field in spelling.ARRAY_FIELDS
+                },
+            )
+        except (OSError, ValueError, KeyError) as error:
+            logger.warning("Unable to load BM25 snapshot from %s: %s", directory, error)
+            return None
+
+        return index, list(manifest["record_ids"])
+
+    def query_terms(self, query: str) -> List[Tuple[int, float]]:
+        """Return ``(term_id, query_weight)`` pairs for the query's terms.
+
+        Unseen terms contribute their closest vocabulary terms, down-weighted
+        by edit distance, and known synonyms add their expansion terms;
+        weights of a term reached twice are summed.
+        """
+        tokens = tokenize_text(query)
+        expansions = self.expansions
+        weights: Dict[int, float] = {}
+        for term, query_frequency in Counter(tokens).items():
+            query_weight = (query_frequency * 2.0) / (query_frequency + 1.0)
+            term_id = self.vocabulary.get(term)
+            if term_id is not None:
+                weights[term_id] = weights.get(term_id, 0.0) + query_weight
+                continue
+            if expansions is not None and term in expansions:
+                # A recognised synonym is not a typo; its expansion covers it.
+                continue
+            for term_id, distance in self._typo_expansions(term):
+                weights[term_id] = weights.get(term_id, 0.0) + query_weight * _TYPO_WEIGHTS[distance]
+
+        if expansions is not None:
+            for term, weight in expansions.expand(tokens):
+                term_id = self.vocabulary.get(term)
+                if term_id is not None:
+                    weights[term_id] = weights.get(term_id, 0.0) + weight
+        return list(weights.items())
+
+    def _typo_expansions(self, term: str) -> List[Tuple[int, int]]:
+        """Closest vocabulary terms to an unseen ``term``, most common first."""
+        candidates = self.spelling.candidates(term) if self.max_edit_distance else []
+        if not candidates:
+            return []
+        nearest = min(distance for _, distance in candidates)
+        closest = [term_id for term_id, distance in candidates if distance == nearest]
+        # Prefer terms that occur in more documents, as SymSpell prefers frequent words.
+        closest.sort(key=lambda term_id: (-(self.indptr[term_id + 1] - self.indptr[term_id]), term_id))
+        return [(term_id, nearest) for term_id in closest[:_MAX_TYPO_EXPANSIONS]]
+
+    def _bounded_query_terms(self, query: str) -> List[Tuple[int, float, float]]:
+        """Query terms with their score upper bounds, largest bound first."""
+        return sorted(
+            (
+                (term_id, query_weight, float(self.upper_bounds[term_id]) * query_weight)
+                for term_id, query_weight in self.query_terms(query)
+            ),
+            key=lambda term: term[2],
+            reverse=True,
+        )
+
+    def postings(self, term_id: int, allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Posting list of ``term_id``, intersected with the ``allowed`` document bitmap if given."""
+        start, end = self.indptr[term_id], self.indptr[term_id + 1]
+        documents, weights = self.doc_ids[start:end], self.weights[start:end]
+        if allowed is not None:
+            keep = allowed[documents]
+            documents, weights = documents[keep], weights[keep]
+        return documents, weights
+
+    def score(self, query: str) -> np.ndarray:
+        if not self.document_count or not query:
+            return np.zeros(self.document_count, dtype=np.float64)
+
+        terms = self.query_terms(query)
+        if not terms:
+            return np.zeros(self.document_count, dtype=np.float64)
+
+        document_slices = []
+        weight_slices = []
+        for term_id, query_weight in terms:
+            documents, weights = self.postings(term_id)
+            document_slices.append(documents)
+            weight_slices.append(weights * query_weight)
+
+        return np.bincount(
+            np.concatenate(document_slices),
+            weights=np.concatenate(weight_slices),
+            minlength=self.document_count,
+        )
+
+    def top_k(self, query: str, k: int, allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact top-``k`` documents for ``query`` with MaxScore pruning.
+
+        Terms are accumulated in decreasing order of their score upper bound.
+        Once the bounds of the remaining terms can no longer lift an unseen
+        document above the current k-th best score, only the surviving
+        candidates are scored further, by binary search into the remaining
+        posting lists. Returns document indices and raw scores ordered by
+        descending score (ties by index); only positive scores are returned.
+        ``allowed`` is an optional boolean bitmap restricting the documents.
+        """
+        empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64))
+        if k <= 0 or not self.document_count or not query:
+            return empty
+
+        terms = self._bounded_query_terms(query)
+        if not terms:
+            return empty
+
+        # Bound on what the terms after each one can still add, summed from the
+        # tail so it is exactly 0 after the last term and never drifts negative.
+        bounds = np.array([bound for _, _, bound in terms], dtype=np.float64)
+        remaining_bounds = np.append(np.cumsum(bounds[::-1])[::-1][1:], 0.0)
+        accumulator = np.zeros(self.document_count, dtype=np.float64)
+        seen = np.zeros(self.document_count, dtype=bool)
+        candidates = None
+
+        for (term_id, query_weight, _), remaining in zip(terms, remaining_bounds):
+            documents, weights = self.postings(term_id, allowed)
+
+            if candidates is None:
+                accumulator[documents] += weights * query_weight
+                seen[documents] = True
+                touched = np.flatnonzero(seen)
+                if touched.size < k:
+                    continue
+                # Pruning only needs to be conservative: the slack keeps documents
+                # whose score ties the k-th one up to floating-point rounding.
+                threshold = _kth_largest(accumulator[touched], k) * (1.0 - _PRUNE_SLACK)
+                if remaining < threshold:
+                    candidates = touched[accumulator[touched] + remaining >= threshold]
+                continue
+
+            matched, positions = _locate(documents, candidates)
+            accumulator[candidates[matched]] += weights[positions[matched]] * query_weight
+            threshold = _kth_largest(accumulator[candidates], k) * (1.0 - _PRUNE_SLACK)
+            candidates = candidates[accumulator[candidates] + remaining >= threshold]
+
+        if candidates is None:
+            candidates = np.flatnonzero(seen)
+
+        return _rank(candidates, accumulator[candidates], k)
+
+    def top_k_many(
+        self,
+        queries: Sequence[str],
+        k: int,
+        allowed: Optional[np.ndarray] = None,
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Batched :meth:`top_k` that scores a block of queries in one scatter-add.
+
+        Term contributions are summed in the same order as :meth:`top_k`, so
+        both paths return bit-identical scores and rankings.
+        """
+        results: List[Tuple[np.ndarray, np.ndarray]] = []
+        document_count = self.document_count
+        if k <= 0 or not document_count:
+            return [(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)) for _ in queries]
+
+        block_size = max(1, _MAX_BATCH_CELLS // document_count)
+        for block_start in range(0, len(queries), block_size):
+            block = queries[block_start:block_start + block_size]
+            cell_slices = []
+            weight_slices = []
+            for row, query in enumerate(block):
+                for term_id, query_weight, _ in (self._bounded_query_terms(query) if query else []):
+                    documents, weights = self.postings(term_id, allowed)
+                    cell_slices.append(documents + row * document_count)
+                    weight_slices.append(weights * query_weight)
+
+            if cell_slices:
+                block_scores = np.bincount(
+                    np.concatenate(cell_slices),
+                    weights=np.concatenate(weight_slices),
+                    minlength=len(block) * document_count,
+                ).reshape(len(block), document_count)
+            else:
+                block_scores = np.zeros((len(block), document_count), dtype=np.float64)
+
+            for row_scores in block_scores:
+                candidates = np.flatnonzero(row_scores > 0)
+                results.append(_rank(candidates, row_scores[candidates], k))
+
+        return results
+
+    def score_documents(self, query: str, documents: np.ndarray) -> np.ndarray:
+        """Exact BM25 scores for a small set of document indices."""
+        documents = np.asarray(documents, dtype=np.int64)
+        scores = np.zeros(documents.size, dtype=np.float64)
+        if not documents.size or not query:
+            return scores
+
+        order = np.argsort(documents, kind="stable")
+        targets = documents[order]
+        for term_id, query_weight in self.query_terms(query):
+            term_documents, weights = self.postings(term_id)
+            matched, positions = _locate(term_documents, targets)
+            scores[order[matched]] += weights[positions[matched]] * query_weight
+        return scores
+
+
+def _rank(candidates: np.ndarray, scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Top-``k`` positive scores, ordered by descending score then index."""
+    positive = scores > 0
+    candidates, scores = candidates[positive], scores[positive]
+    if candidates.size > k:
+        # Cheap pre-cut; ties with the k-th score survive so ordering stays exact.
+        keep = scores >= _kth_largest(scores, k)
+        candidates, scores = candidates[keep], scores[keep]
+    order = np.lexsort((candidates, -scores))[:k]
+    return candidates[order].astype(np.int64), scores[order]
+
+
+def _kth_largest(values: np.ndarray, k: int) -> float:
+    if values.size < k:
+        return 0.0
+    return float(np.partition(values, values.size - k)[values.size - k])
+
+
+def _locate(sorted_documents: np.ndarray, targets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Binary-search ``targets`` (sorted) in a posting list's document ids."""
+    positions = np.searchsorted(sorted_documents, targets)
+    clipped = np.minimum(positions, max(sorted_documents.size - 1, 0))
+    matched = (positions < sorted_documents.size) & (sorted_documents[clipped] == targets)
+    return matched, clipped
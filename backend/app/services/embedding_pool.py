@@ -0,0 +1,104 @@
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from backend.app.core.config import settings
+    from backend.app.services.embeddings import InLegalBERTEmbeddingService
+except ModuleNotFoundError as error:
+    if not (error.name or "").startswith("backend"):
+        raise
+    from app.core.config import settings
+    from app.services.embeddings import InLegalBERTEmbeddingService
+
+
+logger = logging.getLogger(__name__)
+
+_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def threads_per_worker(workers: int, threads: int = 0) -> int:
+    """Intra-op threads for each worker; 0 splits the machine's cores evenly."""
+    if threads > 0:
+        return threads
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def _init_worker(threads: int) -> None:
+    # Pin each worker's thread pools so the workers do not oversubscribe the cores.
+    for variable in _THREAD_ENV_VARS:
+        os.environ[variable] = str(threads)
+    settings.EMBEDDING_ONNX_THREADS = threads
+    settings.EMBEDDING_QUERY_BATCH_WAIT_MS = 0
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(threads)
+
+
+def _embed_shard(start: int, texts: List[str]) -> Tuple[int, np.ndarray]:
+    # The service is a per-process singleton, so each worker loads the model
+    # once and shares the SQLite embedding cache with the others.
+    vectors = InLegalBERTEmbeddingService().embed_documents(texts)
+    return start, np.asarray(vectors, dtype=np.float32)
+
+
+def embed_documents_parallel(
+    texts: Sequence[str],
+    workers: int,
+    threads: int = 0,
+    shard_size: int = 256,
+    executor: Optional[Executor] = None,
+) -> List[List[float]]:
+    """Embed ``texts`` across ``workers`` processes, returning vectors in input order.
+
+    Texts are split into contiguous shards of ``shard_size``; shards are
+    handed out as workers free up and their vectors written back into place
+    as they arrive. Workers start with ``spawn`` so torch is never forked.
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+
+    shard_size = max(1, shard_size)
+    shards = [(start, texts[start:start + shard_size]) for start in range(0, len(texts), shard_size)]
+    pinned_threads = threads_per_worker(workers, threads)
+    owns_executor = executor is None
+    if owns_executor:
+        executor = ProcessPoolExecutor(
+            max_workers=min(workers, len(shards)),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(pinned_threads,),
+        )
+    logger.info(
+        "Embedding %d documents in %d shards on %d workers x %d threads",
+        len(texts),
+        len(shards),
+        workers,
+        pinned_threads,
+    )
+
+    started = time.perf_counter()
+    embeddings: Optional[np.ndarray] = None
+    done = 0
+    try:
+        futures = [executor.submit(_embed_shard, start, shard) for start, shard in shards]
+        for future in as_completed(futures):
+            start, vectors = future.result()
+            if embeddings is None:
+                embeddings = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            embeddings[start:start + len(vectors)] = vectors
+            done += len(vectors)
+            logger.info("Embedded %d/%d documents (%.1fs)", done, len(texts), time.perf_counter() - started)
+    finally:
+        if owns_executor:
+            executor.shutdown(cancel_futures=True)
+
+    return embeddings.tolist()
@@ -0,0 +1,200 @@
+import json
+import logging
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# Frame: big-endian (header length, payload length), JSON header, raw payload.
+_FRAME_PREFIX = struct.Struct(">II")
+_MODES = frozenset({"query", "document"})
+# Requests with this mode return the server's embedding cache stats.
+_STATS_MODE = "stats"
+
+
+def _recv_exactly(connection: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = connection.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Embedding server connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def send_frame(connection: socket.socket, header: Dict[str, Any], payload: bytes = b"") -> None:
+    encoded = json.dumps(header).encode("utf-8")
+    connection.sendall(_FRAME_PREFIX.pack(len(encoded), len(payload)) + encoded + payload)
+
+
+def recv_frame(connection: socket.socket) -> Tuple[Dict[str, Any], bytes]:
+    header_length, payload_length = _FRAME_PREFIX.unpack(_recv_exactly(connection, _FRAME_PREFIX.size))
+    header = json.loads(_recv_exactly(connection, header_length).decode("utf-8"))
+    return header, _recv_exactly(connection, payload_length) if payload_length else b""
+
+
+class _EmbeddingRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        # Clients keep one connection per thread open and send many requests on it.
+        while True:
+            try:
+                request, _ = recv_frame(self.request)
+            except (OSError, ValueError, struct.error):
+                return
+            try:
+                if request.get("mode") == _STATS_MODE:
+                    response, payload = {"stats": self.server.service.cache_stats()}, b""
+                else:
+                    vectors = self.server.embed(request.get("texts") or [], request.get("mode", "query"))
+                    response, payload = {"shape": list(vectors.shape)}, vectors.tobytes()
+            except Exception as error:
+                logger.exception("Embedding request failed")
+                response, payload = {"error": str(error)}, b""
+            try:
+                send_frame(self.request, response, payload)
+            except OSError:
+                return
+
+
+class EmbeddingServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serves one embedding service to many API workers over a Unix socket.
+
+    Each connection is handled on its own thread. Query requests go through
+    the service's micro-batcher, so concurrent queries from different workers
+    share forward passes, and the SQLite embedding cache is shared as usual.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, service):
+        self.service = service
+        self.socket_path = socket_path
+        directory = os.path.dirname(socket_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, _EmbeddingRequestHandler)
+        os.chmod(socket_path, 0o660)
+
+    def embed(self, texts: List[str], mode: str) -> np.ndarray:
+        if mode not in _MODES:
+            raise ValueError(f"Unknown embedding mode: {mode}")
+        vectors = self.service.embed_texts([str(text) for text in texts], mode=mode)
+        if not vectors:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.asarray(vectors, dtype=np.float32)
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class EmbeddingClient:
+    """Client for :class:`EmbeddingServer` with one persistent connection per thread.
+
+    ``timeout`` bounds each query request; document requests, which may be
+    large ingestion batches, get ``timeout`` plus ``document_timeout`` per text.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 30.0, document_timeout: float = 1.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.document_timeout = document_timeout
+        self._local = threading.local()
+
+    def wait_until_available(self, timeout: float) -> None:
+        """Block until the server accepts connections, or raise ``ConnectionError``."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self._connection()
+                return
+            except OSError as error:
+                if time.monotonic() >= deadline:
+                    raise ConnectionError(f"Embedding server at {self.socket_path} is not available: {error}")
+                time.sleep(0.2)
+
+    def _connection(self) -> socket.socket:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.settimeout(self.timeout)
+            try:
+                connection.connect(self.socket_path)
+            except OSError:
+                connection.close()
+                raise
+            self._local.connection = connection
+        return connection
+
+    def _close(self) -> None:
+        connection = getattr(self._local, "connection", None)
+        self._local.connection = None
+        if connection is not None:
+            connection.close()
+
+    def _request(self, request: Dict[str, Any], timeout: float) -> Tuple[Dict[str, Any], bytes]:
+        # A connection dropped by a restarted server is retried once.
+        for attempt in range(2):
+            try:
+                connection = self._connection()
+                connection.settimeout(timeout)
+                send_frame(connection, request)
+                header, payload = recv_frame(connection)
+                break
+            except OSError:
+                self._close()
+                if attempt:
+                    raise
+        if "error" in header:
+            raise RuntimeError(f"Embedding server error: {header['error']}")
+        return header, payload
+
+    def embed(self, texts: List[str], mode: str) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        timeout = self.timeout
+        if mode == "document":
+            timeout += self.document_timeout * len(texts)
+        header, payload = self._request({"mode": mode, "texts": list(texts)}, timeout)
+        return np.frombuffer(payload, dtype=np.float32).reshape(header["shape"])
+
+    def stats(self) -> Dict[str, int]:
+        """The server's embedding cache stats."""
+        header, _ = self._request({"mode": _STATS_MODE}, self.timeout)
+        return header["stats"]
+
+
+def serve(socket_path: str, service=None) -> None:
+    """Load the embedding model once and serve it on ``socket_path`` until interrupted."""
+    if service is None:
+        try:
+            from backend.app.core.config import settings
+            from backend.app.services.embeddings import InLegalBERTEmbeddingService
+        except ModuleNotFoundError as error:
+            if not (error.name or "").startswith("backend"):
+                raise
+            from app.core.config import settings
+            from app.services.embeddings import InLegalBERTEmbeddingService
+        # The server owns the model, so it must not become a client of itself.
+        settings.EMBEDDING_SERVER_SOCKET = ""
+        service = InLegalBERTEmbeddingService()
+
+    server = EmbeddingServer(socket_path, service)
+    logger.info("Embedding server listening on %s (%s backend)", socket_path, getattr(service, "backend", "torch"))
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
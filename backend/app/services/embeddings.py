@@ -4,24 +4,334 @@ import logging
 import os
 import sqlite3
 import threading
-from typing import Iterable, List
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sentence_transformers.models import Normalize, Pooling, Transformer
 
 try:
     from backend.app.core.config import settings
-except ModuleNotFoundError:
+    from backend.app.services.batching import MicroBatcher, token_budget_batches
+    from backend.app.services.embedding_server import EmbeddingClient
+    from backend.app.services.onnx_encoder import load_onnx_encoder
+except ModuleNotFoundError as error:
+    if not (error.name or "").startswith("backend"):
+        raise
     from app.core.config import settings
+    from app.services.batching import MicroBatcher, token_budget_batches
+    from app.services.embedding_server import EmbeddingClient
+    from app.services.onnx_encoder import load_onnx_encoder
 
 
 logger = logging.getLogger(__name__)
 
+# Keys per "SELECT ... IN (...)"; stays under SQLite's host-parameter limit.
+_CACHE_LOOKUP_BATCH = 500
+# Once over a cap, evict least recently used rows down to this share of it so
+# eviction does not run again on the very next insert.
+_EVICTION_LOW_WATER = 0.9
+# Compact (checkpoint + VACUUM) after evicting this many rows.
+_COMPACT_AFTER_EVICTIONS = 1000
+# Usage is tracked with running counters and recounted from the table after
+# this many inserts, which also picks up rows written by other processes.
+_USAGE_RECOUNT_INSERTS = 1000
+
+
+class _EmbeddingCache:
+    """Two-tier embedding cache: an in-process LRU over a bounded SQLite table.
+
+    Vectors are stored as raw float32 blobs keyed by content hash, with a
+    last-access time used to evict the least recently used rows once the
+    table exceeds ``max_rows`` or ``max_bytes`` (0 = no cap); table size is
+    kept in running counters so inserts do not scan the table. Reads record
+    their access time in memory and it is written back just before an
+    eviction, so cache hits never write to SQLite. Each thread
+    keeps one long-lived WAL-mode connection. "Hot" lookups (queries) are
+    served from, and promoted into, the in-memory LRU first.
+    """
+
+    def __init__(self, db_path: str, max_rows: int = 0, max_bytes: int = 0, memory_entries: int = 0) -> None:
+        self.db_path = db_path
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "compactions": 0,
+        }
+        self._evicted_since_compaction = 0
+        self._compacting = False
+        # Access times of disk hits not yet written back; only eviction reads them.
+        self._pending_access: Dict[str, float] = {}
+
+        connection = self._connection()
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embedding_vectors (
+                cache_key   TEXT PRIMARY KEY,
+                vector      BLOB NOT NULL,
+                last_access REAL NOT NULL DEFAULT 0
+            )
+            """
+        )
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(embedding_vectors)")}
+        if "last_access" not in columns:
+            connection.execute("ALTER TABLE embedding_vectors ADD COLUMN last_access REAL NOT NULL DEFAULT 0")
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embedding_last_access ON embedding_vectors(last_access)"
+        )
+        connection.commit()
+        self._migrate_json_rows(connection)
+        self._rows, self._bytes = self._usage(connection)
+        self._inserts_since_recount = 0
+
+    def _migrate_json_rows(self, connection: sqlite3.Connection) -> None:
+        """Move vectors that earlier releases stored as JSON text into ``embedding_vectors``.
+
+        Their keys are built the same way, so a re-ingestion still hits them.
+        They get the oldest access time and are evicted first if over a cap.
+        """
+        legacy = connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'embedding_cache'"
+        ).fetchone()
+        if legacy is None:
+            return
+
+        migrated = 0
+        try:
+            with connection:
+                rows = connection.execute("SELECT cache_key, vector_json FROM embedding_cache")
+                while True:
+                    batch = rows.fetchmany(_CACHE_LOOKUP_BATCH)
+                    if not batch:
+                        break
+                    entries = []
+                    for cache_key, vector_json in batch:
+                        try:
+                            vector = np.asarray(json.loads(vector_json), dtype=np.float32)
+                        except (TypeError, ValueError):
+                            continue
+                        entries.append((cache_key, sqlite3.Binary(vector.tobytes())))
+                    # Rows already in the new table are newer; keep them.
+                    connection.executemany(
+                        "INSERT OR IGNORE INTO embedding_vectors (cache_key, vector) VALUES (?, ?)",
+                        entries,
+                    )
+                    migrated += len(entries)
+                connection.execute("DROP TABLE embedding_cache")
+        except sqlite3.OperationalError as error:
+            # Another process sharing the file migrated it first.
+            logger.info("Skipped legacy embedding cache migration: %s", error)
+            return
+        logger.info("Migrated %s legacy JSON embedding cache rows", migrated)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, timeout=30.0)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _remember(self, entries: Iterable[Tuple[str, np.ndarray]]) -> None:
+        if self.memory_entries <= 0:
+            return
+        with self._lock:
+            for cache_key, vector in entries:
+                self._memory[cache_key] = vector
+                self._memory.move_to_end(cache_key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get_many(self, cache_keys: Sequence[str], hot: bool = False) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        unique_keys = list(dict.fromkeys(cache_keys))
+        if hot and self.memory_entries > 0:
+            with self._lock:
+                for cache_key in unique_keys:
+                    vector = self._memory.get(cache_key)
+                    if vector is not None:
+                        self._memory.move_to_end(cache_key)
+                        found[cache_key] = vector
+                self._counters["memory_hits"] += len(found)
+            # Memory hits count as uses too, or the hottest rows would be evicted first.
+            self._touch(list(found))
+            unique_keys = [cache_key for cache_key in unique_keys if cache_key not in found]
+
+        from_disk: Dict[str, np.ndarray] = {}
+        connection = self._connection()
+        for start in range(0, len(unique_keys), _CACHE_LOOKUP_BATCH):
+            batch = unique_keys[start:start + _CACHE_LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = connection.execute(
+                f"SELECT cache_key, vector FROM embedding_vectors WHERE cache_key IN ({placeholders})",
+                batch,
+            ).fetchall()
+            for cache_key, blob in rows:
+                from_disk[cache_key] = np.frombuffer(blob, dtype=np.float32)
+
+        if from_disk:
+            self._touch(list(from_disk))
+            if hot:
+                self._remember(from_disk.items())
+            found.update(from_disk)
+        with self._lock:
+            self._counters["disk_hits"] += len(from_disk)
+            self._counters["misses"] += len(unique_keys) - len(from_disk)
+        return found
+
+    def _touch(self, cache_keys: List[str]) -> None:
+        if self.max_rows <= 0 and self.max_bytes <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            for cache_key in cache_keys:
+                self._pending_access[cache_key] = now
+
+    def _flush_access_times(self, connection: sqlite3.Connection) -> None:
+        with self._lock:
+            pending, self._pending_access = self._pending_access, {}
+        if not pending:
+            return
+        # MAX keeps a newer write from set_many, possibly from another process.
+        with connection:
+            connection.executemany(
+                "UPDATE embedding_vectors SET last_access = MAX(last_access, ?) WHERE cache_key = ?",
+                [(accessed, cache_key) for cache_key, accessed in pending.items()],
+            )
+
+    def set_many(self, entries: Iterable[Tuple[str, np.ndarray]], hot: bool = False) -> None:
+        entries = [(cache_key, np.ascontiguousarray(vector, dtype=np.float32)) for cache_key, vector in entries]
+        if not entries:
+            return
+        if hot:
+            self._remember(entries)
+
+        now = time.time()
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO embedding_vectors (cache_key, vector, last_access) VALUES (?, ?, ?)",
+                [(cache_key, sqlite3.Binary(vector.tobytes()), now) for cache_key, vector in entries],
+            )
+        with self._lock:
+            # Replaced rows are counted again; the next recount corrects that.
+            self._rows += len(entries)
+            self._bytes += sum(vector.nbytes for _, vector in entries)
+            self._inserts_since_recount += len(entries)
+        self._evict(connection)
+
+    def _usage(self, connection: sqlite3.Connection) -> Tuple[int, int]:
+        # length() of a blob is read from the record header, not the payload.
+        rows, stored_bytes = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(vector)), 0) FROM embedding_vectors"
+        ).fetchone()
+        return int(rows), int(stored_bytes)
+
+    def _over_cap(self, rows: int, stored_bytes: int) -> bool:
+        return (self.max_rows > 0 and rows > self.max_rows) or (self.max_bytes > 0 and stored_bytes > self.max_bytes)
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        if self.max_rows <= 0 and self.max_bytes <= 0:
+            return
+
+        with self._lock:
+            rows, stored_bytes = self._rows, self._bytes
+            recount = self._inserts_since_recount >= _USAGE_RECOUNT_INSERTS
+        if not (recount or self._over_cap(rows, stored_bytes)):
+            return
+
+        # The counters say a cap may be exceeded; confirm against the table.
+        rows, stored_bytes = self._usage(connection)
+        with self._lock:
+            self._rows, self._bytes = rows, stored_bytes
+            self._inserts_since_recount = 0
+        if not self._over_cap(rows, stored_bytes):
+            return
+
+        self._flush_access_times(connection)
+        over_rows = self.max_rows > 0 and rows > self.max_rows
+        over_bytes = self.max_bytes > 0 and stored_bytes > self.max_bytes
+        average_bytes = max(1, stored_bytes // max(rows, 1))
+        excess = 0
+        if over_rows:
+            excess = rows - max(1, int(self.max_rows * _EVICTION_LOW_WATER))
+        if over_bytes:
+            excess = max(excess, -(-(stored_bytes - int(self.max_bytes * _EVICTION_LOW_WATER)) // average_bytes))
+        with connection:
+            evicted = connection.execute(
+                """
+                DELETE FROM embedding_vectors WHERE cache_key IN (
+                    SELECT cache_key FROM embedding_vectors ORDER BY last_access ASC LIMIT ?
+                )
+                """,
+                (excess,),
+            ).rowcount
+
+        with self._lock:
+            self._rows -= evicted
+            self._bytes -= evicted * average_bytes
+            self._counters["evictions"] += evicted
+            self._evicted_since_compaction += evicted
+            compact = self._evicted_since_compaction >= _COMPACT_AFTER_EVICTIONS and not self._compacting
+            if compact:
+                self._compacting = True
+        logger.info("Evicted %s embedding cache rows (%s rows, %s bytes before)", evicted, rows, stored_bytes)
+        if compact:
+            threading.Thread(target=self._compact_in_background, name="embedding-cache-compact", daemon=True).start()
+
+    def _compact_in_background(self) -> None:
+        self.compact()
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+
+    def compact(self) -> None:
+        """Fold the WAL into the database and VACUUM away the space freed by eviction."""
+        try:
+            connection = self._connection()
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            connection.execute("VACUUM")
+        except sqlite3.Error as error:
+            logger.warning("Embedding cache compaction failed: %s", error)
+        else:
+            with self._lock:
+                self._counters["compactions"] += 1
+                self._evicted_since_compaction = 0
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def stats(self) -> Dict[str, int]:
+        rows, stored_bytes = self._usage(self._connection())
+        with self._lock:
+            return {
+                **self._counters,
+                "rows": rows,
+                "bytes": stored_bytes,
+                "memory_entries": len(self._memory),
+            }
+
 
 class InLegalBERTEmbeddingService:
     _instance = None
     _instance_lock = threading.Lock()
+    # "torch", "onnx" or "onnx-int8", depending on which model was loaded.
+    backend = "torch"
+    # Set when EMBEDDING_QUERY_BATCH_WAIT_MS > 0; coalesces concurrent queries.
+    _query_batcher: Optional[MicroBatcher] = None
+    # Set when EMBEDDING_SERVER_SOCKET is; embeddings then come from the
+    # shared embedding server and no model is loaded in this process.
+    _client: Optional[EmbeddingClient] = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -45,76 +355,92 @@ class InLegalBERTEmbeddingService:
 
         self.model_name = settings.LOCAL_EMBEDDING_MODEL
         self.batch_size = settings.EMBEDDING_BATCH_SIZE
+        self.token_budget = settings.EMBEDDING_TOKEN_BUDGET
         self.query_instruction = settings.QUERY_EMBEDDING_PREFIX or ""
         self.model_cache_dir = os.path.expanduser(settings.MODEL_CACHE_DIR)
         self.use_safetensors = settings.USE_SAFETENSORS
 
+        if settings.EMBEDDING_SERVER_SOCKET:
+            self.model = None
+            self._client = EmbeddingClient(
+                settings.EMBEDDING_SERVER_SOCKET,
+                timeout=settings.EMBEDDING_SERVER_TIMEOUT,
+                document_timeout=settings.EMBEDDING_SERVER_DOCUMENT_TIMEOUT,
+            )
+            # Runs on the app's background loader, so /ready waits for the server.
+            self._client.wait_until_available(settings.EMBEDDING_SERVER_CONNECT_TIMEOUT)
+            logger.info("Using embedding server at %s", settings.EMBEDDING_SERVER_SOCKET)
+            self._initialized = True
+            return
+
         os.makedirs(self.model_cache_dir, exist_ok=True)
         os.environ.setdefault("HF_HOME", self.model_cache_dir)
         os.environ.setdefault("TRANSFORMERS_CACHE", self.model_cache_dir)
 
+        self.model = None
+        if settings.EMBEDDING_BACKEND == "onnx":
+            self.model = self._load_onnx_model()
+        if self.model is None:
+            self.model = self._load_torch_model()
+
+        self.cache_path = settings.EMBEDDING_CACHE_PATH
+        self._cache = _EmbeddingCache(
+            self.cache_path,
+            max_rows=settings.EMBEDDING_CACHE_MAX_ROWS,
+            max_bytes=settings.EMBEDDING_CACHE_MAX_BYTES,
+            memory_entries=settings.EMBEDDING_MEMORY_CACHE_SIZE,
+        )
+        if settings.EMBEDDING_QUERY_BATCH_WAIT_MS > 0:
+            self._query_batcher = MicroBatcher(
+                self._encode_uncached,
+                max_batch_size=settings.EMBEDDING_QUERY_BATCH_SIZE,
+                max_wait_ms=settings.EMBEDDING_QUERY_BATCH_WAIT_MS,
+                name="query-embedding-batcher",
+            )
+
+        self._initialized = True
+
+    def _load_torch_model(self):
+        # Imported here so importing the app does not pull in torch.
+        from sentence_transformers import SentenceTransformer
+
         logger.info(
             "Loading embedding model %s on %s (use_safetensors=%s)",
             self.model_name,
             self.device,
             self.use_safetensors,
         )
-        self.model = SentenceTransformer(
+        return SentenceTransformer(
             self.model_name,
             device=self.device,
             cache_folder=self.model_cache_dir,
         )
 
-        self.cache_path = settings.EMBEDDING_CACHE_PATH
-        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
-        self._cache_lock = threading.Lock()
-        self._init_cache()
-
-        self._initialized = True
-
-    def _init_cache(self):
-        with sqlite3.connect(self.cache_path) as connection:
-            connection.execute(
-                """
-                CREATE TABLE IF NOT EXISTS embedding_cache (
-                    cache_key TEXT PRIMARY KEY,
-                    vector_json TEXT NOT NULL
-                )
-                """
+    def _load_onnx_model(self):
+        """ONNX Runtime encoder, or ``None`` to fall back to torch."""
+        try:
+            encoder = load_onnx_encoder(
+                self.model_name,
+                self.model_cache_dir,
+                quantize=settings.EMBEDDING_ONNX_QUANTIZE,
+                min_parity=settings.EMBEDDING_ONNX_MIN_PARITY,
+                load_reference=self._load_torch_model,
+                threads=settings.EMBEDDING_ONNX_THREADS,
             )
-            connection.commit()
+        except Exception as error:
+            logger.warning("ONNX embedding backend unavailable, using torch: %s", error)
+            return None
+        if encoder is not None:
+            self.backend = "onnx-int8" if settings.EMBEDDING_ONNX_QUANTIZE else "onnx"
+        return encoder
 
     def _build_cache_key(self, text: str, mode: str) -> str:
-        payload = f"{self.model_name}|{mode}|{text}".encode("utf-8")
+        # int8 vectors differ slightly from torch ones, so they are cached apart.
+        model = self.model_name if self.backend in {"torch", "onnx"} else f"{self.model_name}@{self.backend}"
+        payload = f"{model}|{mode}|{text}".encode("utf-8")
         return hashlib.sha256(payload).hexdigest()
 
-    def _get_cached(self, cache_key: str):
-        with self._cache_lock:
-            with sqlite3.connect(self.cache_path) as connection:
-                row = connection.execute(
-                    "SELECT vector_json FROM embedding_cache WHERE cache_key = ?",
-                    (cache_key,),
-                ).fetchone()
-        if not row:
-            return None
-        return json.loads(row[0])
-
-    def _set_cached_many(self, entries: Iterable[tuple[str, List[float]]]):
-        rows = [(cache_key, json.dumps(vector)) for cache_key, vector in entries]
-        if not rows:
-            return
-
-        with self._cache_lock:
-            with sqlite3.connect(self.cache_path) as connection:
-                connection.executemany(
-                    "INSERT OR REPLACE INTO embedding_cache (cache_key, vector_json) VALUES (?, ?)",
-                    rows,
-                )
-                connection.commit()
-
-    def _encode_uncached(self, texts: List[str]) -> List[List[float]]:
-        if not texts:
-            return []
+    def _encode_uncached(self, texts: List[str]) -> np.ndarray:
         embeddings = self.model.encode(
             texts,
             batch_size=self.batch_size,
@@ -122,46 +448,126 @@ class InLegalBERTEmbeddingService:
             convert_to_numpy=True,
             show_progress_bar=False,
         )
-        return embeddings.astype(np.float32).tolist()
+        return np.asarray(embeddings, dtype=np.float32)
+
+    def _token_lengths(self, texts: List[str]) -> List[int]:
+        max_length = int(getattr(self.model, "max_seq_length", None) or 512)
+        tokenizer = getattr(self.model, "tokenizer", None)
+        if tokenizer is None:
+            # Rough word-piece estimate plus [CLS]/[SEP].
+            return [min(max_length, int(len(text.split()) * 1.3) + 2) for text in texts]
+        input_ids = tokenizer(texts, add_special_tokens=True, truncation=True, max_length=max_length)["input_ids"]
+        return [len(ids) for ids in input_ids]
+
+    def _encode_documents(self, texts: List[str]) -> np.ndarray:
+        """Encode documents in length-sorted batches of at most ``token_budget`` padded tokens."""
+        if self.token_budget <= 0 or len(texts) <= 1:
+            return self._encode_uncached(texts)
+
+        started = time.perf_counter()
+        lengths = self._token_lengths(texts)
+        embeddings: np.ndarray | None = None
+        for batch in token_budget_batches(lengths, self.token_budget):
+            encoded = np.asarray(
+                self.model.encode(
+                    [texts[index] for index in batch],
+                    batch_size=len(batch),
+                    normalize_embeddings=True,
+                    convert_to_numpy=True,
+                    show_progress_bar=False,
+                ),
+                dtype=np.float32,
+            )
+            if embeddings is None:
+                embeddings = np.empty((len(texts), encoded.shape[1]), dtype=np.float32)
+            embeddings[batch] = encoded
+
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        tokens = sum(lengths)
+        logger.info(
+            "Encoded %d documents (%d tokens) in %.2fs: %.0f tokens/s",
+            len(texts),
+            tokens,
+            elapsed,
+            tokens / elapsed,
+        )
+        return embeddings
 
     def _embed(self, texts: List[str], mode: str) -> List[List[float]]:
         if not texts:
             return []
+        if self._client is not None:
+            # The server applies the cache; prefixes were already added here.
+            return self._client.embed(texts, mode).tolist()
 
         prepared_texts = [t.strip() if t else "" for t in texts]
         cache_keys = [self._build_cache_key(t, mode) for t in prepared_texts]
 
-        vectors: List[List[float] | None] = [None] * len(prepared_texts)
-        misses_idx: List[int] = []
-        misses_text: List[str] = []
+        # Query vectors are kept in the in-process tier; documents only on disk.
+        hot = mode == "query"
+        cached = self._cache.get_many(cache_keys, hot=hot)
+        vectors: List[np.ndarray | None] = [cached.get(key) for key in cache_keys]
 
+        # Identical texts in one call are encoded once.
+        misses: Dict[str, List[int]] = {}
         for index, key in enumerate(cache_keys):
-            cached = self._get_cached(key)
-            if cached is not None:
-                vectors[index] = cached
+            if vectors[index] is None:
+                misses.setdefault(key, []).append(index)
+
+        if misses:
+            miss_keys = list(misses)
+            miss_texts = [prepared_texts[misses[key][0]] for key in miss_keys]
+            if hot and self._query_batcher is not None:
+                encoded = self._query_batcher.submit(miss_texts)
+            elif hot:
+                encoded = self._encode_uncached(miss_texts)
             else:
-                misses_idx.append(index)
-                misses_text.append(prepared_texts[index])
+                encoded = self._encode_documents(miss_texts)
+            for key, vector in zip(miss_keys, encoded):
+                for index in misses[key]:
+                    vectors[index] = vector
+            self._cache.set_many(zip(miss_keys, encoded), hot=hot)
+
+        return [vector.tolist() for vector in vectors if vector is not None]
 
-        if misses_text:
-            encoded = self._encode_uncached(misses_text)
-            cache_entries = []
-            for i, vector in enumerate(encoded):
-                original_index = misses_idx[i]
-                vectors[original_index] = vector
-                cache_entries.append((cache_keys[original_index], vector))
-            self._set_cached_many(cache_entries)
+    def cache_stats(self) -> Dict[str, int]:
+        if self._client is not None:
+            # The cache lives in the embedding server; empty if it is unreachable.
+            try:
+                return self._client.stats()
+            except (OSError, RuntimeError) as error:
+                logger.warning("Unable to read embedding server cache stats: %s", error)
+                return {}
+        return self._cache.stats()
 
-        return [vector for vector in vectors if vector is not None]
+    def embed_texts(self, texts: List[str], mode: str) -> List[List[float]]:
+        """Embed ``texts`` as given (no query prefix added) in ``mode`` "query" or "document"."""
+        return self._embed(texts, mode=mode)
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         return self._embed(texts, mode="document")
 
-    def embed_query(self, query: str) -> List[float]:
+    def _query_text(self, query: str) -> str:
         normalized_query = (query or "").strip()
-        if not normalized_query:
+        if normalized_query and self.query_instruction:
+            return f"{self.query_instruction}{normalized_query}"
+        return normalized_query
+
+    def embed_query(self, query: str) -> List[float]:
+        query_text = self._query_text(query)
+        if not query_text:
             return []
 
-        query_text = f"{self.query_instruction}{normalized_query}" if self.query_instruction else normalized_query
         vectors = self._embed([query_text], mode="query")
         return vectors[0] if vectors else []
+
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed several queries in one model batch; empty queries map to ``[]``."""
+        query_texts = [self._query_text(query) for query in queries]
+        active = [index for index, text in enumerate(query_texts) if text]
+        vectors = self._embed([query_texts[index] for index in active], mode="query")
+
+        embeddings: List[List[float]] = [[] for _ in queries]
+        for index, vector in zip(active, vectors):
+            embeddings[index] = vector
+        return embeddings
@@ -0,0 +1,195 @@
+import json
+import logging
+import math
+import os
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+COLUMNS_FILE = "filter_columns.json"
+SECTION_NUMBER_PATTERN = re.compile(r"\d+")
+_RANGE_OPERATORS = ("$gte", "$lte")
+
+
+def section_value(section_number: Any) -> float:
+    """Numeric part of a section number ("318(4)" -> 318.0), NaN if there is none."""
+    match = SECTION_NUMBER_PATTERN.search(str(section_number or ""))
+    return float(match.group()) if match else math.nan
+
+
+def _as_tuple(value: Any) -> Tuple[Any, ...]:
+    if isinstance(value, (list, tuple, set)):
+        return tuple(value)
+    return (value,)
+
+
+class MetadataColumns:
+    """Act, section number, title and chunk index of every search record, as arrays.
+
+    Filters are evaluated against these columns once per query to build a
+    record bitmap, instead of inspecting metadata dicts candidate by candidate.
+    """
+
+    def __init__(
+        self,
+        act_names: Sequence[str],
+        section_numbers: Sequence[str],
+        chunk_indexes: Sequence[int],
+        section_titles: Optional[Sequence[str]] = None,
+    ):
+        self.act_names = np.array([str(name or "") for name in act_names], dtype=object)
+        self.section_numbers = np.array([str(number or "").strip() for number in section_numbers], dtype=object)
+        self.section_values = np.array([section_value(number) for number in self.section_numbers], dtype=np.float64)
+        self.chunk_indexes = np.array([int(index or 0) for index in chunk_indexes], dtype=np.int64)
+        if section_titles is None:
+            section_titles = [""] * len(self.act_names)
+        self.section_titles = np.array([str(title or "") for title in section_titles], dtype=object)
+
+    def __len__(self) -> int:
+        return len(self.act_names)
+
+    @classmethod
+    def from_metadatas(cls, metadatas: Sequence[Optional[Dict[str, Any]]]) -> "MetadataColumns":
+        metadatas = [metadata or {} for metadata in metadatas]
+        return cls(
+            [metadata.get("act_name", "") for metadata in metadatas],
+            [metadata.get("section_number", "") for metadata in metadatas],
+            [metadata.get("chunk_index", 0) for metadata in metadatas],
+            [metadata.get("section_title", "") for metadata in metadatas],
+        )
+
+    def save(self, directory: str, index_version: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        payload = {
+            "index_version": index_version,
+            "act_names": self.act_names.tolist(),
+            "section_numbers": self.section_numbers.tolist(),
+            "chunk_indexes": self.chunk_indexes.tolist(),
+            "section_titles": self.section_titles.tolist(),
+        }
+        with open(os.path.join(directory, COLUMNS_FILE), "w", encoding="utf-8") as file:
+            json.dump(payload, file)
+
+    @classmethod
+    def load(cls, directory: str, index_version: str, record_count: int) -> Optional["MetadataColumns"]:
+        """Columns saved for ``index_version``, or ``None`` if missing or stale."""
+        path = os.path.join(directory, COLUMNS_FILE)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                payload = json.load(file)
+            if payload.get("index_version") != index_version:
+                return None
+            columns = cls(
+                payload["act_names"],
+                payload["section_numbers"],
+                payload["chunk_indexes"],
+                payload["section_titles"],
+            )
+        except (OSError, ValueError, KeyError) as error:
+            logger.warning("Unable to load filter columns from %s: %s", directory, error)
+            return None
+
+        return columns if len(columns) == record_count else None
+
+
+class MetadataFilter:
+    """Restricts retrieval to an act, a set or range of sections and/or chunk indexes.
+
+    Built from a mapping such as ``{"act_name": "BNS", "section_number":
+    {"$gte": 300, "$lte": 320}, "chunk_index": 0}``. ``act_name`` and
+    ``chunk_index`` accept one value or a list; ``section_number`` accepts
+    exact section numbers or an inclusive numeric range.
+    """
+
+    FIELDS = ("act_name", "section_number", "chunk_index")
+
+    def __init__(
+        self,
+        act_names: Optional[Sequence[str]] = None,
+        section_numbers: Optional[Sequence[str]] = None,
+        section_range: Optional[Tuple[Optional[float], Optional[float]]] = None,
+        chunk_indexes: Optional[Sequence[int]] = None,
+    ):
+        self.act_names = tuple(sorted({str(name) for name in act_names})) if act_names else None
+        self.section_numbers = tuple(sorted({str(number).strip() for number in section_numbers})) if section_numbers else None
+        self.section_range = section_range
+        self.chunk_indexes = tuple(sorted({int(index) for index in chunk_indexes})) if chunk_indexes else None
+
+    @classmethod
+    def parse(cls, filters: Optional[Any]) -> Optional["MetadataFilter"]:
+        if filters is None or isinstance(filters, MetadataFilter):
+            return filters
+        if not isinstance(filters, dict):
+            raise ValueError("Retrieval filters must be a mapping")
+
+        unknown = set(filters) - set(cls.FIELDS)
+        if unknown:
+            raise ValueError(f"Unsupported retrieval filter fields: {', '.join(sorted(unknown))}")
+
+        section_numbers = None
+        section_range = None
+        section = filters.get("section_number")
+        if isinstance(section, dict):
+            if not section or set(section) - set(_RANGE_OPERATORS):
+                raise ValueError("section_number ranges support only $gte and $lte")
+            bounds = [section.get(operator) for operator in _RANGE_OPERATORS]
+            section_range = tuple(None if bound is None else float(bound) for bound in bounds)
+        elif section is not None:
+            section_numbers = _as_tuple(section)
+
+        act_name = filters.get("act_name")
+        chunk_index = filters.get("chunk_index")
+        metadata_filter = cls(
+            act_names=_as_tuple(act_name) if act_name is not None else None,
+            section_numbers=section_numbers,
+            section_range=section_range,
+            chunk_indexes=_as_tuple(chunk_index) if chunk_index is not None else None,
+        )
+        return None if metadata_filter.is_empty() else metadata_filter
+
+    def is_empty(self) -> bool:
+        return not (self.act_names or self.section_numbers or self.section_range or self.chunk_indexes)
+
+    def cache_key(self) -> Tuple[Any, ...]:
+        return (self.act_names, self.section_numbers, self.section_range, self.chunk_indexes)
+
+    def mask(self, columns: MetadataColumns) -> np.ndarray:
+        """Boolean bitmap over record positions that satisfy the filter."""
+        allowed = np.ones(len(columns), dtype=bool)
+        if self.act_names:
+            allowed &= np.isin(columns.act_names, self.act_names)
+        if self.section_numbers:
+            allowed &= np.isin(columns.section_numbers, self.section_numbers)
+        if self.section_range:
+            lower, upper = self.section_range
+            # NaN compares False, so sections without a number never match a range.
+            if lower is not None:
+                allowed &= columns.section_values >= lower
+            if upper is not None:
+                allowed &= columns.section_values <= upper
+        if self.chunk_indexes:
+            allowed &= np.isin(columns.chunk_indexes, self.chunk_indexes)
+        return allowed
+
+    def where(self, columns: MetadataColumns, allowed: np.ndarray) -> Dict[str, Any]:
+        """Equivalent Chroma ``where`` clause.
+
+        Section numbers are stored as strings, so a numeric range is sent as
+        the ``$in`` list of matching section numbers found in ``columns``.
+        """
+        clauses: List[Dict[str, Any]] = []
+        if self.act_names:
+            clauses.append({"act_name": {"$in": list(self.act_names)}})
+        if self.section_numbers or self.section_range:
+            sections = sorted(set(columns.section_numbers[allowed].tolist()))
+            clauses.append({"section_number": {"$in": sections}})
+        if self.chunk_indexes:
+            clauses.append({"chunk_index": {"$in": list(self.chunk_indexes)}})
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
@@ -0,0 +1,77 @@
+from typing import NamedTuple
+
+import numpy as np
+
+
+FUSION_METHODS = ("probabilistic_or", "weighted", "rrf")
+
+
+class FusedCandidates(NamedTuple):
+    """Parallel arrays over the union of both candidate lists.
+
+    ``order`` indexes the other arrays from best to worst candidate.
+    """
+
+    positions: np.ndarray
+    scores: np.ndarray
+    vector_scores: np.ndarray
+    bm25_scores: np.ndarray
+    has_vector: np.ndarray
+    order: np.ndarray
+
+
+def _ranks(scores: np.ndarray) -> np.ndarray:
+    ranks = np.empty(scores.size, dtype=np.float64)
+    ranks[np.argsort(-scores, kind="stable")] = np.arange(1, scores.size + 1)
+    return ranks
+
+
+def fuse(
+    vector_positions: np.ndarray,
+    vector_scores: np.ndarray,
+    bm25_positions: np.ndarray,
+    bm25_scores: np.ndarray,
+    method: str = "probabilistic_or",
+    vector_weight: float = 0.5,
+    rrf_k: int = 60,
+) -> FusedCandidates:
+    """Fuse vector similarities and normalised BM25 scores keyed by record position.
+
+    Every method yields scores in ``[0, 1]`` so one relevance threshold works
+    for all of them; RRF is divided by its best possible value, ``2 / (rrf_k + 1)``.
+    Ties are broken by vector score, then BM25 score, then position.
+    """
+    if method not in FUSION_METHODS:
+        raise ValueError(f"Unsupported fusion method: {method}")
+
+    vector_positions = np.asarray(vector_positions, dtype=np.int64)
+    bm25_positions = np.asarray(bm25_positions, dtype=np.int64)
+    vector_scores = np.asarray(vector_scores, dtype=np.float64)
+    bm25_scores = np.asarray(bm25_scores, dtype=np.float64)
+
+    positions = np.union1d(vector_positions, bm25_positions)
+    vector_slots = np.searchsorted(positions, vector_positions)
+    bm25_slots = np.searchsorted(positions, bm25_positions)
+
+    vector_component = np.zeros(positions.size)
+    vector_component[vector_slots] = vector_scores
+    bm25_component = np.zeros(positions.size)
+    bm25_component[bm25_slots] = bm25_scores
+    has_vector = np.zeros(positions.size, dtype=bool)
+    has_vector[vector_slots] = True
+
+    if method == "rrf":
+        fused = np.zeros(positions.size)
+        np.add.at(fused, vector_slots, 1.0 / (rrf_k + _ranks(vector_scores)))
+        np.add.at(fused, bm25_slots, 1.0 / (rrf_k + _ranks(bm25_scores)))
+        fused /= 2.0 / (rrf_k + 1.0)
+    else:
+        vector_clipped = np.clip(vector_component, 0.0, 1.0)
+        bm25_clipped = np.clip(bm25_component, 0.0, 1.0)
+        if method == "weighted":
+            fused = vector_weight * vector_clipped + (1.0 - vector_weight) * bm25_clipped
+        else:
+            fused = 1.0 - ((1.0 - vector_clipped) * (1.0 - bm25_clipped))
+
+    order = np.lexsort((-bm25_component, -vector_component, -fused))
+    return FusedCandidates(positions, fused, vector_component, bm25_component, has_vector, order)
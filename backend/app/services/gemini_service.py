@@ -1,11 +1,10 @@
 import hashlib
 import logging
+import os
 import sqlite3
 import time
 from functools import wraps
 
-from google import genai
-
 try:
     from backend.app.core.config import settings
 except ModuleNotFoundError:
@@ -51,6 +50,7 @@ def _with_retry(max_attempts: int, base_delay: float):
 class _ResponseCache:
     def __init__(self, db_path: str, ttl_seconds: int) -> None:
         self._ttl = ttl_seconds
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
         self._conn = sqlite3.connect(db_path, check_same_thread=False)
         self._conn.execute(
             """
@@ -109,6 +109,8 @@ class GeminiService:
             logger.error("GEMINI_API_KEY not found in configuration.")
             self.client = None
         else:
+            from google import genai
+
             self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
 
         self.generation_model = settings.GENERATION_MODEL
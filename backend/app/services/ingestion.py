@@ -1,20 +1,29 @@
 import csv
+import hashlib
 import json
 import logging
 import os
 import re
-from typing import Dict, List
-
-import chromadb
+from typing import Dict, List, Optional
 
 try:
     from backend.app.core.config import settings
+    from backend.app.services.bm25 import BM25Index
+    from backend.app.services.embedding_pool import embed_documents_parallel
     from backend.app.services.embeddings import InLegalBERTEmbeddingService
+    from backend.app.services.filters import MetadataColumns
+    from backend.app.services.query_expansion import QueryExpansions
+    from backend.app.services.vector_index import FlatVectorIndex
 except ModuleNotFoundError as error:
     if not (error.name or "").startswith("backend"):
         raise
     from app.core.config import settings
+    from app.services.bm25 import BM25Index
+    from app.services.embedding_pool import embed_documents_parallel
     from app.services.embeddings import InLegalBERTEmbeddingService
+    from app.services.filters import MetadataColumns
+    from app.services.query_expansion import QueryExpansions
+    from app.services.vector_index import FlatVectorIndex
 
 
 logger = logging.getLogger(__name__)
@@ -239,7 +248,6 @@ def build_chunks(sections: List[Dict[str, str]]) -> List[Dict[str, object]]:
         section_number = section["section_number"]
         section_title = section["section_title"]
         full_text = section["full_text"]
-        plain_language = section.get("plain_language", "")
 
         chunks = _chunk_text(
             full_text,
@@ -248,10 +256,9 @@ def build_chunks(sections: List[Dict[str, str]]) -> List[Dict[str, object]]:
         ) or [full_text]
 
         for chunk_index, chunk_text in enumerate(chunks):
-            # Append plain-language synonyms to the first chunk only so the
-            # embedding captures colloquial search terms without bloating every chunk.
-            suffix = f" [also known as: {plain_language}]" if plain_language and chunk_index == 0 else ""
-            document = f"{act_name} Section {section_number}: {section_title}. {chunk_text}{suffix}".strip()
+            # plain_language synonyms are not indexed here; they become a
+            # query-side expansion table (see QueryExpansions).
+            document = f"{act_name} Section {section_number}: {section_title}. {chunk_text}".strip()
             chunked_rows.append(
                 {
                     "id": f"{_sanitize_id(act_name)}_{_sanitize_id(section_number)}_{chunk_index}",
@@ -260,7 +267,6 @@ def build_chunks(sections: List[Dict[str, str]]) -> List[Dict[str, object]]:
                         "act_name": act_name,
                         "section_number": str(section_number),
                         "section_title": section_title,
-                        "full_text": full_text,
                         "chunk_index": chunk_index,
                     },
                 }
@@ -269,6 +275,18 @@ def build_chunks(sections: List[Dict[str, str]]) -> List[Dict[str, object]]:
     return chunked_rows
 
 
+def _index_version(chunk_rows: List[Dict[str, object]], expansions: Optional[QueryExpansions] = None) -> str:
+    digest = hashlib.sha256()
+    for row in chunk_rows:
+        digest.update(str(row["id"]).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(str(row["document"]).encode("utf-8"))
+        digest.update(b"\0")
+    if expansions is not None and len(expansions):
+        digest.update(json.dumps(expansions.table, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
 def ingest_legal_corpus(data_path: str | None = None) -> int:
     target_data_path = data_path or settings.BNS_DATA_PATH
     logger.info("Loading legal corpus from %s", target_data_path)
@@ -280,9 +298,20 @@ def ingest_legal_corpus(data_path: str | None = None) -> int:
     chunk_rows = build_chunks(sections)
     if not chunk_rows:
         raise ValueError("No chunked documents generated from legal corpus.")
+    expansions = QueryExpansions.from_sections(sections)
+
+    documents = [row["document"] for row in chunk_rows]
+    if settings.INGEST_EMBEDDING_WORKERS > 1:
+        embeddings = embed_documents_parallel(
+            documents,
+            workers=settings.INGEST_EMBEDDING_WORKERS,
+            threads=settings.INGEST_EMBEDDING_THREADS,
+            shard_size=settings.INGEST_EMBEDDING_SHARD_SIZE,
+        )
+    else:
+        embeddings = InLegalBERTEmbeddingService().embed_documents(documents)
 
-    embedding_service = InLegalBERTEmbeddingService()
-    embeddings = embedding_service.embed_documents([row["document"] for row in chunk_rows])
+    import chromadb
 
     os.makedirs(settings.VECTOR_STORE_DIR, exist_ok=True)
     client = chromadb.PersistentClient(path=settings.VECTOR_STORE_DIR)
@@ -294,9 +323,10 @@ def ingest_legal_corpus(data_path: str | None = None) -> int:
     except Exception as error:
         logger.warning("Collection cleanup warning: %s", error)
 
+    index_version = _index_version(chunk_rows, expansions)
     collection = client.create_collection(
         name=settings.COLLECTION_NAME,
-        metadata={"hnsw:space": "cosine"},
+        metadata={"hnsw:space": "cosine", "index_version": index_version},
     )
     collection.add(
         ids=[row["id"] for row in chunk_rows],
@@ -305,5 +335,31 @@ def ingest_legal_corpus(data_path: str | None = None) -> int:
         embeddings=embeddings,
     )
 
+    BM25Index(chunk_rows, max_edit_distance=settings.BM25_MAX_EDIT_DISTANCE).save(
+        settings.LEXICAL_INDEX_DIR,
+        index_version=index_version,
+        record_ids=[row["id"] for row in chunk_rows],
+    )
+    MetadataColumns.from_metadatas([row["metadata"] for row in chunk_rows]).save(
+        settings.LEXICAL_INDEX_DIR,
+        index_version,
+    )
+    expansions.save(settings.LEXICAL_INDEX_DIR, index_version)
+    logger.info(
+        "Wrote BM25 snapshot %s with %s query expansions to %s",
+        index_version,
+        len(expansions),
+        settings.LEXICAL_INDEX_DIR,
+    )
+
+    FlatVectorIndex.save(
+        settings.FLAT_INDEX_DIR,
+        embeddings,
+        index_version=index_version,
+        record_ids=[row["id"] for row in chunk_rows],
+        pca_dimension=settings.FLAT_INDEX_PCA_DIM,
+    )
+    logger.info("Wrote flat vector index %s to %s", index_version, settings.FLAT_INDEX_DIR)
+
     logger.info("Ingestion completed. Indexed %s chunks.", collection.count())
     return collection.count()
@@ -0,0 +1,231 @@
+import json
+import logging
+import os
+import re
+import shutil
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the exported graph or manifest layout changes.
+ONNX_FORMAT_VERSION = 1
+_MANIFEST_FILE = "export.json"
+_MODEL_FILE = "model.onnx"
+_QUANTIZED_MODEL_FILE = "model.int8.onnx"
+# Compared between torch and ONNX right after export.
+PARITY_TEXTS = (
+    "Whoever intending to take dishonestly any movable property out of the possession of any person commits theft.",
+    "someone stole my mobile phone at the bus stop",
+    "Punishment for murder.",
+    "my husband and his relatives harass me for dowry",
+)
+
+
+def export_directory(cache_dir: str, model_name: str) -> str:
+    """Where the ONNX export of ``model_name`` lives under the model cache."""
+    return os.path.join(cache_dir, "onnx", re.sub(r"[^A-Za-z0-9_.-]+", "--", model_name))
+
+
+def parity(reference: np.ndarray, candidate: np.ndarray) -> float:
+    """Lowest cosine similarity between matching rows of two embedding matrices."""
+    reference = np.asarray(reference, dtype=np.float64)
+    candidate = np.asarray(candidate, dtype=np.float64)
+    norms = np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    similarities = np.einsum("ij,ij->i", reference, candidate) / np.maximum(norms, 1e-12)
+    return float(similarities.min()) if similarities.size else 1.0
+
+
+def read_manifest(directory: str) -> Optional[Dict[str, Any]]:
+    path = os.path.join(directory, _MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            manifest = json.load(file)
+    except (OSError, ValueError) as error:
+        logger.warning("Unable to read ONNX export manifest %s: %s", path, error)
+        return None
+    return manifest if manifest.get("format_version") == ONNX_FORMAT_VERSION else None
+
+
+def _pooled_module(transformer, input_names: Sequence[str]):
+    """Wrap a Hugging Face encoder with mean pooling and L2 normalisation."""
+    import torch
+
+    class _MeanPooledEncoder(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, *inputs):
+            features = dict(zip(input_names, inputs))
+            token_embeddings = self.transformer(**features).last_hidden_state
+            mask = features["attention_mask"].unsqueeze(-1).to(token_embeddings.dtype)
+            pooled = (token_embeddings * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            return torch.nn.functional.normalize(pooled, p=2, dim=1)
+
+    return _MeanPooledEncoder().eval()
+
+
+def export_sentence_model(sentence_model, model_name: str, directory: str, quantize: bool) -> Dict[str, Any]:
+    """Export a mean-pooling SentenceTransformer to ONNX (plus an int8 copy if asked).
+
+    The export is written to a staging directory and swapped in, and the
+    manifest records the torch/ONNX parity measured on ``PARITY_TEXTS``.
+    """
+    import torch
+
+    staging_directory = f"{directory}.tmp"
+    shutil.rmtree(staging_directory, ignore_errors=True)
+    os.makedirs(staging_directory)
+
+    tokenizer = sentence_model.tokenizer
+    sample = tokenizer(list(PARITY_TEXTS[:2]), padding=True, truncation=True, return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    module = _pooled_module(sentence_model[0].auto_model, input_names)
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["sentence_embedding"] = {0: "batch"}
+    with torch.no_grad():
+        torch.onnx.export(
+            module,
+            tuple(sample[name] for name in input_names),
+            os.path.join(staging_directory, _MODEL_FILE),
+            input_names=input_names,
+            output_names=["sentence_embedding"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+        )
+    tokenizer.save_pretrained(staging_directory)
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(
+            os.path.join(staging_directory, _MODEL_FILE),
+            os.path.join(staging_directory, _QUANTIZED_MODEL_FILE),
+            weight_type=QuantType.QInt8,
+        )
+
+    reference = sentence_model.encode(list(PARITY_TEXTS), normalize_embeddings=True, convert_to_numpy=True)
+    manifest = {
+        "format_version": ONNX_FORMAT_VERSION,
+        "model_name": model_name,
+        "max_seq_length": int(sentence_model.max_seq_length or 512),
+        "quantized": quantize,
+        "parity": {},
+    }
+    for variant in ("fp32", "int8") if quantize else ("fp32",):
+        encoder = OnnxSentenceEncoder(staging_directory, quantized=variant == "int8", manifest=manifest)
+        manifest["parity"][variant] = parity(reference, encoder.encode(list(PARITY_TEXTS)))
+
+    with open(os.path.join(staging_directory, _MANIFEST_FILE), "w", encoding="utf-8") as file:
+        json.dump(manifest, file)
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(staging_directory, directory)
+    return manifest
+
+
+def load_onnx_encoder(
+    model_name: str,
+    cache_dir: str,
+    quantize: bool,
+    min_parity: float,
+    load_reference: Callable[[], Any],
+    threads: int = 0,
+) -> Optional["OnnxSentenceEncoder"]:
+    """ONNX encoder for ``model_name``, exporting it on first use.
+
+    ``load_reference`` returns the torch SentenceTransformer and is only
+    called when no usable export exists. Returns ``None`` when the export's
+    parity with torch is below ``min_parity``.
+    """
+    directory = export_directory(cache_dir, model_name)
+    manifest = read_manifest(directory)
+    if (
+        manifest is None
+        or manifest.get("model_name") != model_name
+        or (quantize and not manifest.get("quantized"))
+    ):
+        logger.info("Exporting %s to ONNX under %s (int8=%s)", model_name, directory, quantize)
+        manifest = export_sentence_model(load_reference(), model_name, directory, quantize)
+
+    variant = "int8" if quantize else "fp32"
+    score = manifest.get("parity", {}).get(variant, 0.0)
+    if score < min_parity:
+        logger.warning(
+            "ONNX %s export of %s has cosine parity %.4f < %.4f with torch; not using it.",
+            variant,
+            model_name,
+            score,
+            min_parity,
+        )
+        return None
+
+    logger.info("Using ONNX %s embeddings for %s (parity %.4f)", variant, model_name, score)
+    return OnnxSentenceEncoder(directory, quantized=quantize, threads=threads, manifest=manifest)
+
+
+class OnnxSentenceEncoder:
+    """Runs an exported encoder with ONNX Runtime behind ``SentenceTransformer.encode``.
+
+    Pooling and normalisation are part of the graph, so embeddings are
+    always L2-normalised float32 whatever ``normalize_embeddings`` says.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        quantized: bool = False,
+        threads: int = 0,
+        manifest: Optional[Dict[str, Any]] = None,
+    ):
+        import onnxruntime
+        from transformers import AutoTokenizer
+
+        manifest = manifest or read_manifest(directory) or {}
+        self.max_seq_length = int(manifest.get("max_seq_length", 512))
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        model_file = _QUANTIZED_MODEL_FILE if quantized else _MODEL_FILE
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(directory, model_file),
+            options,
+            providers=["CPUExecutionProvider"],
+        )
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+        self.tokenizer = AutoTokenizer.from_pretrained(directory)
+
+    def encode(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        normalize_embeddings: bool = True,
+        convert_to_numpy: bool = True,
+        show_progress_bar: bool = False,
+    ) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        # Like SentenceTransformer, batch texts of similar length to limit padding.
+        order = np.argsort([-len(text) for text in texts], kind="stable")
+        batches: List[np.ndarray] = []
+        for start in range(0, len(texts), max(1, batch_size)):
+            batch = [texts[index] for index in order[start:start + batch_size]]
+            features = self.tokenizer(
+                batch,
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            feeds = {name: np.asarray(features[name], dtype=np.int64) for name in self.input_names}
+            batches.append(self.session.run(None, feeds)[0])
+
+        embeddings = np.empty((len(texts), batches[0].shape[1]), dtype=np.float32)
+        embeddings[order] = np.concatenate(batches)
+        return embeddings
@@ -0,0 +1,128 @@
+import json
+import logging
+import os
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from backend.app.services.bm25 import tokenize_text
+except ModuleNotFoundError as error:
+    if not (error.name or "").startswith("backend"):
+        raise
+    from app.services.bm25 import tokenize_text
+
+
+logger = logging.getLogger(__name__)
+
+EXPANSIONS_FILE = "query_expansions.json"
+_PHRASE_SEPARATORS = re.compile(r"[,;|]")
+# Title words that say nothing about the offence.
+_STOPWORDS = frozenset({
+    "a", "an", "and", "any", "as", "at", "be", "by", "for", "from", "her", "his", "in", "is",
+    "it", "non", "of", "on", "or", "the", "to", "under", "with",
+})
+# Relative weight of a section's number token and of each of its title terms.
+_SECTION_NUMBER_SHARE = 1.0
+_TITLE_TERM_SHARE = 0.5
+
+
+def _content_terms(text: str) -> List[str]:
+    return [term for term in tokenize_text(text) if len(term) > 2 and term not in _STOPWORDS]
+
+
+def synonym_phrases(plain_language: str) -> List[str]:
+    """Synonyms in a ``plain_language`` cell.
+
+    Comma, semicolon or pipe separated cells hold phrases; otherwise the
+    cell is a bag of words and every content word is a synonym.
+    """
+    text = plain_language or ""
+    if _PHRASE_SEPARATORS.search(text):
+        phrases = (" ".join(tokenize_text(phrase)) for phrase in _PHRASE_SEPARATORS.split(text))
+        return list(dict.fromkeys(phrase for phrase in phrases if phrase and phrase not in _STOPWORDS))
+    return list(dict.fromkeys(_content_terms(text)))
+
+
+class QueryExpansions:
+    """Plain-language synonym -> weighted section terms, applied to BM25 queries.
+
+    Built at ingestion from each section's ``plain_language`` cell so the
+    colloquial words no longer have to be appended to the indexed text. A
+    query containing a synonym gains the number and title terms of the
+    sections listing it, each capped at ``weight``, at most ``max_terms``.
+    """
+
+    def __init__(self, table: Dict[str, Dict[str, float]], weight: float = 0.5, max_terms: int = 8):
+        self.table = table
+        self.weight = weight
+        self.max_terms = max_terms
+        self._max_phrase_length = max((len(phrase.split()) for phrase in table), default=0)
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __contains__(self, phrase: str) -> bool:
+        return phrase in self.table
+
+    @classmethod
+    def from_sections(cls, sections: Sequence[Dict[str, Any]], **options: Any) -> "QueryExpansions":
+        targets: Dict[str, List[Dict[str, float]]] = {}
+        for section in sections:
+            phrases = synonym_phrases(section.get("plain_language", ""))
+            if not phrases:
+                continue
+            shares = {term: _TITLE_TERM_SHARE for term in _content_terms(section.get("section_title", ""))}
+            number_terms = tokenize_text(str(section.get("section_number", "")))
+            if number_terms:
+                shares[number_terms[0]] = _SECTION_NUMBER_SHARE
+            for phrase in phrases:
+                targets.setdefault(phrase, []).append(shares)
+
+        table: Dict[str, Dict[str, float]] = {}
+        for phrase, section_shares in targets.items():
+            # A synonym listed by several sections splits its weight between them.
+            combined: Dict[str, float] = {}
+            for shares in section_shares:
+                for term, share in shares.items():
+                    combined[term] = combined.get(term, 0.0) + share / len(section_shares)
+            table[phrase] = {term: round(share, 4) for term, share in sorted(combined.items())}
+        return cls(table, **options)
+
+    def save(self, directory: str, index_version: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, EXPANSIONS_FILE), "w", encoding="utf-8") as file:
+            json.dump({"index_version": index_version, "synonyms": self.table}, file)
+
+    @classmethod
+    def load(cls, directory: str, index_version: str, **options: Any) -> Optional["QueryExpansions"]:
+        """Expansions saved for ``index_version``, or ``None`` if missing or stale."""
+        path = os.path.join(directory, EXPANSIONS_FILE)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                payload = json.load(file)
+            if payload.get("index_version") != index_version:
+                return None
+            return cls(payload["synonyms"], **options)
+        except (OSError, ValueError, KeyError) as error:
+            logger.warning("Unable to load query expansions from %s: %s", directory, error)
+            return None
+
+    def expand(self, tokens: Sequence[str]) -> List[Tuple[str, float]]:
+        """Weighted expansion terms for a tokenised query, strongest first."""
+        if self.weight <= 0 or self.max_terms <= 0 or not self.table:
+            return []
+
+        weights: Dict[str, float] = {}
+        for start in range(len(tokens)):
+            for length in range(1, min(self._max_phrase_length, len(tokens) - start) + 1):
+                shares = self.table.get(" ".join(tokens[start:start + length]))
+                if not shares:
+                    continue
+                for term, share in shares.items():
+                    weights[term] = min(self.weight, weights.get(term, 0.0) + self.weight * share)
+
+        ranked = sorted(weights.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:self.max_terms]
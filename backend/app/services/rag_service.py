@@ -11,11 +11,22 @@ logger = logging.getLogger(__name__)
 class RAGService:
     def __init__(self):
         self.retriever = None
+        # Why the retriever could not be built; warm_up raises it.
+        self.retriever_error = None
         try:
             self.retriever = MultilingualLegalRetriever()
             logger.info("Multilingual retriever initialized successfully.")
         except Exception as e:
             logger.error(f"Error initializing multilingual retriever: {e}")
+            self.retriever_error = e
+
+    def warm_up(self):
+        """Load the models and run one query; errors are raised so start-up can fail."""
+        if self.retriever is None:
+            raise RuntimeError(f"Multilingual retriever is not available: {self.retriever_error}")
+
+        self.retriever.warm_up()
+        logger.info("Multilingual retriever warmed up.")
 
     def query_similar_documents(self, query_text: str, n_results=3):
         if self.retriever is None:
@@ -30,3 +41,19 @@ class RAGService:
         except Exception as e:
             logger.error(f"Error querying vector database: {e}")
             return []
+
+    async def query_similar_documents_async(self, query_text: str, n_results=3):
+        """Non-blocking :meth:`query_similar_documents` for async request handlers."""
+        if self.retriever is None:
+            logger.error("Vector database is not available.")
+            return []
+
+        try:
+            payload = await self.retriever.retrieve_async(query_text, k=n_results)
+            # retrieve_async loads the records on its pool, so this does no I/O.
+            return [item["document"] for item in payload.get("results", [])]
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error(f"Error querying vector database: {e}")
+            return []
@@ -0,0 +1,136 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from backend.app.core.config import settings
+except ModuleNotFoundError:
+    from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class CrossEncoderReranker:
+    """Re-orders the fused top-N with a local cross-encoder, within a time budget.
+
+    Scores are cached per ``(query, chunk_id)``. Uncached candidates are
+    scored in batches of at most ``batch_size``, shrunk to what the measured
+    time per pair says fits in the rest of ``budget_ms``; once no pair fits
+    the fused order is returned unchanged, and batches scored before the
+    deadline stay cached for the next identical query. Until a first batch
+    has been timed, that batch can overrun the budget.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        budget_ms: int,
+        batch_size: int = 8,
+        cache_size: int = 4096,
+    ):
+        self.model_name = model_name
+        self.budget_ms = budget_ms
+        self.batch_size = max(1, batch_size)
+        self._cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._unavailable = False
+        # Seconds per scored pair in the latest batch; 0 until one is timed.
+        self._seconds_per_pair = 0.0
+
+    def load(self):
+        """Load the cross-encoder on CPU; ``None`` if sentence-transformers is missing."""
+        if self._model is not None or self._unavailable:
+            return self._model
+
+        with self._model_lock:
+            if self._model is None and not self._unavailable:
+                try:
+                    from sentence_transformers import CrossEncoder
+                except ImportError as error:
+                    logger.warning("Cross-encoder rerank disabled: %s", error)
+                    self._unavailable = True
+                    return None
+                cache_dir = os.path.expanduser(settings.MODEL_CACHE_DIR)
+                logger.info("Loading rerank model %s on cpu", self.model_name)
+                self._model = CrossEncoder(self.model_name, device="cpu", cache_folder=cache_dir)
+        return self._model
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._cache.clear()
+
+    def _cached(self, key: Tuple[str, str]) -> Optional[float]:
+        with self._cache_lock:
+            score = self._cache.get(key)
+            if score is not None:
+                self._cache.move_to_end(key)
+            return score
+
+    def _remember(self, scores: Dict[Tuple[str, str], float]) -> None:
+        if self._cache_size <= 0:
+            return
+        with self._cache_lock:
+            for key, score in scores.items():
+                self._cache[key] = score
+                self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    def rerank(self, query: str, candidates: Sequence[Any]) -> Tuple[List[Any], bool]:
+        """Return ``(candidates, reranked)``; order is unchanged when not reranked.
+
+        Candidates need ``id`` and ``document`` attributes; reranked ones get
+        their ``rerank_score`` set.
+        """
+        candidates = list(candidates)
+        if len(candidates) < 2:
+            return candidates, False
+
+        model = self.load()
+        if model is None:
+            return candidates, False
+
+        started = time.perf_counter()
+        keys = [(query, str(candidate.id or candidate.document)) for candidate in candidates]
+        scores = {key: self._cached(key) for key in keys}
+        pending = [index for index, key in enumerate(keys) if scores[key] is None]
+
+        start = 0
+        while start < len(pending):
+            remaining = self.budget_ms / 1000.0 - (time.perf_counter() - started)
+            size = self.batch_size
+            if self._seconds_per_pair > 0:
+                size = min(size, int(remaining / self._seconds_per_pair))
+            if remaining <= 0 or size < 1:
+                logger.info(
+                    "Rerank budget of %sms exhausted after %s/%s candidates; keeping fused order.",
+                    self.budget_ms,
+                    start,
+                    len(pending),
+                )
+                return candidates, False
+
+            batch = pending[start:start + size]
+            batch_started = time.perf_counter()
+            batch_scores = model.predict(
+                [(query, candidates[index].document) for index in batch],
+                batch_size=self.batch_size,
+                show_progress_bar=False,
+            )
+            self._seconds_per_pair = (time.perf_counter() - batch_started) / len(batch)
+            start += len(batch)
+            fresh = {keys[index]: float(score) for index, score in zip(batch, batch_scores)}
+            self._remember(fresh)
+            scores.update(fresh)
+
+        for candidate, key in zip(candidates, keys):
+            candidate.rerank_score = scores[key]
+        # Stable sort keeps the fused order among equal cross-encoder scores.
+        return sorted(candidates, key=lambda candidate: -candidate.rerank_score), True
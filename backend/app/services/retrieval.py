@@ -1,25 +1,46 @@
+import asyncio
 import json
 import logging
-import math
-from collections import Counter, defaultdict
 import re
-from typing import Any, Dict, List
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
-import chromadb
+import numpy as np
 
 try:
     from backend.app.core.config import settings
+    from backend.app.services.bm25 import BM25Index
     from backend.app.services.embeddings import InLegalBERTEmbeddingService
+    from backend.app.services.filters import MetadataColumns, MetadataFilter
+    from backend.app.services.fusion import fuse
+    from backend.app.services.query_expansion import QueryExpansions
+    from backend.app.services.rerank import CrossEncoderReranker
+    from backend.app.services.section_lookup import SectionIndex
+    from backend.app.services.vector_index import FlatVectorIndex
 except ModuleNotFoundError as error:
     if not (error.name or "").startswith("backend"):
         raise
     from app.core.config import settings
+    from app.services.bm25 import BM25Index
     from app.services.embeddings import InLegalBERTEmbeddingService
+    from app.services.filters import MetadataColumns, MetadataFilter
+    from app.services.fusion import fuse
+    from app.services.query_expansion import QueryExpansions
+    from app.services.rerank import CrossEncoderReranker
+    from app.services.section_lookup import SectionIndex
+    from app.services.vector_index import FlatVectorIndex
 
 
 logger = logging.getLogger(__name__)
 
 ENGLISH_QUERY_PATTERN = re.compile(r"^[A-Za-z0-9\s.,!?;:'\"()\[\]{}\-_/&%+*=<>@#$`~|\\]+$")
+# Distinct filters whose record bitmap and Chroma clause are kept around.
+_MAX_FILTER_SCOPES = 256
+# Metadata that older ingestions copied into every chunk but nothing reads back.
+_HEAVY_METADATA_FIELDS = frozenset({"full_text"})
 
 
 def _normalize_query(query: str) -> str:
@@ -28,95 +49,290 @@ def _normalize_query(query: str) -> str:
     return text
 
 
-def _tokenize_text(text: str) -> List[str]:
-    return re.findall(r"[A-Za-z0-9]+", (text or "").lower())
+def _candidate_pool_size(k: int) -> int:
+    return max(k * 4, 20)
 
 
-def _normalize_scores(scores: List[float]) -> List[float]:
-    if not scores:
-        return []
+def _empty_payload(query: str, normalized_query: str) -> Dict[str, Any]:
+    return {
+        "query": query,
+        "normalized_query": normalized_query,
+        "results": [],
+    }
 
-    maximum = max(scores)
-    minimum = min(scores)
-    if math.isclose(maximum, minimum):
-        return [1.0 if score > 0 else 0.0 for score in scores]
 
-    denominator = maximum - minimum
-    return [(score - minimum) / denominator for score in scores]
+def _result_row(raw_results: Dict[str, Any], field: str, row: int) -> List[Any]:
+    rows = raw_results.get(field) or []
+    return (rows[row] if row < len(rows) else None) or []
 
 
-def _combine_modalities(vector_score: float, bm25_score: float) -> float:
-    vector_component = max(0.0, min(1.0, vector_score))
-    bm25_component = max(0.0, min(1.0, bm25_score))
-    return 1.0 - ((1.0 - vector_component) * (1.0 - bm25_component))
+def _record_stage(timings: Optional[Dict[str, float]], stage: str, started: float) -> float:
+    now = time.perf_counter()
+    if timings is not None:
+        timings[stage] = now - started
+    return now
 
 
-class _BM25Index:
-    def __init__(self, records: List[Dict[str, Any]], k1: float = 1.5, b: float = 0.75):
-        self.records = records
-        self.k1 = k1
-        self.b = b
-        self.document_count = len(records)
-        self.document_lengths: List[int] = []
-        self.average_document_length = 0.0
-        self.document_frequencies: Counter[str] = Counter()
-        self.postings = defaultdict(list)
+def _lean_metadata(metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    return {key: value for key, value in (metadata or {}).items() if key not in _HEAVY_METADATA_FIELDS}
 
-        if not records:
+
+_branch_executor_instance: Optional[ThreadPoolExecutor] = None
+_branch_executor_lock = threading.Lock()
+
+
+def _branch_executor() -> ThreadPoolExecutor:
+    """Thread pool shared by every retriever for the dense and lexical branches."""
+    global _branch_executor_instance
+    if _branch_executor_instance is None:
+        with _branch_executor_lock:
+            if _branch_executor_instance is None:
+                _branch_executor_instance = ThreadPoolExecutor(
+                    max_workers=settings.RETRIEVAL_BRANCH_WORKERS,
+                    thread_name_prefix="retrieval-branch",
+                )
+    return _branch_executor_instance
+
+
+def _branch_deadline(started: float, timeout_ms: int) -> Optional[float]:
+    return started + timeout_ms / 1000.0 if timeout_ms > 0 else None
+
+
+async def _join_branch(future: "asyncio.Future", deadline: Optional[float], branch: str, normalized_query: str):
+    """Result of a retrieval branch, or ``None`` if it fails or misses ``deadline`` (event-loop time)."""
+    timeout = None if deadline is None else max(0.0, deadline - asyncio.get_running_loop().time())
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except asyncio.TimeoutError:
+        logger.warning(
+            "Retrieval %s branch timed out for query '%s'; continuing without it.",
+            branch,
+            normalized_query,
+        )
+        return None
+    except Exception as error:
+        logger.warning(
+            "Retrieval %s branch failed for query '%s'; continuing without it: %s",
+            branch,
+            normalized_query,
+            error,
+        )
+        return None
+
+
+def _resolve_records(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Load every result's document and metadata now rather than on first read."""
+    for result in payload["results"]:
+        if isinstance(result, RetrievalResult):
+            result._resolved()
+    return payload
+
+
+def _no_hits() -> Tuple[np.ndarray, np.ndarray]:
+    return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+
+
+class _ResultCache:
+    """Bounded LRU of retrieval results with an optional TTL (0 = never expire)."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._entries: "OrderedDict[Tuple[Any, ...], Tuple[float, Tuple[RetrievalResult, ...]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Tuple[Any, ...]) -> Optional[List["RetrievalResult"]]:
+        if self._max_entries <= 0:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._ttl > 0 and (time.monotonic() - entry[0]) > self._ttl:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            results = entry[1]
+
+        return list(results)
+
+    def set(self, key: Tuple[Any, ...], results: List["RetrievalResult"]) -> None:
+        if self._max_entries <= 0:
             return
 
-        total_length = 0
-        for index, record in enumerate(records):
-            tokens = _tokenize_text(str(record.get("document", "")))
-            term_frequencies = Counter(tokens)
-            document_length = len(tokens)
-            self.document_lengths.append(document_length)
-            total_length += document_length
+        with self._lock:
+            # Results are read-only, so entries can share them with callers.
+            self._entries[key] = (time.monotonic(), tuple(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self._max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
 
-            for term in term_frequencies:
-                self.document_frequencies[term] += 1
-            for term, frequency in term_frequencies.items():
-                self.postings[term].append((index, frequency))
 
-        self.average_document_length = total_length / self.document_count if self.document_count else 0.0
+class _CollectionRecords:
+    """Search records resolved from the vector store by position, on demand.
 
-    def score(self, query: str) -> List[float]:
-        if not self.records or not query:
-            return []
+    Used when the BM25 index comes from a snapshot, so startup does not have
+    to pull every document and metadata entry out of Chroma.
+    """
 
-        query_terms = Counter(_tokenize_text(query))
-        if not query_terms:
-            return [0.0 for _ in self.records]
+    def __init__(self, collection, ids: List[str]):
+        self.collection = collection
+        self.ids = ids
+        self._records: Dict[int, Dict[str, Any]] = {}
 
-        scores = [0.0 for _ in self.records]
-        average_length = self.average_document_length or 1.0
+    def __len__(self) -> int:
+        return len(self.ids)
 
-        for term, query_frequency in query_terms.items():
-            postings = self.postings.get(term)
-            if not postings:
-                continue
+    def __getitem__(self, position: int) -> Dict[str, Any]:
+        position = int(position)
+        if position not in self._records:
+            self.prefetch([position])
+        return self._records[position]
 
-            document_frequency = self.document_frequencies.get(term, 0)
-            if document_frequency <= 0:
-                continue
+    def remember(self, position: int, record: Dict[str, Any]) -> None:
+        self._records.setdefault(int(position), record)
 
-            inverse_document_frequency = math.log(
-                1.0 + ((self.document_count - document_frequency + 0.5) / (document_frequency + 0.5))
+    def prefetch(self, positions: Iterable[int]) -> None:
+        missing = sorted({int(position) for position in positions} - self._records.keys())
+        if not missing:
+            return
+
+        raw_records = self.collection.get(
+            ids=[self.ids[position] for position in missing],
+            include=["documents", "metadatas"],
+        )
+        ids = raw_records.get("ids", []) or []
+        documents = raw_records.get("documents", []) or []
+        metadatas = raw_records.get("metadatas", []) or []
+        by_id = {
+            item_id: (
+                documents[index] if index < len(documents) else "",
+                metadatas[index] if index < len(metadatas) else {},
             )
-            query_weight = ((query_frequency * 2.0) / (query_frequency + 1.0)) if query_frequency > 0 else 1.0
-
-            for document_index, term_frequency in postings:
-                document_length = self.document_lengths[document_index] or 1
-                denominator = term_frequency + self.k1 * (1.0 - self.b + self.b * (document_length / average_length))
-                if denominator <= 0:
-                    continue
-                scores[document_index] += (
-                    inverse_document_frequency
-                    * ((term_frequency * (self.k1 + 1.0)) / denominator)
-                    * query_weight
-                )
+            for index, item_id in enumerate(ids)
+        }
+
+        for position in missing:
+            document, metadata = by_id.get(self.ids[position], ("", {}))
+            self._records[position] = {
+                "id": self.ids[position],
+                "document": document or "",
+                "metadata": _lean_metadata(metadata),
+            }
 
-        return scores
+
+class _ResultRecords:
+    """Record lookups for one result list, fetched in a single batch on first use."""
+
+    def __init__(self, resolve, prefetch, positions: np.ndarray):
+        self._resolve = resolve
+        self._prefetch = prefetch
+        self._pending: Optional[np.ndarray] = positions
+
+    def get(self, position: int) -> Dict[str, Any]:
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            self._prefetch(pending)
+        return self._resolve(position)
+
+
+class RetrievalResult:
+    """One hybrid search hit whose ``document`` and ``metadata`` load lazily.
+
+    Read-only mapping access (``result["document"]``, ``result.get(...)``)
+    is kept for callers written against the former dict results.
+    """
+
+    __slots__ = (
+        "position",
+        "id",
+        "score",
+        "vector_score",
+        "bm25_score",
+        "rerank_score",
+        "distance",
+        "_records",
+        "_record",
+    )
+    FIELDS = ("id", "document", "metadata", "distance", "vector_score", "bm25_score", "rerank_score", "score")
+
+    def __init__(
+        self,
+        position: int,
+        item_id: Optional[str],
+        score: float,
+        vector_score: float,
+        bm25_score: float,
+        distance: Optional[float],
+        records: _ResultRecords,
+    ):
+        self.position = position
+        self.id = item_id
+        self.score = score
+        self.vector_score = vector_score
+        self.bm25_score = bm25_score
+        # Set by the cross-encoder stage when it reorders the fused list.
+        self.rerank_score: Optional[float] = None
+        self.distance = distance
+        self._records = records
+        self._record: Optional[Dict[str, Any]] = None
+
+    def _resolved(self) -> Dict[str, Any]:
+        if self._record is None:
+            self._record = self._records.get(self.position)
+        return self._record
+
+    @property
+    def document(self) -> str:
+        return self._resolved().get("document", "") or ""
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self._resolved().get("metadata", {}) or {}
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.FIELDS
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, RetrievalResult):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"RetrievalResult(id={self.id!r}, score={self.score:.4f})"
 
 
 def is_english(query: str) -> bool:
@@ -129,12 +345,222 @@ def is_english(query: str) -> bool:
 
 
 class MultilingualLegalRetriever:
+    # Set when VECTOR_BACKEND is "flat"; otherwise vector search goes to Chroma.
+    _vector_index: Optional[FlatVectorIndex] = None
+    _vector_positions: Optional[np.ndarray] = None
+    # Set when RERANK_ENABLED; reorders the fused top RERANK_TOP_N.
+    _reranker: Optional[CrossEncoderReranker] = None
+
     def __init__(self):
         self.embedding_service = InLegalBERTEmbeddingService()
+        if settings.RERANK_ENABLED:
+            self._reranker = CrossEncoderReranker(
+                settings.RERANK_MODEL,
+                settings.RERANK_BUDGET_MS,
+                batch_size=settings.RERANK_BATCH_SIZE,
+                cache_size=settings.RERANK_CACHE_SIZE,
+            )
+        import chromadb
+
         self.client = chromadb.PersistentClient(path=settings.VECTOR_STORE_DIR)
         self.collection = self.client.get_or_create_collection(name=settings.COLLECTION_NAME)
-        self._search_records = self._load_search_records()
-        self._bm25_index = _BM25Index(self._search_records)
+        index_version = self._collection_index_version()
+
+        snapshot = None
+        if index_version:
+            snapshot = BM25Index.load(settings.LEXICAL_INDEX_DIR, index_version)
+
+        if snapshot is not None:
+            bm25_index, record_ids = snapshot
+            logger.info("Loaded BM25 snapshot for index version %s", index_version)
+            self._index_records(
+                _CollectionRecords(self.collection, record_ids),
+                bm25_index,
+                index_version,
+                MetadataColumns.load(settings.LEXICAL_INDEX_DIR, index_version, len(record_ids)),
+            )
+        else:
+            logger.info("BM25 snapshot missing or stale; rebuilding from the vector store.")
+            self._index_records(self._load_search_records(), index_version=index_version)
+
+        if index_version:
+            self._attach_query_expansions(index_version)
+        if settings.VECTOR_BACKEND == "flat":
+            self._attach_flat_index(index_version)
+
+    def _attach_query_expansions(self, index_version: str) -> None:
+        expansions = QueryExpansions.load(
+            settings.LEXICAL_INDEX_DIR,
+            index_version,
+            weight=settings.QUERY_EXPANSION_WEIGHT,
+            max_terms=settings.QUERY_EXPANSION_MAX_TERMS,
+        )
+        if expansions is None:
+            logger.info("No query expansions saved for index version %s", index_version)
+            return
+        self._bm25_index.expansions = expansions
+        logger.info("Loaded %s plain-language query expansions", len(expansions))
+
+    def _attach_flat_index(self, index_version: Optional[str]) -> None:
+        snapshot = None
+        if index_version:
+            snapshot = FlatVectorIndex.load(
+                settings.FLAT_INDEX_DIR,
+                index_version,
+                settings.FLAT_INDEX_DTYPE,
+                pca_dimension=settings.FLAT_INDEX_PCA_DIM,
+                rescore_factor=settings.FLAT_INDEX_RESCORE_FACTOR,
+            )
+
+        if snapshot is None:
+            logger.info("Flat vector index missing or stale; loading embeddings from the vector store.")
+            try:
+                raw_records = self.collection.get(include=["embeddings"])
+            except Exception as error:
+                logger.warning("Unable to load embeddings for the flat vector backend: %s", error)
+                return
+            ids = list(raw_records.get("ids") or [])
+            embeddings = raw_records.get("embeddings")
+            if embeddings is None or not ids:
+                logger.warning("Vector store returned no embeddings; using Chroma for vector search.")
+                return
+            vector_index = FlatVectorIndex(
+                np.asarray(embeddings),
+                settings.FLAT_INDEX_DTYPE,
+                pca_dimension=settings.FLAT_INDEX_PCA_DIM,
+                rescore_factor=settings.FLAT_INDEX_RESCORE_FACTOR,
+            )
+            snapshot = (vector_index, ids)
+
+        vector_index, record_ids = snapshot
+        self._set_vector_index(vector_index, record_ids)
+        logger.info(
+            "Flat vector backend ready: %s vectors, %.1f MiB (%s)",
+            len(vector_index),
+            vector_index.nbytes / (1024 * 1024),
+            settings.FLAT_INDEX_DTYPE,
+        )
+
+    def _set_vector_index(self, vector_index: FlatVectorIndex, record_ids: Sequence[str]) -> None:
+        self._vector_index = vector_index
+        self._vector_positions = np.array(
+            [self._record_positions.get(record_id, -1) for record_id in record_ids],
+            dtype=np.int64,
+        )
+
+    def _collection_index_version(self) -> Optional[str]:
+        metadata = getattr(self.collection, "metadata", None)
+        if not isinstance(metadata, dict):
+            return None
+        version = metadata.get("index_version")
+        return str(version) if version else None
+
+    def _index_records(
+        self,
+        records: Sequence[Dict[str, Any]],
+        bm25_index: Optional[BM25Index] = None,
+        index_version: Optional[str] = None,
+        columns: Optional[MetadataColumns] = None,
+    ) -> None:
+        self._search_records = records
+        record_ids = (
+            records.ids
+            if isinstance(records, _CollectionRecords)
+            else [record.get("id") for record in records]
+        )
+        self._record_positions = {
+            record_id: position for position, record_id in enumerate(record_ids) if record_id
+        }
+        self._bm25_index = (
+            bm25_index
+            if bm25_index is not None
+            else BM25Index(records, max_edit_distance=settings.BM25_MAX_EDIT_DISTANCE)
+        )
+        self._interned_records: Dict[int, Dict[str, Any]] = {}
+        self._intern_lock = threading.Lock()
+        if columns is None and not isinstance(records, _CollectionRecords):
+            columns = MetadataColumns.from_metadatas([record.get("metadata") for record in records])
+        self._columns = columns
+        self._filter_scopes: Dict[Tuple[Any, ...], Tuple[np.ndarray, Dict[str, Any]]] = {}
+        self._section_index: Optional[SectionIndex] = None
+        # The version token is part of every result-cache key, and a new index
+        # also starts a fresh cache, so results never outlive a re-ingestion.
+        self._index_version = index_version or f"unversioned-{len(records)}"
+        self._result_cache = _ResultCache(settings.RETRIEVAL_CACHE_SIZE, settings.RETRIEVAL_CACHE_TTL_SECONDS)
+        if self._reranker is not None:
+            self._reranker.clear_cache()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return {"index_version": self._index_version, **self._result_cache.stats()}
+
+    def _cache_key(
+        self,
+        normalized_query: str,
+        k: int,
+        metadata_filter: Optional[MetadataFilter] = None,
+    ) -> Tuple[Any, ...]:
+        return (
+            normalized_query,
+            k,
+            metadata_filter.cache_key() if metadata_filter else None,
+            settings.MIN_RELEVANCE_SCORE,
+            settings.FUSION_METHOD,
+            settings.FUSION_VECTOR_WEIGHT,
+            settings.FUSION_RRF_K,
+            self._reranker.model_name if self._reranker is not None else None,
+            settings.RERANK_TOP_N,
+            self._index_version,
+        )
+
+    def _metadata_columns(self) -> MetadataColumns:
+        if self._columns is None:
+            # Snapshot without saved columns: fetch only the metadata, once.
+            records = self._search_records
+            raw_records = self.collection.get(ids=list(records.ids), include=["metadatas"])
+            by_id = dict(zip(raw_records.get("ids") or [], raw_records.get("metadatas") or []))
+            self._columns = MetadataColumns.from_metadatas([by_id.get(item_id) for item_id in records.ids])
+        return self._columns
+
+    def _filter_scope(self, metadata_filter: Optional[MetadataFilter]) -> Optional[Tuple[np.ndarray, Dict[str, Any]]]:
+        """Record bitmap and Chroma ``where`` clause for ``metadata_filter``."""
+        if metadata_filter is None:
+            return None
+
+        key = metadata_filter.cache_key()
+        scope = self._filter_scopes.get(key)
+        if scope is None:
+            columns = self._metadata_columns()
+            allowed = metadata_filter.mask(columns)
+            scope = (allowed, metadata_filter.where(columns, allowed))
+            if len(self._filter_scopes) >= _MAX_FILTER_SCOPES:
+                self._filter_scopes.clear()
+            self._filter_scopes[key] = scope
+        return scope
+
+    def _lookup_sections(
+        self,
+        normalized_query: str,
+        k: int,
+        allowed: Optional[np.ndarray] = None,
+    ) -> Optional[List[RetrievalResult]]:
+        """Results for direct section references and exact titles, else ``None``."""
+        if not settings.SECTION_LOOKUP_ENABLED:
+            return None
+        if self._section_index is None:
+            self._section_index = SectionIndex(self._metadata_columns())
+
+        positions = self._section_index.lookup(normalized_query)
+        if positions is not None and allowed is not None:
+            positions = positions[allowed[positions]]
+        if positions is None or not positions.size:
+            return None
+
+        positions = positions[:k]
+        records = _ResultRecords(self._record, self._prefetch_records, positions)
+        return [
+            RetrievalResult(position, self._record_id(position), 1.0, 0.0, 0.0, None, records)
+            for position in positions.tolist()
+        ]
 
     def _load_search_records(self) -> List[Dict[str, Any]]:
         try:
@@ -158,235 +584,614 @@ class MultilingualLegalRetriever:
                 {
                     "id": ids[index] if index < len(ids) else None,
                     "document": document,
-                    "metadata": metadatas[index] if index < len(metadatas) else {},
+                    "metadata": _lean_metadata(metadatas[index] if index < len(metadatas) else {}),
                 }
             )
 
         return records
 
-    def _collect_vector_candidates(self, query_embedding: List[float], k: int) -> List[Dict[str, Any]]:
-        candidate_pool_size = max(k * 4, 20)
+    def _record(self, position: int) -> Dict[str, Any]:
+        if position < len(self._search_records):
+            return self._search_records[position]
+        return self._interned_records[position]
+
+    def _intern_record(self, item_id: Optional[str], document: str, metadata: Optional[Dict[str, Any]]) -> int:
+        """Map a vector-store hit to an integer record position.
+
+        Hits outside the lexical corpus (e.g. when it failed to load) get
+        positions after the last search record, so fusion only ever sees ints.
+        """
+        key = str(item_id) if item_id else f"doc::{document}"
+        record = {"id": item_id, "document": document or "", "metadata": _lean_metadata(metadata)}
+        position = self._record_positions.get(key)
+        if position is not None:
+            if isinstance(self._search_records, _CollectionRecords) and position < len(self._search_records):
+                self._search_records.remember(position, record)
+            return position
+
+        with self._intern_lock:
+            position = self._record_positions.get(key)
+            if position is None:
+                position = len(self._search_records) + len(self._interned_records)
+                self._interned_records[position] = record
+                self._record_positions[key] = position
+        return position
+
+    def _collect_vector_candidates(
+        self,
+        query_embedding: List[float],
+        k: int,
+        scope: Optional[Tuple[np.ndarray, Dict[str, Any]]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        return self._collect_vector_candidates_many([query_embedding], k, scope)[0]
+
+    def _collect_vector_candidates_many(
+        self,
+        query_embeddings: List[List[float]],
+        k: int,
+        scope: Optional[Tuple[np.ndarray, Dict[str, Any]]] = None,
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """``(positions, similarities)`` per query embedding, best first."""
+        results = [_no_hits() for _ in query_embeddings]
+        active = [index for index, embedding in enumerate(query_embeddings) if embedding]
+        if not active:
+            return results
+
+        if self._vector_index is not None:
+            return self._collect_flat_vector_candidates(query_embeddings, active, results, k, scope)
+
+        query_arguments: Dict[str, Any] = {}
+        if scope is not None:
+            query_arguments["where"] = scope[1]
         raw_results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=candidate_pool_size,
+            query_embeddings=[query_embeddings[index] for index in active],
+            n_results=_candidate_pool_size(k),
             include=["documents", "metadatas", "distances"],
+            **query_arguments,
         )
 
-        documents = raw_results.get("documents", [[]])[0]
-        metadatas = raw_results.get("metadatas", [[]])[0]
-        distances = raw_results.get("distances", [[]])[0]
-        ids = raw_results.get("ids", [[]])[0]
-
-        results = []
-        for index, document in enumerate(documents):
-            metadata = metadatas[index] if index < len(metadatas) else {}
-            distance = distances[index] if index < len(distances) else None
-            item_id = ids[index] if index < len(ids) else None
-            similarity = (1.0 - distance) if distance is not None else 1.0
-            results.append(
-                {
-                    "id": item_id,
-                    "document": document,
-                    "metadata": metadata or {},
-                    "distance": distance,
-                    "vector_score": similarity,
-                    "bm25_score": 0.0,
-                }
-            )
+        for row, query_index in enumerate(active):
+            documents = _result_row(raw_results, "documents", row)
+            metadatas = _result_row(raw_results, "metadatas", row)
+            distances = _result_row(raw_results, "distances", row)
+            ids = _result_row(raw_results, "ids", row)
+
+            positions = np.empty(len(documents), dtype=np.int64)
+            similarities = np.empty(len(documents), dtype=np.float64)
+            for index, document in enumerate(documents):
+                positions[index] = self._intern_record(
+                    ids[index] if index < len(ids) else None,
+                    document,
+                    metadatas[index] if index < len(metadatas) else {},
+                )
+                distance = distances[index] if index < len(distances) else None
+                similarities[index] = (1.0 - distance) if distance is not None else 1.0
+            results[query_index] = (positions, similarities)
 
         return results
 
-    def _collect_bm25_candidates(self, normalized_query: str) -> List[Dict[str, Any]]:
-        bm25_scores = self._bm25_index.score(normalized_query)
-        if not bm25_scores:
-            return []
-
-        normalized_bm25_scores = _normalize_scores(bm25_scores)
-        results = []
-        for index, normalized_bm25_score in enumerate(normalized_bm25_scores):
-            if normalized_bm25_score <= 0:
-                continue
+    def _collect_flat_vector_candidates(
+        self,
+        query_embeddings: List[List[float]],
+        active: List[int],
+        results: List[Tuple[np.ndarray, np.ndarray]],
+        k: int,
+        scope: Optional[Tuple[np.ndarray, Dict[str, Any]]] = None,
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        allowed_rows = None
+        if scope is not None:
+            known = self._vector_positions >= 0
+            allowed_rows = np.zeros(len(self._vector_positions), dtype=bool)
+            allowed_rows[known] = scope[0][self._vector_positions[known]]
+
+        rows, similarities = self._vector_index.search(
+            np.asarray([query_embeddings[index] for index in active], dtype=np.float32),
+            _candidate_pool_size(k),
+            allowed_rows,
+        )
+        positions = self._vector_positions[rows]
 
-            record = self._search_records[index]
-            results.append(
-                {
-                    "id": record.get("id"),
-                    "document": record.get("document", ""),
-                    "metadata": record.get("metadata", {}) or {},
-                    "distance": None,
-                    "vector_score": 0.0,
-                    "bm25_score": normalized_bm25_score,
-                }
-            )
+        for row, query_index in enumerate(active):
+            known = positions[row] >= 0
+            results[query_index] = (positions[row][known], similarities[row][known].astype(np.float64))
 
         return results
 
-    def _merge_candidates(self, vector_candidates: List[Dict[str, Any]], bm25_candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        candidates_by_key: Dict[str, Dict[str, Any]] = {}
-
-        def _candidate_key(candidate: Dict[str, Any]) -> str:
-            item_id = candidate.get("id")
-            if item_id:
-                return str(item_id)
-            document = str(candidate.get("document", ""))
-            return f"doc::{document}"
-
-        for candidate in vector_candidates:
-            candidates_by_key[_candidate_key(candidate)] = dict(candidate)
+    def _prefetch_records(self, positions: np.ndarray) -> None:
+        if isinstance(self._search_records, _CollectionRecords):
+            self._search_records.prefetch(positions[positions < len(self._search_records)])
+
+    def _collect_bm25_candidates(
+        self,
+        normalized_query: str,
+        k: int,
+        vector_positions: np.ndarray,
+        hits: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+        allowed: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """``(positions, scores)`` of lexical matches, scores normalised to ``(0, 1]``."""
+        if hits is None:
+            hits = self._bm25_index.top_k(normalized_query, _candidate_pool_size(k), allowed)
+        top_indices, top_scores = hits
+        if not top_indices.size:
+            return _no_hits()
+
+        # Scores are normalised by the best hit, which matches min-max over the
+        # whole corpus whenever some document misses every query term.
+        best_score = float(top_scores[0])
+
+        # Vector candidates outside the lexical pool still get their exact BM25
+        # score so that cutting the pool does not change their fused score.
+        extra_indices = np.setdiff1d(
+            vector_positions[vector_positions < self._bm25_index.document_count],
+            top_indices,
+        )
+        extra_scores = self._bm25_index.score_documents(normalized_query, extra_indices)
+
+        indices = np.concatenate([top_indices, extra_indices])
+        scores = np.concatenate([top_scores, extra_scores])
+        matched = scores > 0
+        return indices[matched], scores[matched] / best_score
+
+    def _record_id(self, position: int) -> Optional[str]:
+        if isinstance(self._search_records, _CollectionRecords) and position < len(self._search_records):
+            return self._search_records.ids[position]
+        return self._record(position).get("id")
+
+    def retrieve(
+        self,
+        query: str,
+        k: int = 5,
+        timings: Optional[Dict[str, float]] = None,
+        use_cache: bool = True,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Hybrid (vector + BM25) search for ``query``.
+
+        Direct section references ("section 303", "BNS 318(4)") and exact
+        titles are answered from the section index without embedding; their
+        timings then hold a single section_lookup stage. Otherwise
+        ``timings`` is filled with the seconds spent in the embedding,
+        vector_query, bm25 and merge stages. Results are served from the
+        in-process result cache unless ``use_cache`` is False.
+        ``filters`` (see :class:`MetadataFilter`) restricts both the Chroma
+        query and the BM25 postings to matching records.
+        """
+        if not is_english(query):
+            raise ValueError("Only English queries are supported")
 
-        for candidate in bm25_candidates:
-            key = _candidate_key(candidate)
-            existing = candidates_by_key.get(key)
-            if existing is None:
-                candidates_by_key[key] = dict(candidate)
-                continue
+        metadata_filter = MetadataFilter.parse(filters)
+        normalized_query = _normalize_query(query)
+        if not normalized_query:
+            return _empty_payload(query, normalized_query)
 
-            existing["bm25_score"] = max(float(existing.get("bm25_score", 0.0)), float(candidate.get("bm25_score", 0.0)))
-            if not existing.get("metadata") and candidate.get("metadata"):
-                existing["metadata"] = candidate.get("metadata")
-            if not existing.get("document") and candidate.get("document"):
-                existing["document"] = candidate.get("document")
-
-        merged_candidates = list(candidates_by_key.values())
-        for candidate in merged_candidates:
-            candidate["score"] = _combine_modalities(
-                float(candidate.get("vector_score", 0.0)),
-                float(candidate.get("bm25_score", 0.0)),
-            )
+        payload, scope = self._early_payload(query, normalized_query, k, metadata_filter, timings, use_cache)
+        if payload is not None:
+            return payload
+        allowed = scope[0] if scope is not None else None
 
-        merged_candidates.sort(
-            key=lambda item: (
-                float(item.get("score", 0.0)),
-                float(item.get("vector_score", 0.0)),
-                float(item.get("bm25_score", 0.0)),
-            ),
-            reverse=True,
+        vector_candidates = self._dense_branch(normalized_query, k, scope, timings)
+        bm25_hits = self._lexical_branch(normalized_query, k, allowed, timings)
+        return self._merge_payload(
+            query, normalized_query, k, metadata_filter, vector_candidates, bm25_hits, timings, use_cache
         )
-        return merged_candidates
 
-    def retrieve(self, query: str, k: int = 5) -> Dict[str, Any]:
+    async def retrieve_async(
+        self,
+        query: str,
+        k: int = 5,
+        timings: Optional[Dict[str, float]] = None,
+        use_cache: bool = True,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """:meth:`retrieve` with the dense and lexical branches run concurrently.
+
+        Embedding + vector search and BM25 run on a shared bounded thread
+        pool, so latency is the slower branch rather than the sum. A branch
+        that raises or misses RETRIEVAL_DENSE_TIMEOUT_MS /
+        RETRIEVAL_LEXICAL_TIMEOUT_MS is dropped and the other modality answers alone; such degraded
+        results are not cached.
+
+        Everything else that can block - filter scopes, section lookup,
+        merge, rerank and loading the result records - also runs on the
+        pool, so the returned results can be read on the event loop
+        without touching the vector store.
+        """
         if not is_english(query):
             raise ValueError("Only English queries are supported")
 
+        metadata_filter = MetadataFilter.parse(filters)
         normalized_query = _normalize_query(query)
         if not normalized_query:
-            return {
-                "query": query,
-                "normalized_query": normalized_query,
-                "results": [],
-            }
+            return _empty_payload(query, normalized_query)
 
-        query_embedding = self.embedding_service.embed_query(normalized_query)
-        vector_candidates: List[Dict[str, Any]] = []
-        if query_embedding:
-            vector_candidates = self._collect_vector_candidates(query_embedding, k)
+        loop = asyncio.get_running_loop()
+        executor = _branch_executor()
 
-        bm25_candidates = self._collect_bm25_candidates(normalized_query)
+        def _prepare():
+            payload, scope = self._early_payload(query, normalized_query, k, metadata_filter, timings, use_cache)
+            return _resolve_records(payload) if payload is not None else None, scope
 
-        if not vector_candidates and not bm25_candidates:
-            return {
-                "query": query,
-                "normalized_query": normalized_query,
-                "results": [],
-            }
+        payload, scope = await loop.run_in_executor(executor, _prepare)
+        if payload is not None:
+            return payload
+        allowed = scope[0] if scope is not None else None
+
+        started = loop.time()
+        dense_timings: Dict[str, float] = {}
+        lexical_timings: Dict[str, float] = {}
+        dense = asyncio.wrap_future(
+            executor.submit(self._dense_branch, normalized_query, k, scope, dense_timings)
+        )
+        lexical = asyncio.wrap_future(
+            executor.submit(self._lexical_branch, normalized_query, k, allowed, lexical_timings)
+        )
+        vector_candidates = await _join_branch(
+            dense, _branch_deadline(started, settings.RETRIEVAL_DENSE_TIMEOUT_MS), "dense", normalized_query
+        )
+        bm25_hits = await _join_branch(
+            lexical, _branch_deadline(started, settings.RETRIEVAL_LEXICAL_TIMEOUT_MS), "lexical", normalized_query
+        )
 
-        results = self._merge_candidates(vector_candidates, bm25_candidates)
+        if timings is not None:
+            timings.update(dense_timings if vector_candidates is not None else {})
+            timings.update(lexical_timings if bm25_hits is not None else {})
+        complete = vector_candidates is not None and bm25_hits is not None
 
-        if not results:
-            raise ValueError(
-                "No relevant BNS sections were found in the hybrid search index for this query. "
-                "Please re-ingest the legal dataset and try again."
+        def _finish():
+            payload = self._merge_payload(
+                query,
+                normalized_query,
+                k,
+                metadata_filter,
+                vector_candidates if vector_candidates is not None else _no_hits(),
+                bm25_hits if bm25_hits is not None else _no_hits(),
+                timings,
+                use_cache and complete,
             )
+            return _resolve_records(payload)
+
+        return await loop.run_in_executor(executor, _finish)
+
+    def _early_payload(
+        self,
+        query: str,
+        normalized_query: str,
+        k: int,
+        metadata_filter: Optional[MetadataFilter],
+        timings: Optional[Dict[str, float]],
+        use_cache: bool,
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Tuple[np.ndarray, Dict[str, Any]]]]:
+        """``(payload, scope)``; payload is set when no search is needed.
+
+        That is an empty filter, a section lookup or a result cache hit.
+        """
+        scope = self._filter_scope(metadata_filter)
+        if scope is not None and not scope[0].any():
+            return _empty_payload(query, normalized_query), scope
+
+        started = time.perf_counter()
+        section_results = self._lookup_sections(normalized_query, k, scope[0] if scope is not None else None)
+        if section_results is not None:
+            _record_stage(timings, "section_lookup", started)
+            return {"query": query, "normalized_query": normalized_query, "results": section_results}, scope
+
+        if use_cache:
+            cached_results = self._result_cache.get(self._cache_key(normalized_query, k, metadata_filter))
+            if cached_results is not None:
+                return {"query": query, "normalized_query": normalized_query, "results": cached_results}, scope
+        return None, scope
+
+    def _merge_payload(
+        self,
+        query: str,
+        normalized_query: str,
+        k: int,
+        metadata_filter: Optional[MetadataFilter],
+        vector_candidates: Tuple[np.ndarray, np.ndarray],
+        bm25_hits: Tuple[np.ndarray, np.ndarray],
+        timings: Optional[Dict[str, float]],
+        use_cache: bool,
+    ) -> Dict[str, Any]:
+        merge_started = time.perf_counter()
+        bm25_candidates = self._collect_bm25_candidates(normalized_query, k, vector_candidates[0], hits=bm25_hits)
+        payload, cacheable = self._build_payload(query, normalized_query, vector_candidates, bm25_candidates, k)
+        _record_stage(timings, "merge", merge_started)
+        if use_cache and cacheable:
+            self._result_cache.set(self._cache_key(normalized_query, k, metadata_filter), payload["results"])
+        return payload
 
-        thresholded_results = [
-            result for result in results if result.get("score", 1.0) >= settings.MIN_RELEVANCE_SCORE
-        ]
+    def _dense_branch(
+        self,
+        normalized_query: str,
+        k: int,
+        scope: Optional[Tuple[np.ndarray, Dict[str, Any]]],
+        timings: Optional[Dict[str, float]],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        started = time.perf_counter()
+        query_embedding = self.embedding_service.embed_query(normalized_query)
+        started = _record_stage(timings, "embedding", started)
+        vector_candidates = _no_hits()
+        if query_embedding:
+            vector_candidates = self._collect_vector_candidates(query_embedding, k, scope)
+        _record_stage(timings, "vector_query", started)
+        return vector_candidates
+
+    def _lexical_branch(
+        self,
+        normalized_query: str,
+        k: int,
+        allowed: Optional[np.ndarray],
+        timings: Optional[Dict[str, float]],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        started = time.perf_counter()
+        hits = self._bm25_index.top_k(normalized_query, _candidate_pool_size(k), allowed)
+        _record_stage(timings, "bm25", started)
+        return hits
+
+    def retrieve_many(
+        self,
+        queries: Sequence[str],
+        k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Batched :meth:`retrieve` returning one payload per query, in order.
+
+        All queries share a single embedding batch, one Chroma query and one
+        vectorised BM25 pass; per-query results match :meth:`retrieve`.
+        ``filters`` applies to every query.
+        """
+        for query in queries:
+            if not is_english(query):
+                raise ValueError(f"Only English queries are supported. Invalid query: {query}")
 
-        if thresholded_results:
-            selected_results = thresholded_results[:k]
+        metadata_filter = MetadataFilter.parse(filters)
+        scope = self._filter_scope(metadata_filter)
+        allowed = scope[0] if scope is not None else None
+
+        normalized_queries = [_normalize_query(query) for query in queries]
+        payloads = [_empty_payload(query, normalized) for query, normalized in zip(queries, normalized_queries)]
+        active = []
+        for index, normalized in enumerate(normalized_queries):
+            if not normalized or (allowed is not None and not allowed.any()):
+                continue
+            section_results = self._lookup_sections(normalized, k, allowed)
+            if section_results is not None:
+                payloads[index]["results"] = section_results
+                continue
+            cached_results = self._result_cache.get(self._cache_key(normalized, k, metadata_filter))
+            if cached_results is not None:
+                payloads[index]["results"] = cached_results
+            else:
+                active.append(index)
+        if not active:
+            return payloads
+
+        active_queries = [normalized_queries[index] for index in active]
+        query_embeddings = self.embedding_service.embed_queries(active_queries)
+        vector_batches = self._collect_vector_candidates_many(query_embeddings, k, scope)
+        bm25_hits = self._bm25_index.top_k_many(active_queries, _candidate_pool_size(k), allowed)
+
+        for slot, index in enumerate(active):
+            bm25_candidates = self._collect_bm25_candidates(
+                active_queries[slot], k, vector_batches[slot][0], hits=bm25_hits[slot]
+            )
+            payloads[index], cacheable = self._build_payload(
+                queries[index], active_queries[slot], vector_batches[slot], bm25_candidates, k
+            )
+            if cacheable:
+                self._result_cache.set(
+                    self._cache_key(active_queries[slot], k, metadata_filter), payloads[index]["results"]
+                )
+
+        return payloads
+
+    def _build_payload(
+        self,
+        query: str,
+        normalized_query: str,
+        vector_candidates: Tuple[np.ndarray, np.ndarray],
+        bm25_candidates: Tuple[np.ndarray, np.ndarray],
+        k: int,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """``(payload, cacheable)``; a rerank cut short by its budget is not cacheable."""
+        if not vector_candidates[0].size and not bm25_candidates[0].size:
+            return _empty_payload(query, normalized_query), True
+
+        fused = fuse(
+            *vector_candidates,
+            *bm25_candidates,
+            method=settings.FUSION_METHOD,
+            vector_weight=settings.FUSION_VECTOR_WEIGHT,
+            rrf_k=settings.FUSION_RRF_K,
+        )
+        ranked = fused.order
+        passing = ranked[fused.scores[ranked] >= settings.MIN_RELEVANCE_SCORE]
+
+        if passing.size:
+            # The reranker sees a wider window and the final cut happens after it.
+            selected = passing[:max(k, settings.RERANK_TOP_N)] if self._reranker is not None else passing[:k]
         else:
-            fallback_size = min(3, len(results))
-            selected_results = results[:fallback_size]
+            selected = ranked[:3]
             logger.warning(
                 "Retrieval threshold %.2f filtered all hybrid candidates for query '%s'. "
                 "Falling back to top %s raw matches.",
                 settings.MIN_RELEVANCE_SCORE,
                 normalized_query,
-                fallback_size,
+                selected.size,
+            )
+
+        records = _ResultRecords(self._record, self._prefetch_records, fused.positions[selected])
+        results = []
+        for index in selected:
+            position = int(fused.positions[index])
+            vector_score = float(fused.vector_scores[index])
+            results.append(
+                RetrievalResult(
+                    position,
+                    self._record_id(position),
+                    float(fused.scores[index]),
+                    vector_score,
+                    float(fused.bm25_scores[index]),
+                    (1.0 - vector_score) if fused.has_vector[index] else None,
+                    records,
+                )
             )
 
+        cacheable = True
+        if self._reranker is not None:
+            candidates = len(results)
+            results, reranked = self._reranker.rerank(normalized_query, results)
+            results = results[:k]
+            # Only a budget overrun leaves the fused order in place when the
+            # model could rerank; the next identical query may finish in time.
+            cacheable = reranked or candidates < 2 or self._reranker.load() is None
+
         return {
             "query": query,
             "normalized_query": normalized_query,
-            "results": selected_results,
-        }
-
-    def evaluate_top_k(self, test_data: List[Dict[str, Any]], k: int = 5) -> Dict[str, Any]:
+            "results": results,
+        }, cacheable
+
+    def warm_up(self) -> None:
+        # One throwaway query touches the model, the vector index and BM25 so
+        # the first real request does not pay for lazy initialisation.
+        if self._reranker is not None:
+            self._reranker.load()
+        try:
+            self.retrieve(settings.RETRIEVAL_WARMUP_QUERY, k=1)
+        except ValueError as error:
+            logger.info("Warm-up query returned no results: %s", error)
+
+    def evaluate_top_k(
+        self,
+        test_data: List[Dict[str, Any]],
+        k: int = 5,
+        max_workers: int = 1,
+    ) -> Dict[str, Any]:
+        """Accuracy, recall@k and latency report over ``test_data``.
+
+        Samples run on up to ``max_workers`` threads and bypass the result
+        cache so the full pipeline is measured. Every sample records its
+        end-to-end latency and per-stage timings; the summary reports p50/p95/p99
+        latencies (milliseconds) and throughput so runs can be diffed as JSON.
+        """
         if not test_data:
             return {
                 "accuracy": 0.0,
+                "recall_at_k": 0.0,
                 "total": 0,
                 "correct": 0,
+                "k": k,
                 "details": [],
             }
 
-        correct = 0
-        details = []
-
         for sample in test_data:
             query = sample.get("query", "")
-            expected_section = str(sample.get("expected_section", "")).strip()
-
             if not is_english(query):
                 raise ValueError(f"Only English queries are supported in evaluation. Invalid query: {query}")
 
-            retrieval_payload = self.retrieve(query, k=k)
+        def _evaluate_sample(sample: Dict[str, Any]) -> Dict[str, Any]:
+            query = sample.get("query", "")
+            expected_sections = _expected_sections(sample)
+
+            timings: Dict[str, float] = {}
+            started = time.perf_counter()
+            retrieval_payload = self.retrieve(query, k=k, timings=timings, use_cache=False)
+            latency = time.perf_counter() - started
             retrieved_items = retrieval_payload.get("results", [])
 
-            hit = False
-            for item in retrieved_items:
-                metadata = item.get("metadata", {}) or {}
-                section_number = str(metadata.get("section_number", "")).strip()
-                section_title = str(metadata.get("section_title", "")).strip().lower()
-                document = str(item.get("document", "")).lower()
-
-                if expected_section and (
-                    section_number == expected_section
-                    or f"section {expected_section}" in document
-                    or expected_section.lower() in section_title
-                ):
-                    hit = True
-                    break
-
-            correct += 1 if hit else 0
-            details.append(
-                {
-                    "query": query,
-                    "normalized_query": retrieval_payload.get("normalized_query"),
-                    "expected_section": expected_section,
-                    "hit": hit,
-                    "top_k_sections": [
-                        {
-                            "section_number": (item.get("metadata") or {}).get("section_number"),
-                            "section_title": (item.get("metadata") or {}).get("section_title"),
-                        }
-                        for item in retrieved_items
-                    ],
-                }
-            )
+            found = [
+                expected
+                for expected in expected_sections
+                if any(_matches_section(item, expected) for item in retrieved_items)
+            ]
+            return {
+                "query": query,
+                "normalized_query": retrieval_payload.get("normalized_query"),
+                "expected_section": expected_sections[0] if expected_sections else "",
+                "expected_sections": expected_sections,
+                "hit": bool(found),
+                "recall": len(found) / len(expected_sections) if expected_sections else 0.0,
+                "latency_ms": _milliseconds(latency),
+                "stage_ms": {stage: _milliseconds(seconds) for stage, seconds in timings.items()},
+                "top_k_sections": [
+                    {
+                        "section_number": item.metadata.get("section_number"),
+                        "section_title": item.metadata.get("section_title"),
+                    }
+                    for item in retrieved_items
+                ],
+            }
+
+        wall_started = time.perf_counter()
+        if max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                details = list(executor.map(_evaluate_sample, test_data))
+        else:
+            details = [_evaluate_sample(sample) for sample in test_data]
+        wall_time = time.perf_counter() - wall_started
 
-        total = len(test_data)
-        accuracy = correct / total if total else 0.0
+        total = len(details)
+        correct = sum(1 for detail in details if detail["hit"])
+        stages = sorted({stage for detail in details for stage in detail["stage_ms"]})
 
         return {
-            "accuracy": accuracy,
+            "accuracy": correct / total,
+            "recall_at_k": sum(detail["recall"] for detail in details) / total,
             "total": total,
             "correct": correct,
             "k": k,
+            "max_workers": max_workers,
+            "wall_time_ms": _milliseconds(wall_time),
+            "throughput_qps": round(total / wall_time, 3) if wall_time > 0 else None,
+            "latency_ms": _latency_summary([detail["latency_ms"] for detail in details]),
+            "stage_latency_ms": {
+                stage: _latency_summary(
+                    [detail["stage_ms"][stage] for detail in details if stage in detail["stage_ms"]]
+                )
+                for stage in stages
+            },
             "details": details,
         }
 
 
+def _expected_sections(sample: Dict[str, Any]) -> List[str]:
+    expected = sample.get("expected_sections")
+    if not isinstance(expected, list):
+        expected = [sample.get("expected_section", "")]
+    return [str(section).strip() for section in expected if str(section or "").strip()]
+
+
+def _matches_section(item: RetrievalResult, expected_section: str) -> bool:
+    metadata = item.metadata
+    section_number = str(metadata.get("section_number", "")).strip()
+    section_title = str(metadata.get("section_title", "")).strip().lower()
+    document = item.document.lower()
+    return (
+        section_number == expected_section
+        or f"section {expected_section}" in document
+        or expected_section.lower() in section_title
+    )
+
+
+def _milliseconds(seconds: float) -> float:
+    return round(seconds * 1000.0, 3)
+
+
+def _latency_summary(latencies_ms: List[float]) -> Dict[str, float]:
+    if not latencies_ms:
+        return {}
+    values = np.asarray(latencies_ms, dtype=np.float64)
+    return {
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p95": round(float(np.percentile(values, 95)), 3),
+        "p99": round(float(np.percentile(values, 99)), 3),
+        "mean": round(float(values.mean()), 3),
+        "max": round(float(values.max()), 3),
+    }
+
+
 def load_test_data(test_data_path: str) -> List[Dict[str, Any]]:
     with open(test_data_path, "r", encoding="utf-8") as file:
         payload = json.load(file)
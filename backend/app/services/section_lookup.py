@@ -0,0 +1,82 @@
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    from backend.app.services.bm25 import tokenize_text
+    from backend.app.services.filters import MetadataColumns
+except ModuleNotFoundError as error:
+    if not (error.name or "").startswith("backend"):
+        raise
+    from app.services.bm25 import tokenize_text
+    from app.services.filters import MetadataColumns
+
+
+_ACT_ABBREVIATIONS = r"bnss|bns|bsa"
+# "section 303", "BNS 318(4)", "sec. 74", "u/s 329", "303 of the BNS", "303".
+SECTION_QUERY_PATTERN = re.compile(
+    rf"^(?:(?P<act>{_ACT_ABBREVIATIONS})\s*)?"
+    r"(?:(?:section|sec\.?|s\.|u/s\.?)\s*)?"
+    r"(?P<number>\d+[a-z]?)"
+    r"(?:\s*\(\s*(?P<subsection>[0-9a-z]+)\s*\))?"
+    rf"(?:\s+(?:of\s+)?(?:the\s+)?(?P<trailing_act>{_ACT_ABBREVIATIONS}))?\.?$",
+    re.IGNORECASE,
+)
+
+
+def _number_key(section_number: str) -> str:
+    return re.sub(r"\s+", "", str(section_number or "")).lower()
+
+
+def _title_key(title: str) -> str:
+    return " ".join(tokenize_text(title))
+
+
+class SectionIndex:
+    """Section number and exact-title lookup over the ingested chunks.
+
+    Maps normalised section numbers ("318(4)") and titles to record
+    positions ordered by chunk index, so direct section references are
+    answered without embedding the query.
+    """
+
+    def __init__(self, columns: MetadataColumns):
+        self.columns = columns
+        order = np.lexsort((np.arange(len(columns)), columns.chunk_indexes))
+        by_number: Dict[str, List[int]] = {}
+        by_title: Dict[str, List[int]] = {}
+        for position in order.tolist():
+            number_key = _number_key(columns.section_numbers[position])
+            if number_key:
+                by_number.setdefault(number_key, []).append(position)
+            title_key = _title_key(columns.section_titles[position])
+            if title_key:
+                by_title.setdefault(title_key, []).append(position)
+
+        self._by_number = {key: np.array(value, dtype=np.int64) for key, value in by_number.items()}
+        self._by_title = {key: np.array(value, dtype=np.int64) for key, value in by_title.items()}
+        self._act_names = np.array([name.lower() for name in columns.act_names], dtype=object)
+        self._known_acts = set(self._act_names.tolist())
+
+    def lookup(self, query: str) -> Optional[np.ndarray]:
+        """Record positions answering ``query``, or ``None`` if it is not a section reference."""
+        match = SECTION_QUERY_PATTERN.match((query or "").strip())
+        if match is None:
+            return self._by_title.get(_title_key(query))
+
+        number = match.group("number").lower()
+        subsection = match.group("subsection")
+        positions = None
+        if subsection:
+            positions = self._by_number.get(f"{number}({subsection.lower()})")
+        if positions is None:
+            positions = self._by_number.get(number)
+        if positions is None:
+            return None
+
+        act = (match.group("act") or match.group("trailing_act") or "").lower()
+        if act and act in self._known_acts:
+            # Only narrow by act when the corpus actually labels chunks with it.
+            positions = positions[self._act_names[positions] == act]
+        return positions if positions.size else None
@@ -0,0 +1,125 @@
+import hashlib
+from itertools import chain
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+
+# Deletes are generated from at most this many leading characters (SymSpell's
+# "prefix length"); longer words are still verified against their full text.
+PREFIX_LENGTH = 7
+# Shorter tokens ("of", "bns", "act") are never corrected.
+MIN_TERM_LENGTH = 4
+ARRAY_FIELDS = ("delete_keys", "delete_indptr", "delete_terms")
+
+
+def _delete_key(text: str) -> int:
+    # Stable across processes (unlike hash()), so the keys can be persisted.
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _deletes(term: str, max_distance: int) -> Set[str]:
+    """``term`` (prefix) and every string reachable from it by up to ``max_distance`` deletions."""
+    current = {term[:PREFIX_LENGTH]}
+    variants = set(current)
+    for _ in range(max_distance):
+        current = {word[:index] + word[index + 1:] for word in current for index in range(len(word))}
+        variants |= current
+    return variants
+
+
+def allowed_distance(term: str, max_distance: int) -> int:
+    """Edit distance tolerated for ``term``: none below 4 chars, 1 up to 7, then ``max_distance``."""
+    if len(term) < MIN_TERM_LENGTH or not term.isalpha():
+        return 0
+    return min(max_distance, 1 if len(term) <= PREFIX_LENGTH else 2)
+
+
+def edit_distance(source: str, target: str, limit: int) -> Optional[int]:
+    """Optimal-string-alignment distance, or ``None`` once it exceeds ``limit``."""
+    if abs(len(source) - len(target)) > limit:
+        return None
+
+    previous_previous: List[int] = []
+    previous = list(range(len(target) + 1))
+    for row, source_char in enumerate(source, start=1):
+        current = [row] + [0] * len(target)
+        for column, target_char in enumerate(target, start=1):
+            cost = 0 if source_char == target_char else 1
+            current[column] = min(previous[column] + 1, current[column - 1] + 1, previous[column - 1] + cost)
+            if (
+                row > 1
+                and column > 1
+                and source_char == target[column - 2]
+                and source[row - 2] == target_char
+            ):
+                current[column] = min(current[column], previous_previous[column - 2] + 1)
+        if min(current) > limit:
+            return None
+        previous_previous, previous = previous, current
+
+    return previous[-1] if previous[-1] <= limit else None
+
+
+class SymSpellIndex:
+    """Symmetric-delete index mapping misspellings to vocabulary term ids.
+
+    Every vocabulary term is indexed under the hashes of its deletes, sorted
+    into ``delete_keys`` with the matching term ids in CSR layout. A query
+    term is corrected by hashing its own deletes and binary-searching them,
+    so the cost depends on the term's length, not on the vocabulary size.
+    """
+
+    def __init__(self, terms: Sequence[str], max_distance: int = 2):
+        self.terms = list(terms)
+        self.max_distance = max_distance
+
+        keyed: Dict[int, List[int]] = {}
+        for term_id, term in enumerate(self.terms):
+            if not allowed_distance(term, max_distance):
+                continue
+            for variant in _deletes(term, max_distance):
+                keyed.setdefault(_delete_key(variant), []).append(term_id)
+
+        keys = sorted(keyed)
+        self.delete_keys = np.array(keys, dtype=np.uint64)
+        counts = np.fromiter((len(keyed[key]) for key in keys), dtype=np.int64, count=len(keys))
+        self.delete_indptr = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self.delete_indptr[1:])
+        self.delete_terms = np.fromiter(
+            chain.from_iterable(keyed[key] for key in keys),
+            dtype=np.int32,
+            count=int(self.delete_indptr[-1]),
+        )
+
+    @classmethod
+    def from_arrays(cls, terms: Sequence[str], max_distance: int, arrays: Dict[str, np.ndarray]) -> "SymSpellIndex":
+        index = cls.__new__(cls)
+        index.terms = list(terms)
+        index.max_distance = max_distance
+        for field in ARRAY_FIELDS:
+            setattr(index, field, arrays[field])
+        return index
+
+    def candidates(self, term: str) -> List[Tuple[int, int]]:
+        """``(term_id, distance)`` for vocabulary terms within the tolerated distance of ``term``."""
+        limit = allowed_distance(term, self.max_distance)
+        if not limit or not self.delete_keys.size:
+            return []
+
+        probes = np.array(sorted(_delete_key(variant) for variant in _deletes(term, limit)), dtype=np.uint64)
+        slots = np.searchsorted(self.delete_keys, probes)
+        clipped = np.minimum(slots, self.delete_keys.size - 1)
+        found = clipped[self.delete_keys[clipped] == probes]
+
+        matches = []
+        seen: Set[int] = set()
+        for slot in found.tolist():
+            for term_id in self.delete_terms[self.delete_indptr[slot]:self.delete_indptr[slot + 1]].tolist():
+                if term_id in seen:
+                    continue
+                seen.add(term_id)
+                distance = edit_distance(term, self.terms[term_id], limit)
+                if distance:
+                    matches.append((term_id, distance))
+        return matches
@@ -0,0 +1,256 @@
+import json
+import logging
+import os
+import shutil
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the on-disk layout written by FlatVectorIndex.save changes.
+FLAT_INDEX_FORMAT_VERSION = 1
+_MANIFEST_FILE = "manifest.json"
+_EMBEDDINGS_FILE = "embeddings.npy"
+# int8 scales and PCA basis fitted at ingestion; refitted at load if missing.
+_PROJECTION_FILE = "projection.npz"
+# First-pass representations rescored against the full-precision matrix.
+COMPRESSED_DTYPES = frozenset({"int8", "pca"})
+# Rows upcast per step when searching a float16 matrix.
+_UPCAST_BLOCK_ROWS = 4096
+
+
+def _as_matrix(embeddings) -> np.ndarray:
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if matrix.ndim == 2:
+        return matrix
+    if not matrix.size:
+        return np.zeros((0, 0), dtype=np.float32)
+    return matrix.reshape(len(matrix), -1)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def fit_int8_scales(matrix: np.ndarray) -> np.ndarray:
+    """Per-dimension scales mapping each column's largest magnitude to 127."""
+    scales = np.abs(matrix).max(axis=0) / 127.0 if len(matrix) else np.ones(matrix.shape[1])
+    return np.where(scales > 0, scales, 1.0).astype(np.float32)
+
+
+def fit_pca(matrix: np.ndarray, dimension: int) -> Tuple[np.ndarray, np.ndarray]:
+    """``(mean, components)`` of the top ``dimension`` principal axes, components as columns."""
+    mean = matrix.mean(axis=0, dtype=np.float64).astype(np.float32)
+    centered = np.asarray(matrix, dtype=np.float32) - mean
+    # Eigen-decomposition of the d x d covariance is cheap next to an N x d SVD.
+    eigenvalues, eigenvectors = np.linalg.eigh((centered.T @ centered).astype(np.float64))
+    dimension = max(1, min(dimension, matrix.shape[1]))
+    components = eigenvectors[:, np.argsort(eigenvalues)[::-1][:dimension]]
+    return mean, np.ascontiguousarray(components, dtype=np.float32)
+
+
+def _top_n(
+    similarities: np.ndarray,
+    n: int,
+    allowed: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    count = similarities.shape[1]
+    n = min(n, count)
+    if allowed is not None:
+        similarities[:, ~allowed] = -np.inf
+        n = min(n, int(np.count_nonzero(allowed)))
+    if n <= 0:
+        empty = np.zeros((similarities.shape[0], 0))
+        return empty.astype(np.int64), empty.astype(np.float32)
+
+    if n < count:
+        rows = np.argpartition(-similarities, n - 1, axis=1)[:, :n]
+    else:
+        rows = np.broadcast_to(np.arange(count), similarities.shape)
+    selected = np.take_along_axis(similarities, rows, axis=1)
+    order = np.argsort(-selected, axis=1, kind="stable")
+    return np.take_along_axis(rows, order, axis=1).astype(np.int64), np.take_along_axis(selected, order, axis=1)
+
+
+class FlatVectorIndex:
+    """Exact cosine top-k over one contiguous, L2-normalised embedding matrix.
+
+    For corpora of a few thousand chunks a single matrix product is both
+    faster than an HNSW lookup through Chroma and exact. ``dtype`` may be
+    ``float16`` to halve memory; scores are still accumulated in float32.
+
+    ``int8`` (per-dimension scalar quantisation, a quarter of the memory)
+    and ``pca`` (``pca_dimension`` principal components) keep only the
+    compressed rows resident for a first pass over ``n * rescore_factor``
+    candidates, which are then rescored with the full-precision vectors.
+    """
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        dtype: str = "float32",
+        pca_dimension: int = 128,
+        rescore_factor: int = 4,
+        projection: Optional[Dict[str, np.ndarray]] = None,
+    ):
+        if dtype not in {"float32", "float16"} | COMPRESSED_DTYPES:
+            raise ValueError(f"Unsupported flat index dtype: {dtype}")
+        self.dtype = dtype
+        self.rescore_factor = max(1, rescore_factor)
+        # Full-precision rows used to rescore compressed first-pass candidates;
+        # memory-mapped when loaded from a snapshot.
+        self.full: Optional[np.ndarray] = None
+        self.scales: Optional[np.ndarray] = None
+        self.mean: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None
+        projection = projection or {}
+
+        if dtype not in COMPRESSED_DTYPES:
+            matrix = _as_matrix(embeddings)
+            self.matrix = np.ascontiguousarray(_normalize_rows(matrix), dtype=dtype)
+            return
+
+        if isinstance(embeddings, np.memmap) and embeddings.dtype == np.float32:
+            # Snapshots are saved normalised; keep them on disk rather than copying.
+            self.full = embeddings
+        else:
+            self.full = np.ascontiguousarray(_normalize_rows(_as_matrix(embeddings)), dtype=np.float32)
+        if dtype == "int8":
+            self.scales = projection.get("scales")
+            if self.scales is None:
+                self.scales = fit_int8_scales(self.full)
+            self.matrix = np.clip(np.rint(self.full / self.scales), -127, 127).astype(np.int8)
+        else:
+            self.mean, self.components = projection.get("mean"), projection.get("components")
+            if self.components is None or self.components.shape[1] != min(pca_dimension, self.full.shape[1]):
+                self.mean, self.components = fit_pca(self.full, pca_dimension)
+            self.matrix = np.ascontiguousarray((self.full - self.mean) @ self.components, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        """Resident bytes; a memory-mapped full-precision matrix is not counted."""
+        extras = (self.scales, self.mean, self.components)
+        total = self.matrix.nbytes + sum(array.nbytes for array in extras if array is not None)
+        if self.full is not None and not isinstance(self.full, np.memmap):
+            total += self.full.nbytes
+        return int(total)
+
+    def similarities(self, query_embeddings: np.ndarray) -> np.ndarray:
+        """Cosine similarities, approximate for the ``int8`` and ``pca`` dtypes."""
+        queries = _normalize_rows(np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)))
+        if self.dtype == "pca":
+            # q . x ~= q . mean + (q P) . ((x - mean) P)
+            return (queries @ self.mean)[:, None] + (queries @ self.components) @ self.matrix.T
+        if self.matrix.dtype == np.float32:
+            return queries @ self.matrix.T
+
+        if self.dtype == "int8":
+            queries = queries * self.scales
+        similarities = np.empty((queries.shape[0], len(self)), dtype=np.float32)
+        for start in range(0, len(self), _UPCAST_BLOCK_ROWS):
+            block = self.matrix[start:start + _UPCAST_BLOCK_ROWS].astype(np.float32)
+            similarities[:, start:start + block.shape[0]] = queries @ block.T
+        return similarities
+
+    def search(
+        self,
+        query_embeddings: np.ndarray,
+        n: int,
+        allowed: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(rows, similarities)`` of shape ``(queries, n)``, best first.
+
+        ``allowed`` is an optional boolean bitmap over rows; other rows are
+        never returned, and ``n`` shrinks to the number of allowed rows.
+        """
+        similarities = self.similarities(query_embeddings)
+        if self.full is None:
+            return _top_n(similarities, n, allowed)
+
+        # Over-fetch from the compressed scores, then rank exactly.
+        rows, _ = _top_n(similarities, n * self.rescore_factor, allowed)
+        queries = _normalize_rows(np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)))
+        exact = np.einsum("qcd,qd->qc", np.asarray(self.full[rows], dtype=np.float32), queries)
+        order = np.argsort(-exact, axis=1, kind="stable")[:, :n]
+        return np.take_along_axis(rows, order, axis=1), np.take_along_axis(exact, order, axis=1)
+
+    @staticmethod
+    def save(
+        directory: str,
+        embeddings: np.ndarray,
+        index_version: str,
+        record_ids: Sequence[str],
+        pca_dimension: int = 0,
+    ) -> None:
+        """Persist full-precision normalised embeddings with a JSON manifest.
+
+        The int8 scales, and the PCA basis when ``pca_dimension`` is set, are
+        fitted here and saved alongside so the compressed dtypes load without
+        refitting.
+        """
+        staging_directory = f"{directory}.tmp"
+        shutil.rmtree(staging_directory, ignore_errors=True)
+        os.makedirs(staging_directory)
+
+        matrix = _normalize_rows(_as_matrix(embeddings))
+        np.save(os.path.join(staging_directory, _EMBEDDINGS_FILE), matrix.astype(np.float32))
+        projection = {"scales": fit_int8_scales(matrix)}
+        if pca_dimension > 0:
+            projection["mean"], projection["components"] = fit_pca(matrix, pca_dimension)
+        np.savez(os.path.join(staging_directory, _PROJECTION_FILE), **projection)
+        manifest = {
+            "format_version": FLAT_INDEX_FORMAT_VERSION,
+            "index_version": index_version,
+            "dimension": int(matrix.shape[1]),
+            "record_ids": list(record_ids),
+        }
+        with open(os.path.join(staging_directory, _MANIFEST_FILE), "w", encoding="utf-8") as file:
+            json.dump(manifest, file)
+
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(staging_directory, directory)
+
+    @classmethod
+    def load(
+        cls,
+        directory: str,
+        index_version: str,
+        dtype: str = "float32",
+        **options,
+    ) -> Optional[Tuple["FlatVectorIndex", List[str]]]:
+        """Load a snapshot written by :meth:`save`, or ``None`` if missing or stale."""
+        manifest_path = os.path.join(directory, _MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            return None
+
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as file:
+                manifest = json.load(file)
+            if manifest.get("format_version") != FLAT_INDEX_FORMAT_VERSION:
+                logger.info("Ignoring flat index with format version %s", manifest.get("format_version"))
+                return None
+            if manifest.get("index_version") != index_version:
+                logger.info("Ignoring stale flat index built for index version %s", manifest.get("index_version"))
+                return None
+            projection = {}
+            if dtype in COMPRESSED_DTYPES:
+                # Compressed rows are what stays resident; the full matrix is paged in for rescoring.
+                embeddings = np.load(os.path.join(directory, _EMBEDDINGS_FILE), mmap_mode="r")
+                projection_path = os.path.join(directory, _PROJECTION_FILE)
+                if os.path.exists(projection_path):
+                    with np.load(projection_path) as saved:
+                        projection = {name: saved[name] for name in saved.files}
+            else:
+                embeddings = np.load(os.path.join(directory, _EMBEDDINGS_FILE))
+        except (OSError, ValueError, KeyError) as error:
+            logger.warning("Unable to load flat vector index from %s: %s", directory, error)
+            return None
+
+        return cls(embeddings, dtype=dtype, projection=projection, **options), list(manifest["record_ids"])
@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+import sys
+import logging
+import tempfile
+import time
+
+import numpy as np
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+PROJECT_ROOT = os.path.abspath(os.path.join(BACKEND_DIR, ".."))
+
+for path in (BACKEND_DIR, PROJECT_ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+try:
+    from app.core.config import settings
+    from app.services.vector_index import FlatVectorIndex
+except ModuleNotFoundError as error:
+    if not (error.name or "").startswith("app"):
+        raise
+    from backend.app.core.config import settings
+    from backend.app.services.vector_index import FlatVectorIndex
+
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+DTYPES = ("float32", "float16", "int8", "pca")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Compare flat vector index dtypes: recall@k against exact float32, memory and latency.",
+    )
+    parser.add_argument(
+        "--index-dir",
+        default=settings.FLAT_INDEX_DIR,
+        help="Flat index snapshot written at ingestion (embeddings.npy).",
+    )
+    parser.add_argument("--synthetic", type=int, default=0, help="Benchmark N random vectors instead of a snapshot.")
+    parser.add_argument("--dimension", type=int, default=768, help="Dimension of synthetic vectors.")
+    parser.add_argument("--queries", type=int, default=200, help="Queries, sampled from the corpus and perturbed.")
+    parser.add_argument("--noise", type=float, default=0.05, help="Gaussian noise added to sampled queries.")
+    parser.add_argument("--k", type=int, default=settings.RETRIEVAL_TOP_K, help="Results per query.")
+    parser.add_argument("--pca-dim", type=int, default=settings.FLAT_INDEX_PCA_DIM)
+    parser.add_argument("--rescore-factor", type=int, default=settings.FLAT_INDEX_RESCORE_FACTOR)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    return parser.parse_args()
+
+
+def _load_embeddings(args, rng, scratch_dir: str) -> np.ndarray:
+    # Memory-mapped like the retriever's snapshot, so compressed dtypes only
+    # count their resident rows.
+    if args.synthetic:
+        matrix = rng.normal(size=(args.synthetic, args.dimension)).astype(np.float32)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        path = os.path.join(scratch_dir, "embeddings.npy")
+        np.save(path, matrix)
+    else:
+        path = os.path.join(args.index_dir, "embeddings.npy")
+        if not os.path.exists(path):
+            raise SystemExit(f"No flat index at {path}; run ingestion or pass --synthetic N.")
+    return np.load(path, mmap_mode="r")
+
+
+def _benchmark(index: FlatVectorIndex, queries: np.ndarray, k: int, exact_rows: np.ndarray):
+    latencies = []
+    recalls = []
+    for query, expected in zip(queries, exact_rows):
+        started = time.perf_counter()
+        rows, _ = index.search(query, k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        recalls.append(len(set(rows[0].tolist()) & set(expected.tolist())) / k)
+    return {
+        "memory_mib": round(index.nbytes / (1024 * 1024), 2),
+        f"recall@{k}": round(float(np.mean(recalls)), 4),
+        "latency_ms_mean": round(float(np.mean(latencies)), 3),
+        "latency_ms_p95": round(float(np.percentile(latencies, 95)), 3),
+    }
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(args.seed)
+    scratch = tempfile.TemporaryDirectory()
+    embeddings = _load_embeddings(args, rng, scratch.name)
+    sample = rng.choice(len(embeddings), size=min(args.queries, len(embeddings)), replace=False)
+    queries = embeddings[sample] + rng.normal(scale=args.noise, size=(len(sample), embeddings.shape[1]))
+    queries = queries.astype(np.float32)
+
+    reference = FlatVectorIndex(embeddings)
+    exact_rows = reference.search(queries, args.k)[0]
+    report = {
+        "vectors": int(len(embeddings)),
+        "dimension": int(embeddings.shape[1]),
+        "queries": int(len(queries)),
+        "k": args.k,
+        "pca_dim": args.pca_dim,
+        "rescore_factor": args.rescore_factor,
+        "dtypes": {},
+    }
+    for dtype in DTYPES:
+        index = FlatVectorIndex(
+            embeddings,
+            dtype=dtype,
+            pca_dimension=args.pca_dim,
+            rescore_factor=args.rescore_factor,
+        )
+        report["dtypes"][dtype] = _benchmark(index, queries, args.k, exact_rows)
+        logger.info("%s: %s", dtype, report["dtypes"][dtype])
+
+    del embeddings
+    scratch.cleanup()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output)
+        logger.info("Wrote report to %s", args.output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import argparse
+import os
+import sys
+import logging
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+PROJECT_ROOT = os.path.abspath(os.path.join(BACKEND_DIR, ".."))
+
+for path in (BACKEND_DIR, PROJECT_ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+try:
+    from app.core.config import settings
+    from app.services.embedding_server import serve
+except ModuleNotFoundError as error:
+    if not (error.name or "").startswith("app"):
+        raise
+    from backend.app.core.config import settings
+    from backend.app.services.embedding_server import serve
+
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve the embedding model to API workers over a Unix socket.")
+    parser.add_argument(
+        "--socket",
+        default=settings.EMBEDDING_SERVER_SOCKET or "/run/nyayagpt/embeddings.sock",
+        help="Unix socket path; API workers need the same EMBEDDING_SERVER_SOCKET.",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    try:
+        serve(args.socket)
+    except KeyboardInterrupt:
+        logger.info("Embedding server stopped.")
+
+
+if __name__ == "__main__":
+    main()
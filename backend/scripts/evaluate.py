@@ -0,0 +1,83 @@
+import argparse
+import json
+import os
+import sys
+import logging
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.abspath(os.path.join(CURRENT_DIR, ".."))
+PROJECT_ROOT = os.path.abspath(os.path.join(BACKEND_DIR, ".."))
+
+for path in (BACKEND_DIR, PROJECT_ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+try:
+    from app.core.config import settings
+    from app.services.retrieval import MultilingualLegalRetriever, is_english, load_test_data
+except ModuleNotFoundError as error:
+    if not (error.name or "").startswith("app"):
+        raise
+    from backend.app.core.config import settings
+    from backend.app.services.retrieval import MultilingualLegalRetriever, is_english, load_test_data
+
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Evaluate hybrid retrieval accuracy and latency.")
+    parser.add_argument(
+        "--test-data",
+        default=os.path.join(settings.DATA_DIR, "retrieval_test_data.json"),
+        help="JSON list of {query, expected_section | expected_sections} samples.",
+    )
+    parser.add_argument("--k", type=int, default=settings.RETRIEVAL_TOP_K, help="Results per query.")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent evaluation threads.")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    parser.add_argument(
+        "--no-details",
+        action="store_true",
+        help="Omit per-sample details from the report.",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    samples = load_test_data(args.test_data)
+    english_samples = [sample for sample in samples if is_english(sample.get("query", ""))]
+    skipped = len(samples) - len(english_samples)
+    if skipped:
+        logger.warning("Skipping %s non-English samples (retrieval is English-only).", skipped)
+
+    retriever = MultilingualLegalRetriever()
+    retriever.warm_up()
+    report = retriever.evaluate_top_k(english_samples, k=args.k, max_workers=args.workers)
+    report["skipped"] = skipped
+    if args.no_details:
+        report.pop("details", None)
+
+    rendered = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(rendered + "\n")
+        logger.info("Wrote evaluation report to %s", args.output)
+    else:
+        print(rendered)
+
+    logger.info(
+        "accuracy=%.3f recall@%s=%.3f p50=%sms p95=%sms p99=%sms throughput=%s qps",
+        report["accuracy"],
+        args.k,
+        report["recall_at_k"],
+        report.get("latency_ms", {}).get("p50"),
+        report.get("latency_ms", {}).get("p95"),
+        report.get("latency_ms", {}).get("p99"),
+        report.get("throughput_qps"),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 """
 Shared fixtures and path setup for the NyayaGPT test suite.
 """
+import atexit
 import os
+import shutil
 import sys
 import tempfile
 import types
@@ -57,6 +59,16 @@ _dotenv = types.ModuleType("dotenv")
 _dotenv.load_dotenv = lambda: None
 sys.modules.setdefault("dotenv", _dotenv)
 
+# keep SQLite caches created by services under test out of backend/vector_store
+_TEST_CACHE_DIR = tempfile.mkdtemp(prefix="nyayagpt-tests-")
+atexit.register(shutil.rmtree, _TEST_CACHE_DIR, ignore_errors=True)
+os.environ.setdefault("GEMINI_CACHE_PATH", os.path.join(_TEST_CACHE_DIR, "gemini_cache.sqlite3"))
+os.environ.setdefault("EMBEDDING_CACHE_PATH", os.path.join(_TEST_CACHE_DIR, "embedding_cache.sqlite3"))
+# and index snapshots too, so a test that ingests without patching settings
+# cannot leave its output in the tree
+os.environ.setdefault("LEXICAL_INDEX_DIR", os.path.join(_TEST_CACHE_DIR, "lexical_index"))
+os.environ.setdefault("FLAT_INDEX_DIR", os.path.join(_TEST_CACHE_DIR, "flat_index"))
+
 
 # ── helpers ──────────────────────────────────────────────────────────────────
 @pytest.fixture()
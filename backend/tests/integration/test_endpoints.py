@@ -4,7 +4,8 @@ Integration tests for the FastAPI endpoints.
 GeminiService and RAGService are mocked — no model or API key required.
 """
 import json
-from unittest.mock import MagicMock
+import threading
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from fastapi.testclient import TestClient
@@ -44,6 +45,12 @@ VALID_ANALYSIS_RESPONSE = {
 }
 
 
+def _rag_mock():
+    mock_rag = MagicMock()
+    mock_rag.query_similar_documents_async = AsyncMock()
+    return mock_rag
+
+
 @pytest.fixture()
 def client():
     return TestClient(app, raise_server_exceptions=False)
@@ -55,8 +62,8 @@ def mock_services():
     mock_gemini = MagicMock()
     mock_gemini.generate_content.return_value = json.dumps(VALID_ANALYSIS_RESPONSE)
 
-    mock_rag = MagicMock()
-    mock_rag.query_similar_documents.return_value = [
+    mock_rag = _rag_mock()
+    mock_rag.query_similar_documents_async.return_value = [
         "BNS Section 303: Theft — whoever takes movable property without consent.",
     ]
 
@@ -124,8 +131,8 @@ class TestAnalyzeEndpoint:
     def test_fallback_on_invalid_gemini_json(self, client):
         mock_gemini = MagicMock()
         mock_gemini.generate_content.return_value = "not valid json at all"
-        mock_rag = MagicMock()
-        mock_rag.query_similar_documents.return_value = ["Section 303 text"]
+        mock_rag = _rag_mock()
+        mock_rag.query_similar_documents_async.return_value = ["Section 303 text"]
 
         app.dependency_overrides[get_gemini_service] = lambda: mock_gemini
         app.dependency_overrides[get_rag_service] = lambda: mock_rag
@@ -139,8 +146,8 @@ class TestAnalyzeEndpoint:
 
     def test_422_when_no_relevant_sections_found(self, client):
         mock_gemini = MagicMock()
-        mock_rag = MagicMock()
-        mock_rag.query_similar_documents.side_effect = ValueError(
+        mock_rag = _rag_mock()
+        mock_rag.query_similar_documents_async.side_effect = ValueError(
             "No sufficiently relevant BNS sections found for this query. "
             "Please describe the incident in more detail."
         )
@@ -157,8 +164,8 @@ class TestAnalyzeEndpoint:
     def test_500_when_gemini_raises(self, client):
         mock_gemini = MagicMock()
         mock_gemini.generate_content.side_effect = RuntimeError("API down")
-        mock_rag = MagicMock()
-        mock_rag.query_similar_documents.return_value = ["some section"]
+        mock_rag = _rag_mock()
+        mock_rag.query_similar_documents_async.return_value = ["some section"]
         app.dependency_overrides[get_gemini_service] = lambda: mock_gemini
         app.dependency_overrides[get_rag_service] = lambda: mock_rag
         try:
@@ -169,8 +176,8 @@ class TestAnalyzeEndpoint:
         assert resp.status_code == 500
 
     def test_empty_query_accepted_but_may_fail_retrieval(self, client):
-        mock_rag = MagicMock()
-        mock_rag.query_similar_documents.side_effect = ValueError(
+        mock_rag = _rag_mock()
+        mock_rag.query_similar_documents_async.side_effect = ValueError(
             "No sufficiently relevant BNS sections found"
         )
         mock_gemini = MagicMock()
@@ -184,6 +191,114 @@ class TestAnalyzeEndpoint:
         assert resp.status_code in (200, 422, 500)
 
 
+# ─── shared services ─────────────────────────────────────────────────────────
+
+class TestSharedServices:
+    @pytest.fixture(autouse=True)
+    def _reset_state(self):
+        yield
+        for attribute in ("rag_service", "gemini_service", "readiness"):
+            if hasattr(app.state, attribute):
+                delattr(app.state, attribute)
+
+    def test_lifespan_builds_and_warms_services_once(self, monkeypatch):
+        _main = _sys.modules["app.main"]
+        rag_factory = MagicMock()
+        gemini_factory = MagicMock()
+        monkeypatch.setattr(_main, "RAGService", rag_factory)
+        monkeypatch.setattr(_main, "GeminiService", gemini_factory)
+
+        with TestClient(app):
+            assert app.state.readiness.wait(timeout=5)
+            assert app.state.rag_service is rag_factory.return_value
+            assert app.state.gemini_service is gemini_factory.return_value
+
+        rag_factory.assert_called_once()
+        gemini_factory.assert_called_once()
+        rag_factory.return_value.warm_up.assert_called_once()
+
+    def test_requests_get_503_until_services_load(self, monkeypatch):
+        _main = _sys.modules["app.main"]
+        release = threading.Event()
+
+        def _slow_rag():
+            release.wait(timeout=5)
+            return _rag_mock()
+
+        monkeypatch.setattr(_main, "RAGService", _slow_rag)
+        monkeypatch.setattr(_main, "GeminiService", MagicMock)
+
+        with TestClient(app) as live_client:
+            assert live_client.get("/health").json() == {"status": "ok", "readiness": "loading"}
+            assert live_client.get("/ready").status_code == 503
+            resp = live_client.post("/analyze", json={"query": "theft"})
+            assert resp.status_code == 503
+            assert resp.headers["Retry-After"] == "5"
+
+            release.set()
+            assert app.state.readiness.wait(timeout=5)
+            ready = live_client.get("/ready")
+            assert ready.status_code == 200
+            assert ready.json()["status"] == "ready"
+
+    def test_failed_load_is_reported(self, monkeypatch):
+        _main = _sys.modules["app.main"]
+        monkeypatch.setattr(_main, "RAGService", MagicMock(side_effect=RuntimeError("model missing")))
+        monkeypatch.setattr(_main, "GeminiService", MagicMock)
+
+        with TestClient(app) as live_client:
+            assert not app.state.readiness.wait(timeout=5)
+            resp = live_client.get("/ready")
+            assert resp.status_code == 503
+            assert resp.json()["status"] == "failed"
+            assert resp.json()["error"] == "model missing"
+            assert live_client.get("/health").status_code == 200
+
+    def test_unavailable_retriever_is_reported(self, monkeypatch):
+        # The real RAGService catches the retriever's error; start-up must still fail.
+        _main = _sys.modules["app.main"]
+        _rag_module = _sys.modules[_main.RAGService.__module__]
+        monkeypatch.setattr(
+            _rag_module, "MultilingualLegalRetriever", MagicMock(side_effect=ConnectionError("socket missing"))
+        )
+        monkeypatch.setattr(_main, "GeminiService", MagicMock)
+
+        with TestClient(app) as live_client:
+            assert not app.state.readiness.wait(timeout=5)
+            resp = live_client.get("/ready")
+            assert resp.status_code == 503
+            assert resp.json()["status"] == "failed"
+            assert "socket missing" in resp.json()["error"]
+            assert live_client.post("/analyze", json={"query": "theft"}).status_code == 503
+
+    def test_failed_warm_up_is_reported(self, monkeypatch):
+        _main = _sys.modules["app.main"]
+        rag_factory = MagicMock()
+        rag_factory.return_value.warm_up.side_effect = RuntimeError("dummy query failed")
+        monkeypatch.setattr(_main, "RAGService", rag_factory)
+        monkeypatch.setattr(_main, "GeminiService", MagicMock)
+
+        with TestClient(app) as live_client:
+            assert not app.state.readiness.wait(timeout=5)
+            resp = live_client.get("/ready")
+            assert resp.status_code == 503
+            assert resp.json()["error"] == "dummy query failed"
+
+    def test_requests_reuse_app_scoped_services(self, client):
+        mock_gemini = MagicMock()
+        mock_gemini.generate_content.return_value = json.dumps(VALID_ANALYSIS_RESPONSE)
+        mock_rag = _rag_mock()
+        mock_rag.query_similar_documents_async.return_value = ["Section 303 text"]
+        app.state.gemini_service = mock_gemini
+        app.state.rag_service = mock_rag
+
+        for _ in range(3):
+            assert client.post("/analyze", json={"query": "theft"}).status_code == 200
+
+        assert mock_rag.query_similar_documents_async.call_count == 3
+        assert mock_gemini.generate_content.call_count == 3
+
+
 # ─── /generate-fir (deprecated) ───────────────────────────────────────────────
 
 class TestGenerateFirEndpoint:
@@ -0,0 +1,74 @@
+"""
+Unit tests for backend.app.services.batching
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from app.services.batching import MicroBatcher, token_budget_batches
+
+
+class _Encoder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[len(text), 1.0] for text in texts])
+
+
+class TestTokenBudgetBatches:
+    def test_longest_first_within_budget(self):
+        assert token_budget_batches([3, 10, 2, 5, 5], 12) == [[1], [3, 4], [0, 2]]
+
+    def test_overlong_text_gets_its_own_batch(self):
+        assert token_budget_batches([50, 4, 4], 16) == [[0], [1, 2]]
+
+    def test_empty(self):
+        assert token_budget_batches([], 16) == []
+
+
+class TestMicroBatcher:
+    def test_single_request_round_trip(self):
+        encoder = _Encoder()
+        batcher = MicroBatcher(encoder, max_wait_ms=0)
+
+        rows = batcher.submit(["theft", "hurt"])
+
+        assert rows.dtype == np.float32
+        assert rows[:, 0].tolist() == [5.0, 4.0]
+        assert encoder.calls == [["theft", "hurt"]]
+
+    def test_concurrent_requests_share_one_encode(self):
+        encoder = _Encoder()
+        texts = ["a" * length for length in range(1, 9)]
+        # A long wait: the batch closes once all eight texts have arrived.
+        batcher = MicroBatcher(encoder, max_batch_size=len(texts), max_wait_ms=5000)
+
+        with ThreadPoolExecutor(max_workers=len(texts)) as pool:
+            results = list(pool.map(lambda text: batcher.submit([text]), texts))
+
+        assert [row[0, 0] for row in results] == [float(len(text)) for text in texts]
+        assert len(encoder.calls) == 1
+        assert batcher.stats() == {"requests": 8, "batches": 1, "texts": 8}
+
+    def test_batches_stop_at_max_size(self):
+        encoder = _Encoder()
+        batcher = MicroBatcher(encoder, max_batch_size=2, max_wait_ms=5000)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda text: batcher.submit([text]), "abcd"))
+
+        assert [len(call) for call in encoder.calls] == [2, 2]
+
+    def test_encode_errors_reach_every_caller(self):
+        def _broken(texts):
+            raise RuntimeError("model crashed")
+
+        batcher = MicroBatcher(_broken, max_wait_ms=0)
+        with pytest.raises(RuntimeError, match="model crashed"):
+            batcher.submit(["theft"])
+        # the worker survives the error
+        with pytest.raises(RuntimeError):
+            batcher.submit(["hurt"])
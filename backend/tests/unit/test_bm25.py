@@ -0,0 +1,290 @@
+"""
+Unit tests for backend.app.services.bm25
+"""
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from app.services.bm25 import BM25Index, tokenize_text
+
+
+RECORDS = [
+    {"id": "BNS_74_0", "document": "BNS Section 74: assault modesty and harassment of a woman"},
+    {"id": "BNS_303_0", "document": "BNS Section 303: theft of movable property, theft theft"},
+    {"id": "BNS_308_0", "document": "BNS Section 308: extortion and intimidation"},
+    {"id": "BNS_329_0", "document": "BNS Section 329: criminal trespass and house-trespass"},
+]
+
+
+def _reference_scores(records, query, k1=1.5, b=0.75):
+    """Straightforward per-document BM25, as computed by the original index."""
+    documents = [Counter(tokenize_text(r["document"])) for r in records]
+    lengths = [sum(d.values()) for d in documents]
+    average_length = sum(lengths) / len(lengths)
+    scores = [0.0] * len(records)
+    for term, query_frequency in Counter(tokenize_text(query)).items():
+        document_frequency = sum(1 for d in documents if term in d)
+        if not document_frequency:
+            continue
+        idf = math.log(1.0 + (len(records) - document_frequency + 0.5) / (document_frequency + 0.5))
+        query_weight = (query_frequency * 2.0) / (query_frequency + 1.0)
+        for index, document in enumerate(documents):
+            tf = document.get(term, 0)
+            if not tf:
+                continue
+            denominator = tf + k1 * (1.0 - b + b * (lengths[index] / average_length))
+            scores[index] += idf * ((tf * (k1 + 1.0)) / denominator) * query_weight
+    return scores
+
+
+class TestTokenizeText:
+    def test_lowercases_and_splits_on_non_alphanumerics(self):
+        assert tokenize_text("House-Trespass, 329(1)") == ["house", "trespass", "329", "1"]
+
+    def test_none_is_empty(self):
+        assert tokenize_text(None) == []
+
+
+class TestBM25Index:
+    def test_postings_use_compact_csr_arrays(self):
+        index = BM25Index(RECORDS)
+        assert index.doc_ids.dtype == np.int32
+        assert index.weights.dtype == np.float32
+        assert index.indptr[-1] == len(index.doc_ids) == len(index.weights)
+        assert len(index.indptr) == len(index.vocabulary) + 1
+
+    def test_postings_for_term(self):
+        index = BM25Index(RECORDS)
+        documents, weights = index.postings(index.vocabulary["and"])
+        assert documents.tolist() == [0, 2, 3]
+        assert (weights > 0).all()
+
+    @pytest.mark.parametrize("query", [
+        "theft of phone",
+        "theft theft section",
+        "assault and extortion of a woman",
+        "house trespass",
+    ])
+    def test_scores_match_reference_bm25(self, query):
+        index = BM25Index(RECORDS)
+        expected = _reference_scores(RECORDS, query)
+        np.testing.assert_allclose(index.score(query), expected, rtol=1e-5)
+
+    def test_unknown_terms_score_zero(self):
+        index = BM25Index(RECORDS)
+        scores = index.score("zzz qqq")
+        assert scores.shape == (len(RECORDS),)
+        assert not scores.any()
+
+    def test_empty_query_scores_zero(self):
+        assert not BM25Index(RECORDS).score("").any()
+
+    def test_empty_corpus(self):
+        index = BM25Index([])
+        assert index.score("theft").size == 0
+        assert index.query_terms("theft") == []
+
+
+class TestTypoExpansion:
+    def test_misspelled_term_expands_to_vocabulary_term(self):
+        index = BM25Index(RECORDS)
+        assert index.query_terms("theift") == [(index.vocabulary["theft"], pytest.approx(0.6))]
+        assert index.query_terms("assult") == [(index.vocabulary["assault"], pytest.approx(0.6))]
+
+    def test_expansion_scores_like_the_down_weighted_term(self):
+        index = BM25Index(RECORDS)
+        np.testing.assert_allclose(index.score("theift"), index.score("theft") * 0.6, rtol=1e-6)
+        assert index.top_k("theift of property", 1)[0].tolist() == [1]
+
+    def test_known_terms_and_short_tokens_are_not_expanded(self):
+        index = BM25Index(RECORDS)
+        assert index.query_terms("theft") == [(index.vocabulary["theft"], 1.0)]
+        assert index.query_terms("off 3030") == []
+
+    def test_disabled_with_zero_edit_distance(self):
+        assert BM25Index(RECORDS, max_edit_distance=0).query_terms("theift") == []
+
+    def test_snapshot_keeps_expansions(self, tmp_path):
+        BM25Index(RECORDS).save(str(tmp_path / "lexical"), index_version="v1", record_ids=["a", "b", "c", "d"])
+        loaded, _ = BM25Index.load(str(tmp_path / "lexical"), "v1")
+        assert isinstance(loaded.spelling.delete_keys, np.memmap)
+        assert loaded.query_terms("intimidaton") == [(loaded.vocabulary["intimidation"], pytest.approx(0.6))]
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    rng = np.random.default_rng(7)
+    vocabulary = ["section", "theft", "property", "woman", "assault", "house",
+                  "trespass", "extortion", "murder", "hurt", "force", "money"]
+    # Zipf-ish term distribution so that "section" is in almost every document.
+    probabilities = np.array([0.3] + [0.7 / (rank + 1) for rank in range(len(vocabulary) - 1)])
+    probabilities /= probabilities.sum()
+    return [
+        {"id": f"doc_{i}", "document": " ".join(rng.choice(vocabulary, size=rng.integers(3, 40), p=probabilities))}
+        for i in range(400)
+    ]
+
+
+class TestBM25TopK:
+
+    @pytest.mark.parametrize("query,k", [
+        ("section theft", 5),
+        ("section property woman assault", 20),
+        ("murder murder hurt", 1),
+        ("section", 50),
+        ("extortion money force house", 400),
+    ])
+    def test_matches_exhaustive_ranking(self, corpus, query, k):
+        index = BM25Index(corpus)
+        full = index.score(query)
+        positive = np.flatnonzero(full > 0)
+        expected = positive[np.lexsort((positive, -full[positive]))][:k]
+
+        documents, scores = index.top_k(query, k)
+
+        assert documents.tolist() == expected.tolist()
+        np.testing.assert_allclose(scores, full[expected], rtol=1e-9)
+
+    def test_upper_bounds_cover_postings(self, corpus):
+        index = BM25Index(corpus)
+        for term_id in range(len(index.vocabulary)):
+            _, weights = index.postings(term_id)
+            assert index.upper_bounds[term_id] == weights.max()
+
+    def test_allowed_bitmap_matches_filtered_exhaustive_ranking(self, corpus):
+        index = BM25Index(corpus)
+        allowed = np.arange(len(corpus)) % 3 == 0
+        full = np.where(allowed, index.score("section theft woman"), 0.0)
+        positive = np.flatnonzero(full > 0)
+        expected = positive[np.lexsort((positive, -full[positive]))][:10]
+
+        documents, scores = index.top_k("section theft woman", 10, allowed)
+
+        assert documents.tolist() == expected.tolist()
+        np.testing.assert_allclose(scores, full[expected], rtol=1e-9)
+        batched_documents, _ = index.top_k_many(["section theft woman"], 10, allowed)[0]
+        assert batched_documents.tolist() == documents.tolist()
+
+    def test_unknown_query_returns_nothing(self, corpus):
+        documents, scores = BM25Index(corpus).top_k("zzz", 10)
+        assert documents.size == 0 and scores.size == 0
+
+    def test_non_positive_k_returns_nothing(self, corpus):
+        documents, _ = BM25Index(corpus).top_k("theft", 0)
+        assert documents.size == 0
+
+    def test_score_documents_matches_full_scores(self, corpus):
+        index = BM25Index(corpus)
+        subset = np.array([399, 3, 150, 3, 0])
+        np.testing.assert_allclose(
+            index.score_documents("section theft woman", subset),
+            index.score("section theft woman")[subset],
+            rtol=1e-9,
+        )
+
+
+def _random_queries(vocabulary, count, seed):
+    rng = np.random.default_rng(seed)
+    # Repeated terms are common, and they are what made the pruning bound drift.
+    return [" ".join(rng.choice(vocabulary, size=rng.integers(1, 7))) for _ in range(count)]
+
+
+@pytest.fixture(scope="module")
+def random_index():
+    rng = np.random.default_rng(1)
+    vocabulary = [f"w{i}" for i in range(60)]
+    records = [
+        {"id": f"doc_{i}", "document": " ".join(rng.choice(vocabulary, size=rng.integers(3, 30)))}
+        for i in range(500)
+    ]
+    return BM25Index(records, max_edit_distance=0), vocabulary
+
+
+class TestBM25TopKRandomized:
+    @pytest.mark.parametrize("filtered", [False, True])
+    def test_matches_exhaustive_scoring(self, random_index, filtered):
+        index, vocabulary = random_index
+        allowed = np.arange(index.document_count) % 4 != 1 if filtered else None
+        rng = np.random.default_rng(5)
+        for query in _random_queries(vocabulary, 1000, seed=11 + filtered):
+            k = int(rng.integers(1, 12))
+            full = index.score(query)
+            if allowed is not None:
+                full = np.where(allowed, full, 0.0)
+            positive = np.flatnonzero(full > 0)
+            expected = positive[np.lexsort((positive, -full[positive]))][:k]
+
+            documents, scores = index.top_k(query, k, allowed)
+
+            assert documents.tolist() == expected.tolist(), query
+            np.testing.assert_allclose(scores, full[expected], rtol=1e-9)
+
+
+class TestBM25TopKManyRandomized:
+    def test_batched_and_single_query_paths_agree(self, random_index):
+        index, vocabulary = random_index
+        queries = _random_queries(vocabulary, 1000, seed=23)
+        for k in (1, 2, 5, 20):
+            batched = index.top_k_many(queries, k)
+            for query, (documents, scores) in zip(queries, batched):
+                expected_documents, expected_scores = index.top_k(query, k)
+                assert documents.tolist() == expected_documents.tolist(), query
+                assert scores.tolist() == expected_scores.tolist()
+
+
+class TestBM25TopKMany:
+    QUERIES = ["section theft", "", "zzz", "murder murder hurt", "extortion money force house", "section"]
+
+    def test_matches_single_query_top_k_exactly(self, corpus):
+        index = BM25Index(corpus)
+        batched = index.top_k_many(self.QUERIES, 20)
+
+        assert len(batched) == len(self.QUERIES)
+        for query, (documents, scores) in zip(self.QUERIES, batched):
+            expected_documents, expected_scores = index.top_k(query, 20)
+            assert documents.tolist() == expected_documents.tolist()
+            assert scores.tolist() == expected_scores.tolist()
+
+    def test_blocks_large_batches(self, corpus, monkeypatch):
+        from app.services import bm25
+        index = BM25Index(corpus)
+        monkeypatch.setattr(bm25, "_MAX_BATCH_CELLS", 2 * index.document_count)
+        batched = index.top_k_many(self.QUERIES, 5)
+        assert [d.tolist() for d, _ in batched] == [index.top_k(q, 5)[0].tolist() for q in self.QUERIES]
+
+    def test_empty_batch(self, corpus):
+        assert BM25Index(corpus).top_k_many([], 5) == []
+
+
+class TestBM25Snapshot:
+    def test_round_trip_is_memory_mapped(self, corpus, tmp_path):
+        index = BM25Index(corpus)
+        record_ids = [record["id"] for record in corpus]
+        index.save(str(tmp_path / "lexical"), index_version="v1", record_ids=record_ids)
+
+        loaded, loaded_ids = BM25Index.load(str(tmp_path / "lexical"), "v1")
+
+        assert loaded_ids == record_ids
+        assert isinstance(loaded.weights, np.memmap)
+        assert loaded.vocabulary == index.vocabulary
+        np.testing.assert_allclose(loaded.score("section theft"), index.score("section theft"))
+        assert loaded.top_k("murder hurt", 5)[0].tolist() == index.top_k("murder hurt", 5)[0].tolist()
+
+    def test_version_mismatch_returns_none(self, tmp_path):
+        BM25Index(RECORDS).save(str(tmp_path), index_version="old", record_ids=["a", "b", "c", "d"])
+        assert BM25Index.load(str(tmp_path), "new") is None
+
+    def test_missing_snapshot_returns_none(self, tmp_path):
+        assert BM25Index.load(str(tmp_path / "absent"), "v1") is None
+
+    def test_overwrites_previous_snapshot(self, tmp_path):
+        directory = str(tmp_path / "lexical")
+        BM25Index(RECORDS).save(directory, index_version="v1", record_ids=["a", "b", "c", "d"])
+        BM25Index(RECORDS[:2]).save(directory, index_version="v2", record_ids=["a", "b"])
+
+        assert BM25Index.load(directory, "v1") is None
+        loaded, record_ids = BM25Index.load(directory, "v2")
+        assert record_ids == ["a", "b"]
+        assert loaded.document_count == 2
@@ -0,0 +1,48 @@
+"""
+Unit tests for backend.app.services.embedding_pool
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from app.services import embedding_pool
+from app.services.embedding_pool import embed_documents_parallel, threads_per_worker
+
+
+def _fake_shard(start, texts):
+    return start, np.array([[len(text), float(start)] for text in texts], dtype=np.float32)
+
+
+class TestEmbedDocumentsParallel:
+    def test_shards_are_written_back_in_input_order(self, monkeypatch):
+        monkeypatch.setattr(embedding_pool, "_embed_shard", _fake_shard)
+        texts = ["a" * length for length in range(1, 8)]
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            vectors = embed_documents_parallel(texts, workers=3, shard_size=2, executor=executor)
+
+        assert [vector[0] for vector in vectors] == [float(len(text)) for text in texts]
+        assert [vector[1] for vector in vectors] == [0.0, 0.0, 2.0, 2.0, 4.0, 4.0, 6.0]
+
+    def test_shard_errors_propagate(self, monkeypatch):
+        def _broken(start, texts):
+            raise RuntimeError("worker died")
+
+        monkeypatch.setattr(embedding_pool, "_embed_shard", _broken)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            with pytest.raises(RuntimeError, match="worker died"):
+                embed_documents_parallel(["theft", "hurt"], workers=2, shard_size=1, executor=executor)
+
+    def test_empty_input(self):
+        assert embed_documents_parallel([], workers=4) == []
+
+
+class TestThreadsPerWorker:
+    def test_explicit_threads_win(self):
+        assert threads_per_worker(4, threads=3) == 3
+
+    def test_splits_cores_between_workers(self, monkeypatch):
+        monkeypatch.setattr(embedding_pool.os, "cpu_count", lambda: 8)
+        assert threads_per_worker(3) == 2
+        assert threads_per_worker(16) == 1
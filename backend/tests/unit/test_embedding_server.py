@@ -0,0 +1,119 @@
+"""
+Unit tests for backend.app.services.embedding_server
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app.services.embedding_server import EmbeddingClient, EmbeddingServer
+
+
+class _FakeService:
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.delay = delay
+
+    def embed_texts(self, texts, mode):
+        self.calls.append((list(texts), mode))
+        time.sleep(self.delay)
+        if "boom" in texts:
+            raise RuntimeError("model crashed")
+        return [[float(len(text)), 1.0 if mode == "query" else 0.0] for text in texts]
+
+    def cache_stats(self):
+        return {"disk_hits": len(self.calls), "misses": 0}
+
+
+@pytest.fixture()
+def socket_path():
+    # AF_UNIX paths are limited to ~100 bytes, too short for pytest's tmp_path.
+    directory = tempfile.mkdtemp(prefix="emb-")
+    yield f"{directory}/embeddings.sock"
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def _start(socket_path, service):
+    server = EmbeddingServer(socket_path, service)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def _stop(server):
+    server.shutdown()
+    server.server_close()
+
+
+class TestEmbeddingServer:
+    def test_round_trip(self, socket_path):
+        service = _FakeService()
+        server = _start(socket_path, service)
+        try:
+            client = EmbeddingClient(socket_path, timeout=5)
+            vectors = client.embed(["theft", "hurt"], "document")
+            again = client.embed(["murder"], "query")
+        finally:
+            _stop(server)
+
+        assert vectors.dtype == np.float32
+        assert vectors.tolist() == [[5.0, 0.0], [4.0, 0.0]]
+        assert again.tolist() == [[6.0, 1.0]]
+        assert service.calls == [(["theft", "hurt"], "document"), (["murder"], "query")]
+
+    def test_server_errors_are_raised_and_connection_survives(self, socket_path):
+        server = _start(socket_path, _FakeService())
+        try:
+            client = EmbeddingClient(socket_path, timeout=5)
+            with pytest.raises(RuntimeError, match="model crashed"):
+                client.embed(["boom"], "query")
+            with pytest.raises(RuntimeError, match="Unknown embedding mode"):
+                client.embed(["theft"], "passage")
+            assert client.embed(["theft"], "query").shape == (1, 2)
+        finally:
+            _stop(server)
+
+    def test_client_reconnects_after_server_restart(self, socket_path):
+        server = _start(socket_path, _FakeService())
+        client = EmbeddingClient(socket_path, timeout=5)
+        client.embed(["theft"], "query")
+        _stop(server)
+
+        server = _start(socket_path, _FakeService())
+        try:
+            assert client.embed(["hurt"], "query").tolist() == [[4.0, 1.0]]
+        finally:
+            _stop(server)
+
+    def test_document_timeout_scales_with_batch_size(self, socket_path):
+        server = _start(socket_path, _FakeService(delay=0.3))
+        try:
+            client = EmbeddingClient(socket_path, timeout=0.1, document_timeout=0.2)
+            assert client.embed(["theft", "hurt"], "document").shape == (2, 2)
+            with pytest.raises(OSError):
+                client.embed(["theft"], "query")
+        finally:
+            _stop(server)
+
+    def test_stats_come_from_the_server(self, socket_path):
+        server = _start(socket_path, _FakeService())
+        try:
+            client = EmbeddingClient(socket_path, timeout=5)
+            client.embed(["theft"], "query")
+            assert client.stats() == {"disk_hits": 1, "misses": 0}
+        finally:
+            _stop(server)
+
+    def test_wait_until_available_times_out(self, socket_path):
+        with pytest.raises(ConnectionError):
+            EmbeddingClient(socket_path).wait_until_available(timeout=0.3)
+
+    def test_socket_is_removed_on_close(self, socket_path):
+        server = _start(socket_path, _FakeService())
+        assert os.path.exists(socket_path)
+        _stop(server)
+        assert not os.path.exists(socket_path)
@@ -0,0 +1,331 @@
+"""
+Unit tests for backend.app.services.embeddings
+"""
+import sqlite3
+import threading
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from app.services import embeddings
+from app.services.batching import MicroBatcher
+from app.services.embeddings import InLegalBERTEmbeddingService, _EmbeddingCache
+
+
+class _FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        return np.array([[len(text), 0.5, -1.0] for text in texts], dtype=np.float64)
+
+
+@pytest.fixture()
+def service(tmp_db):
+    service = object.__new__(InLegalBERTEmbeddingService)
+    service.model_name = "fake-model"
+    service.batch_size = 8
+    service.token_budget = 0
+    service.query_instruction = ""
+    service.model = _FakeModel()
+    service._cache = _EmbeddingCache(tmp_db)
+    return service
+
+
+class TestEmbeddingCache:
+    def test_round_trips_float32_blobs(self, tmp_db):
+        cache = _EmbeddingCache(tmp_db)
+        cache.set_many([("a", np.array([0.25, -1.5], dtype=np.float32))])
+
+        found = cache.get_many(["a", "missing"])
+
+        assert list(found) == ["a"]
+        assert found["a"].dtype == np.float32
+        assert found["a"].tolist() == [0.25, -1.5]
+        with sqlite3.connect(tmp_db) as connection:
+            (blob,) = connection.execute("SELECT vector FROM embedding_vectors").fetchone()
+        assert isinstance(blob, bytes) and len(blob) == 8
+
+    def test_lookups_are_batched(self, tmp_db, monkeypatch):
+        monkeypatch.setattr(embeddings, "_CACHE_LOOKUP_BATCH", 2)
+        cache = _EmbeddingCache(tmp_db)
+        cache.set_many((str(index), np.full(2, index, dtype=np.float32)) for index in range(5))
+
+        found = cache.get_many([str(index) for index in range(5)] + ["0"])
+
+        assert sorted(found) == ["0", "1", "2", "3", "4"]
+        assert found["3"].tolist() == [3.0, 3.0]
+
+    def test_uses_one_wal_connection_per_thread(self, tmp_db):
+        cache = _EmbeddingCache(tmp_db)
+        assert cache._connection() is cache._connection()
+        assert cache._connection().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(cache._connection()))
+        thread.start()
+        thread.join()
+        assert other[0] is not cache._connection()
+
+    def test_migrates_legacy_json_rows(self, tmp_db):
+        with sqlite3.connect(tmp_db) as connection:
+            connection.execute("CREATE TABLE embedding_cache (cache_key TEXT PRIMARY KEY, vector_json TEXT)")
+            connection.executemany(
+                "INSERT INTO embedding_cache VALUES (?, ?)",
+                [("a", "[0.5, 1.5]"), ("b", "[2.0, 3.0]"), ("broken", "{not json")],
+            )
+        cache = _EmbeddingCache(tmp_db)
+
+        found = cache.get_many(["a", "b", "broken"])
+        assert {key: vector.tolist() for key, vector in found.items()} == {"a": [0.5, 1.5], "b": [2.0, 3.0]}
+        with sqlite3.connect(tmp_db) as connection:
+            tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        assert tables == {"embedding_vectors"}
+
+    def test_migration_keeps_newer_rows(self, tmp_db):
+        _EmbeddingCache(tmp_db).set_many([("a", _vector(7))])
+        with sqlite3.connect(tmp_db) as connection:
+            connection.execute("CREATE TABLE embedding_cache (cache_key TEXT PRIMARY KEY, vector_json TEXT)")
+            connection.execute("INSERT INTO embedding_cache VALUES ('a', '[1.0, 1.0]')")
+        assert _EmbeddingCache(tmp_db).get_many(["a"])["a"].tolist() == [7.0] * 4
+
+
+def _vector(value):
+    return np.full(4, value, dtype=np.float32)
+
+
+class TestEmbeddingCacheBounds:
+    def test_evicts_least_recently_used_rows_past_row_cap(self, tmp_db, monkeypatch):
+        clock = iter(range(100, 200))
+        monkeypatch.setattr(embeddings.time, "time", lambda: next(clock))
+        cache = _EmbeddingCache(tmp_db, max_rows=3)
+        cache.set_many([("a", _vector(1)), ("b", _vector(2)), ("c", _vector(3))])
+        cache.get_many(["a"])
+
+        cache.set_many([("d", _vector(4))])
+
+        # evicts down to 90% of the cap: "b" and "c" were the least recently used
+        assert sorted(cache.get_many(["a", "b", "c", "d"])) == ["a", "d"]
+        assert cache.stats()["evictions"] == 2
+
+    def test_hits_do_not_write_until_eviction(self, tmp_db, monkeypatch):
+        clock = iter(range(100, 200))
+        monkeypatch.setattr(embeddings.time, "time", lambda: next(clock))
+        cache = _EmbeddingCache(tmp_db, max_rows=10)
+        cache.set_many([("a", _vector(1)), ("b", _vector(2))])
+        changes = cache._connection().total_changes
+
+        cache.get_many(["a", "b"])
+        cache.get_many(["a"])
+
+        assert cache._connection().total_changes == changes
+        assert cache._pending_access == {"a": 102, "b": 101}
+
+    def test_inserts_do_not_scan_the_table_below_the_cap(self, tmp_db, monkeypatch):
+        cache = _EmbeddingCache(tmp_db, max_rows=100)
+        scans = []
+        usage = cache._usage
+        monkeypatch.setattr(cache, "_usage", lambda connection: scans.append(1) or usage(connection))
+
+        for index in range(50):
+            cache.set_many([(str(index), _vector(index))])
+        assert scans == []
+
+        cache.set_many((str(index), _vector(index)) for index in range(50, 101))
+        assert len(scans) == 1
+        assert cache._rows <= 100
+
+    def test_counters_start_from_the_existing_table(self, tmp_db):
+        _EmbeddingCache(tmp_db).set_many([("a", _vector(1)), ("b", _vector(2))])
+        cache = _EmbeddingCache(tmp_db, max_rows=2)
+        assert (cache._rows, cache._bytes) == (2, 32)
+
+        cache.set_many([("c", _vector(3))])
+        assert cache.stats()["rows"] == 1
+
+    def test_memory_hits_keep_rows_from_eviction(self, tmp_db, monkeypatch):
+        clock = iter(range(100, 200))
+        monkeypatch.setattr(embeddings.time, "time", lambda: next(clock))
+        cache = _EmbeddingCache(tmp_db, max_rows=3, memory_entries=4)
+        cache.set_many([("hot", _vector(1))], hot=True)
+        cache.set_many([("b", _vector(2)), ("c", _vector(3))])
+        assert cache.get_many(["hot"], hot=True)
+        assert cache.stats()["memory_hits"] == 1
+
+        cache.set_many([("d", _vector(4))])
+
+        assert sorted(cache.get_many(["hot", "b", "c", "d"])) == ["d", "hot"]
+
+    def test_byte_cap(self, tmp_db):
+        cache = _EmbeddingCache(tmp_db, max_bytes=64)
+        cache.set_many((str(index), _vector(index)) for index in range(6))
+
+        stats = cache.stats()
+        assert stats["bytes"] <= 64
+        assert stats["rows"] == stats["bytes"] // 16
+
+    def test_counters(self, tmp_db):
+        cache = _EmbeddingCache(tmp_db)
+        cache.set_many([("a", _vector(1))])
+        cache.get_many(["a", "b"])
+
+        stats = cache.stats()
+        assert (stats["disk_hits"], stats["misses"], stats["memory_hits"]) == (1, 1, 0)
+        assert (stats["rows"], stats["bytes"]) == (1, 16)
+
+    def test_hot_lookups_are_served_from_memory(self, tmp_db):
+        cache = _EmbeddingCache(tmp_db, memory_entries=1)
+        cache.set_many([("a", _vector(1))], hot=True)
+        with sqlite3.connect(tmp_db) as connection:
+            connection.execute("DELETE FROM embedding_vectors")
+
+        assert cache.get_many(["a"], hot=True)["a"].tolist() == [1.0] * 4
+        assert cache.get_many(["a"]) == {}
+        assert cache.stats()["memory_hits"] == 1
+
+    def test_memory_tier_is_lru_bounded(self, tmp_db):
+        cache = _EmbeddingCache(tmp_db, memory_entries=2)
+        cache.set_many([("a", _vector(1)), ("b", _vector(2))], hot=True)
+        cache.get_many(["a"], hot=True)
+        cache.set_many([("c", _vector(3))], hot=True)
+        assert list(cache._memory) == ["a", "c"]
+
+    def test_disk_hits_are_promoted_into_memory(self, tmp_db):
+        cache = _EmbeddingCache(tmp_db, memory_entries=4)
+        cache.set_many([("a", _vector(1))])
+        assert not cache._memory
+        cache.get_many(["a"], hot=True)
+        assert list(cache._memory) == ["a"]
+
+    def test_compaction_after_evictions(self, tmp_db, monkeypatch):
+        monkeypatch.setattr(embeddings, "_COMPACT_AFTER_EVICTIONS", 1)
+        compacted = threading.Event()
+        monkeypatch.setattr(_EmbeddingCache, "compact", lambda self: compacted.set())
+        cache = _EmbeddingCache(tmp_db, max_rows=1)
+        cache.set_many([("a", _vector(1)), ("b", _vector(2))])
+        assert compacted.wait(timeout=2)
+
+    def test_compact_counts(self, tmp_db):
+        cache = _EmbeddingCache(tmp_db)
+        cache.set_many([("a", _vector(1))])
+        cache.compact()
+        assert cache.stats()["compactions"] == 1
+        assert cache.get_many(["a"])["a"].tolist() == [1.0] * 4
+
+    def test_adds_last_access_to_existing_table(self, tmp_db):
+        with sqlite3.connect(tmp_db) as connection:
+            connection.execute("CREATE TABLE embedding_vectors (cache_key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+            connection.execute("INSERT INTO embedding_vectors VALUES ('a', ?)", (_vector(1).tobytes(),))
+        cache = _EmbeddingCache(tmp_db, max_rows=1)
+        cache.set_many([("b", _vector(2))])
+        assert list(cache.get_many(["a", "b"])) == ["b"]
+
+
+class TestEmbed:
+    def test_encodes_only_misses_and_caches_them(self, service):
+        first = service.embed_documents(["theft", "extortion"])
+        second = service.embed_documents(["extortion", "murder", "theft"])
+
+        assert service.model.calls == [["theft", "extortion"], ["murder"]]
+        assert second == [first[1], [6.0, 0.5, -1.0], first[0]]
+
+    def test_duplicate_texts_are_encoded_once(self, service):
+        vectors = service.embed_documents(["theft", " theft ", "hurt"])
+        assert service.model.calls == [["theft", "hurt"]]
+        assert vectors[0] == vectors[1]
+
+    def test_repeated_queries_skip_sqlite(self, service):
+        service._cache.memory_entries = 8
+        service.embed_query("theft")
+        service.embed_query("theft")
+        assert service.cache_stats()["memory_hits"] == 1
+        assert service.cache_stats()["disk_hits"] == 0
+
+    def test_query_and_document_modes_are_cached_separately(self, service):
+        service.embed_documents(["theft"])
+        assert service.embed_query("theft") == [5.0, 0.5, -1.0]
+        assert len(service.model.calls) == 2
+
+    def test_query_misses_go_through_the_batcher(self, service):
+        submitted = []
+        service._query_batcher = MicroBatcher(
+            lambda texts: submitted.append(list(texts)) or service._encode_uncached(texts),
+            max_wait_ms=0,
+        )
+        service.embed_documents(["hurt"])
+        assert service.embed_query("theft") == [5.0, 0.5, -1.0]
+        assert submitted == [["theft"]]
+
+    def test_embed_queries_keeps_empty_slots(self, service):
+        assert service.embed_queries(["theft", "  "]) == [[5.0, 0.5, -1.0], []]
+
+
+class _Tokenizer:
+    def __call__(self, texts, **kwargs):
+        return {"input_ids": [[0] * (len(text.split()) + 2) for text in texts]}
+
+
+class TestTokenBudgetBatching:
+    def test_documents_are_length_bucketed_and_returned_in_order(self, service):
+        service.model.tokenizer = _Tokenizer()
+        service.token_budget = 12
+        texts = ["a b", "a b c d e f g h", "a", "a b c d"]
+
+        vectors = service.embed_documents(texts)
+
+        # token lengths 4, 10, 3, 6: longest first, at most 12 padded tokens per batch
+        assert service.model.calls == [["a b c d e f g h"], ["a b c d", "a b"], ["a"]]
+        assert [vector[0] for vector in vectors] == [float(len(text)) for text in texts]
+
+    def test_falls_back_to_word_estimate_without_tokenizer(self, service):
+        assert service._token_lengths(["a b c d e f g h i j"]) == [15]
+
+    def test_queries_are_not_bucketed(self, service):
+        service.model.tokenizer = _Tokenizer()
+        service.token_budget = 1
+        service.embed_queries(["theft", "criminal breach of trust"])
+        assert service.model.calls == [["theft", "criminal breach of trust"]]
+
+
+class TestClientMode:
+    def test_embeddings_come_from_the_server(self, service):
+        client = MagicMock()
+        client.embed.side_effect = lambda texts, mode: np.array([[len(text), 2.0] for text in texts], dtype=np.float32)
+        service._client = client
+        service.query_instruction = "query: "
+
+        assert service.embed_query(" theft ") == [12.0, 2.0]
+        assert service.embed_documents(["hurt"]) == [[4.0, 2.0]]
+        assert [call.args for call in client.embed.call_args_list] == [(["query: theft"], "query"), (["hurt"], "document")]
+        assert service.model.calls == []
+
+    def test_cache_stats_come_from_the_server(self, service):
+        service._client = MagicMock()
+        service._client.stats.return_value = {"disk_hits": 3}
+        assert service.cache_stats() == {"disk_hits": 3}
+
+        service._client.stats.side_effect = ConnectionError("server down")
+        assert service.cache_stats() == {}
+
+
+class TestEmbeddingBackend:
+    def test_onnx_failure_falls_back_to_torch(self, service, monkeypatch):
+        def _broken(*args, **kwargs):
+            raise ImportError("No module named 'onnxruntime'")
+
+        monkeypatch.setattr(embeddings, "load_onnx_encoder", _broken)
+        service.model_cache_dir = "/tmp"
+        assert service._load_onnx_model() is None
+        assert service.backend == "torch"
+
+    def test_int8_vectors_are_cached_apart_from_torch(self, service, monkeypatch):
+        torch_key = service._build_cache_key("theft", "query")
+        monkeypatch.setattr(embeddings.settings, "EMBEDDING_ONNX_QUANTIZE", True)
+        monkeypatch.setattr(embeddings, "load_onnx_encoder", lambda *args, **kwargs: _FakeModel())
+        service.model_cache_dir = "/tmp"
+
+        assert isinstance(service._load_onnx_model(), _FakeModel)
+        assert service.backend == "onnx-int8"
+        assert service._build_cache_key("theft", "query") != torch_key
@@ -0,0 +1,87 @@
+"""
+Unit tests for backend.app.services.filters
+"""
+import math
+
+import numpy as np
+import pytest
+
+from app.services.filters import MetadataColumns, MetadataFilter, section_value
+
+
+COLUMNS = MetadataColumns.from_metadatas([
+    {"act_name": "BNS", "section_number": "74", "chunk_index": 0},
+    {"act_name": "BNS", "section_number": "303", "chunk_index": 0},
+    {"act_name": "BNS", "section_number": "303", "chunk_index": 1},
+    {"act_name": "BNSS", "section_number": "303", "chunk_index": 0},
+    {"act_name": "BNS", "section_number": "318(4)", "chunk_index": 0},
+    {"act_name": "BNS", "section_number": "Schedule", "chunk_index": 0},
+    None,
+])
+
+
+class TestSectionValue:
+    @pytest.mark.parametrize("number,expected", [("303", 303.0), ("318(4)", 318.0), (74, 74.0)])
+    def test_leading_number(self, number, expected):
+        assert section_value(number) == expected
+
+    def test_no_number_is_nan(self):
+        assert math.isnan(section_value("Schedule"))
+
+
+class TestMetadataFilter:
+    def _mask(self, filters):
+        return np.flatnonzero(MetadataFilter.parse(filters).mask(COLUMNS)).tolist()
+
+    def test_act_name(self):
+        assert self._mask({"act_name": "BNSS"}) == [3]
+
+    def test_exact_sections_and_chunk_index(self):
+        assert self._mask({"section_number": ["303", 74], "chunk_index": 0}) == [0, 1, 3]
+
+    def test_section_range_is_inclusive_and_numeric(self):
+        assert self._mask({"act_name": "BNS", "section_number": {"$gte": 300, "$lte": 318}}) == [1, 2, 4]
+        assert self._mask({"section_number": {"$gte": 304}}) == [4]
+
+    def test_where_clause_lists_matching_sections(self):
+        metadata_filter = MetadataFilter.parse({"act_name": "BNS", "section_number": {"$lte": 303}})
+        where = metadata_filter.where(COLUMNS, metadata_filter.mask(COLUMNS))
+        assert where == {"$and": [
+            {"act_name": {"$in": ["BNS"]}},
+            {"section_number": {"$in": ["303", "74"]}},
+        ]}
+
+    def test_single_clause_where(self):
+        metadata_filter = MetadataFilter.parse({"chunk_index": [1]})
+        assert metadata_filter.where(COLUMNS, metadata_filter.mask(COLUMNS)) == {"chunk_index": {"$in": [1]}}
+
+    def test_empty_filters_parse_to_none(self):
+        assert MetadataFilter.parse(None) is None
+        assert MetadataFilter.parse({}) is None
+
+    def test_cache_key_ignores_value_order(self):
+        first = MetadataFilter.parse({"section_number": ["74", "303"]})
+        second = MetadataFilter.parse({"section_number": ["303", "74"]})
+        assert first.cache_key() == second.cache_key()
+
+    @pytest.mark.parametrize("filters", [
+        {"chapter": "V"},
+        {"section_number": {"$gt": 3}},
+        {"section_number": {}},
+        ["BNS"],
+    ])
+    def test_rejects_unsupported_filters(self, filters):
+        with pytest.raises(ValueError):
+            MetadataFilter.parse(filters)
+
+
+class TestMetadataColumns:
+    def test_round_trip_and_version_check(self, tmp_path):
+        COLUMNS.save(str(tmp_path), "v1")
+        loaded = MetadataColumns.load(str(tmp_path), "v1", len(COLUMNS))
+        assert loaded.section_numbers.tolist() == COLUMNS.section_numbers.tolist()
+        assert MetadataColumns.load(str(tmp_path), "v2", len(COLUMNS)) is None
+        assert MetadataColumns.load(str(tmp_path), "v1", len(COLUMNS) + 1) is None
+
+    def test_missing_file_returns_none(self, tmp_path):
+        assert MetadataColumns.load(str(tmp_path), "v1", 0) is None
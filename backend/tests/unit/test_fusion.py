@@ -0,0 +1,60 @@
+"""
+Unit tests for backend.app.services.fusion
+"""
+import numpy as np
+import pytest
+
+from app.services.fusion import fuse
+
+
+VECTOR = (np.array([4, 1, 7]), np.array([0.9, 0.6, 0.3]))
+BM25 = (np.array([1, 2]), np.array([1.0, 0.5]))
+
+
+def _scores_by_position(fused):
+    return dict(zip(fused.positions.tolist(), fused.scores.tolist()))
+
+
+class TestFuse:
+    def test_union_of_candidates_with_parallel_components(self):
+        fused = fuse(*VECTOR, *BM25)
+        assert fused.positions.tolist() == [1, 2, 4, 7]
+        assert fused.vector_scores.tolist() == [0.6, 0.0, 0.9, 0.3]
+        assert fused.bm25_scores.tolist() == [1.0, 0.5, 0.0, 0.0]
+        assert fused.has_vector.tolist() == [True, False, True, True]
+
+    def test_probabilistic_or_matches_original_formula(self):
+        scores = _scores_by_position(fuse(*VECTOR, *BM25, method="probabilistic_or"))
+        assert scores[1] == pytest.approx(1.0)
+        assert scores[4] == pytest.approx(0.9)
+        assert scores[2] == pytest.approx(0.5)
+
+    def test_weighted_sum(self):
+        scores = _scores_by_position(fuse(*VECTOR, *BM25, method="weighted", vector_weight=0.75))
+        assert scores[1] == pytest.approx(0.75 * 0.6 + 0.25 * 1.0)
+        assert scores[7] == pytest.approx(0.75 * 0.3)
+
+    def test_rrf_is_normalised_to_unit_range(self):
+        scores = _scores_by_position(fuse(*VECTOR, *BM25, method="rrf", rrf_k=60))
+        top = 2.0 / 61.0
+        assert scores[1] == pytest.approx((1 / 62 + 1 / 61) / top)
+        assert scores[4] == pytest.approx((1 / 61) / top)
+        assert max(scores.values()) <= 1.0
+
+    def test_scores_are_clipped_before_combining(self):
+        fused = fuse(np.array([0]), np.array([-0.4]), np.array([0]), np.array([0.5]))
+        assert fused.scores.tolist() == [0.5]
+        assert fused.vector_scores.tolist() == [-0.4]
+
+    def test_order_breaks_ties_by_vector_then_bm25(self):
+        fused = fuse(np.array([3, 5]), np.array([0.5, 0.5]), np.array([5, 9]), np.array([0.5, 1.0]))
+        assert fused.positions[fused.order].tolist() == [9, 5, 3]
+
+    def test_empty_inputs(self):
+        empty = np.zeros(0, dtype=np.int64)
+        fused = fuse(empty, np.zeros(0), empty, np.zeros(0))
+        assert fused.positions.size == 0 and fused.order.size == 0
+
+    def test_unknown_method_raises(self):
+        with pytest.raises(ValueError, match="fusion method"):
+            fuse(*VECTOR, *BM25, method="max")
@@ -4,11 +4,17 @@ Unit tests for backend.app.services.ingestion
 import csv
 import io
 import os
+import sys
 import tempfile
 import textwrap
 
+from unittest.mock import MagicMock
+
 import pytest
 
+from app.services import ingestion
+from app.services.bm25 import BM25Index
+from app.services.vector_index import FlatVectorIndex
 from app.services.ingestion import (
     _chunk_text,
     _sanitize_id,
@@ -226,11 +232,11 @@ class TestBuildChunks:
         "plain_language": "molestation outrage modesty",
     }
 
-    def test_first_chunk_contains_plain_language(self):
+    def test_plain_language_is_not_appended_to_documents(self):
         chunks = build_chunks([self.BASE_SECTION])
         first = chunks[0]["document"]
-        assert "also known as" in first
-        assert "molestation" in first
+        assert "also known as" not in first
+        assert "molestation" not in first
 
     def test_subsequent_chunks_omit_plain_language(self):
         # Build a section long enough to produce multiple chunks
@@ -261,6 +267,10 @@ class TestBuildChunks:
         assert meta["section_title"] == "Assault modesty"
         assert meta["chunk_index"] == 0
 
+    def test_metadata_does_not_repeat_section_text(self):
+        chunks = build_chunks([self.BASE_SECTION])
+        assert "full_text" not in chunks[0]["metadata"]
+
     def test_document_prefix_includes_act_and_section(self):
         chunks = build_chunks([self.BASE_SECTION])
         doc = chunks[0]["document"]
@@ -268,3 +278,106 @@ class TestBuildChunks:
 
     def test_empty_sections_list(self):
         assert build_chunks([]) == []
+
+
+# ─── ingest_legal_corpus ──────────────────────────────────────────────────────
+
+class TestIngestLegalCorpus:
+    @pytest.fixture()
+    def ingest_env(self, tmp_path, monkeypatch):
+        csv_path = tmp_path / "sections.csv"
+        csv_path.write_text(
+            "Section,Section _name,Description\n"
+            "303,Theft,Whoever takes movable property out of possession commits theft.\n"
+            "308,Extortion,Whoever intentionally puts any person in fear commits extortion.\n",
+            encoding="utf-8",
+        )
+        # ingestion may have bound either app.* or backend.app.* settings
+        monkeypatch.setattr(ingestion.settings, "VECTOR_STORE_DIR", str(tmp_path / "vector_store"))
+        monkeypatch.setattr(ingestion.settings, "LEXICAL_INDEX_DIR", str(tmp_path / "vector_store" / "lexical_index"))
+        monkeypatch.setattr(ingestion.settings, "FLAT_INDEX_DIR", str(tmp_path / "vector_store" / "flat_index"))
+
+        embedding_service = MagicMock()
+        embedding_service.embed_documents.side_effect = lambda texts: [[0.0, 1.0] for _ in texts]
+        monkeypatch.setattr(ingestion, "InLegalBERTEmbeddingService", lambda: embedding_service)
+
+        client = MagicMock()
+        client.list_collections.return_value = []
+        monkeypatch.setitem(sys.modules, "chromadb", MagicMock(PersistentClient=lambda path: client))
+        return str(csv_path), client
+
+    def test_writes_bm25_snapshot_matching_collection_version(self, ingest_env):
+        csv_path, client = ingest_env
+        ingestion.ingest_legal_corpus(csv_path)
+
+        metadata = client.create_collection.call_args.kwargs["metadata"]
+        added_ids = client.create_collection.return_value.add.call_args.kwargs["ids"]
+
+        snapshot = BM25Index.load(ingestion.settings.LEXICAL_INDEX_DIR, metadata["index_version"])
+        assert snapshot is not None
+        index, record_ids = snapshot
+        assert record_ids == added_ids
+        assert index.top_k("extortion", 1)[0].tolist() == [1]
+
+    def test_multiple_workers_use_the_process_pool(self, ingest_env, monkeypatch):
+        csv_path, client = ingest_env
+        calls = []
+
+        def _parallel(texts, workers, threads, shard_size):
+            calls.append((len(texts), workers))
+            return [[1.0, 0.0] for _ in texts]
+
+        monkeypatch.setattr(ingestion.settings, "INGEST_EMBEDDING_WORKERS", 2)
+        monkeypatch.setattr(ingestion, "embed_documents_parallel", _parallel)
+        ingestion.ingest_legal_corpus(csv_path)
+
+        added = client.create_collection.return_value.add.call_args.kwargs
+        assert calls == [(len(added["ids"]), 2)]
+        assert added["embeddings"][0] == [1.0, 0.0]
+
+    def test_writes_flat_vector_snapshot(self, ingest_env):
+        csv_path, client = ingest_env
+        ingestion.ingest_legal_corpus(csv_path)
+
+        version = client.create_collection.call_args.kwargs["metadata"]["index_version"]
+        vector_index, record_ids = FlatVectorIndex.load(ingestion.settings.FLAT_INDEX_DIR, version)
+        assert len(vector_index) == len(record_ids) == 2
+
+    def test_writes_filter_columns_next_to_bm25_snapshot(self, ingest_env):
+        from app.services.filters import MetadataColumns
+        csv_path, client = ingest_env
+        ingestion.ingest_legal_corpus(csv_path)
+
+        version = client.create_collection.call_args.kwargs["metadata"]["index_version"]
+        columns = MetadataColumns.load(ingestion.settings.LEXICAL_INDEX_DIR, version, 2)
+        assert columns.section_numbers.tolist() == ["303", "308"]
+        assert columns.chunk_indexes.tolist() == [0, 0]
+
+    def test_writes_query_expansions_from_plain_language(self, ingest_env, tmp_path):
+        from app.services.query_expansion import QueryExpansions
+        csv_path, client = ingest_env
+        with open(csv_path, "w", encoding="utf-8") as csv_file:
+            csv_file.write(
+                "Section,Section _name,Description,plain_language\n"
+                "303,Theft,Whoever takes movable property out of possession commits theft.,stealing chori\n"
+                "308,Extortion,Whoever intentionally puts any person in fear commits extortion.,\n"
+            )
+        ingestion.ingest_legal_corpus(csv_path)
+
+        version = client.create_collection.call_args.kwargs["metadata"]["index_version"]
+        expansions = QueryExpansions.load(ingestion.settings.LEXICAL_INDEX_DIR, version)
+        assert expansions.table == {"stealing": {"303": 1.0, "theft": 0.5}, "chori": {"303": 1.0, "theft": 0.5}}
+        documents = client.create_collection.return_value.add.call_args.kwargs["documents"]
+        assert not any("stealing" in document for document in documents)
+
+    def test_index_version_changes_with_content(self, ingest_env):
+        rows = build_chunks([{**TestBuildChunks.BASE_SECTION}])
+        changed = [{**rows[0], "document": rows[0]["document"] + " amended"}]
+        assert ingestion._index_version(rows) == ingestion._index_version(list(rows))
+        assert ingestion._index_version(rows) != ingestion._index_version(changed)
+
+    def test_index_version_changes_with_synonyms(self, ingest_env):
+        from app.services.query_expansion import QueryExpansions
+        rows = build_chunks([{**TestBuildChunks.BASE_SECTION}])
+        expansions = QueryExpansions.from_sections([TestBuildChunks.BASE_SECTION])
+        assert ingestion._index_version(rows) != ingestion._index_version(rows, expansions)
@@ -0,0 +1,122 @@
+"""
+Unit tests for backend.app.services.onnx_encoder
+"""
+import json
+import os
+
+import numpy as np
+import pytest
+
+from app.services import onnx_encoder
+from app.services.onnx_encoder import OnnxSentenceEncoder, export_directory, load_onnx_encoder, parity
+
+
+def _write_manifest(directory, **overrides):
+    os.makedirs(directory, exist_ok=True)
+    manifest = {
+        "format_version": onnx_encoder.ONNX_FORMAT_VERSION,
+        "model_name": "law-ai/InLegalBERT",
+        "max_seq_length": 512,
+        "quantized": False,
+        "parity": {"fp32": 0.9999},
+        **overrides,
+    }
+    with open(os.path.join(directory, "export.json"), "w", encoding="utf-8") as file:
+        json.dump(manifest, file)
+    return manifest
+
+
+class _FakeEncoder:
+    def __init__(self, directory, quantized=False, threads=0, manifest=None):
+        self.directory = directory
+        self.quantized = quantized
+
+
+class TestHelpers:
+    def test_export_directory_is_under_model_cache(self, tmp_path):
+        assert export_directory(str(tmp_path), "law-ai/InLegalBERT") == str(tmp_path / "onnx" / "law-ai--InLegalBERT")
+
+    def test_parity_is_lowest_row_cosine(self):
+        reference = np.array([[1.0, 0.0], [0.0, 1.0]])
+        candidate = np.array([[2.0, 0.0], [1.0, 1.0]])
+        assert parity(reference, candidate) == pytest.approx(np.sqrt(0.5))
+
+    def test_stale_manifest_format_is_ignored(self, tmp_path):
+        _write_manifest(str(tmp_path), format_version=0)
+        assert onnx_encoder.read_manifest(str(tmp_path)) is None
+
+
+class TestLoadOnnxEncoder:
+    @pytest.fixture(autouse=True)
+    def _fake_session(self, monkeypatch):
+        monkeypatch.setattr(onnx_encoder, "OnnxSentenceEncoder", _FakeEncoder)
+
+    def test_reuses_existing_export_without_loading_torch(self, tmp_path):
+        _write_manifest(export_directory(str(tmp_path), "law-ai/InLegalBERT"))
+
+        def _reference():
+            raise AssertionError("torch model should not be loaded")
+
+        encoder = load_onnx_encoder("law-ai/InLegalBERT", str(tmp_path), False, 0.99, _reference)
+        assert isinstance(encoder, _FakeEncoder) and not encoder.quantized
+
+    def test_exports_when_missing_or_not_quantized(self, tmp_path, monkeypatch):
+        directory = export_directory(str(tmp_path), "law-ai/InLegalBERT")
+        _write_manifest(directory)
+        exports = []
+
+        def _export(model, model_name, target, quantize):
+            exports.append((model, target, quantize))
+            return _write_manifest(target, quantized=quantize, parity={"fp32": 0.9999, "int8": 0.995})
+
+        monkeypatch.setattr(onnx_encoder, "export_sentence_model", _export)
+        encoder = load_onnx_encoder("law-ai/InLegalBERT", str(tmp_path), True, 0.99, lambda: "torch-model")
+
+        assert exports == [("torch-model", directory, True)]
+        assert encoder.quantized
+
+    def test_low_parity_export_is_rejected(self, tmp_path):
+        _write_manifest(export_directory(str(tmp_path), "law-ai/InLegalBERT"), parity={"fp32": 0.95})
+        assert load_onnx_encoder("law-ai/InLegalBERT", str(tmp_path), False, 0.99, lambda: None) is None
+
+
+class TestOnnxSentenceEncoder:
+    class _Tokenizer:
+        def __call__(self, texts, **kwargs):
+            width = max(len(text) for text in texts)
+            return {
+                "input_ids": np.array([[len(text)] * width for text in texts]),
+                "attention_mask": np.ones((len(texts), width)),
+            }
+
+    class _Session:
+        def __init__(self):
+            self.batches = []
+
+        def run(self, outputs, feeds):
+            self.batches.append(feeds["input_ids"][:, 0].tolist())
+            return [np.stack([feeds["input_ids"][:, 0], -feeds["input_ids"][:, 0]], axis=1).astype(np.float32)]
+
+    def _encoder(self):
+        encoder = object.__new__(OnnxSentenceEncoder)
+        encoder.tokenizer = self._Tokenizer()
+        encoder.session = self._Session()
+        encoder.input_names = ["input_ids", "attention_mask"]
+        encoder.max_seq_length = 512
+        return encoder
+
+    def test_batches_by_length_and_restores_input_order(self):
+        encoder = self._encoder()
+        embeddings = encoder.encode(["aa", "aaaa", "a", "aaa"], batch_size=2)
+
+        assert encoder.session.batches == [[4, 3], [2, 1]]
+        assert embeddings.dtype == np.float32
+        assert embeddings[:, 0].tolist() == [2.0, 4.0, 1.0, 3.0]
+
+    def test_feeds_only_graph_inputs_as_int64(self):
+        encoder = self._encoder()
+        encoder.input_names = ["input_ids"]
+        fed = []
+        encoder.session.run = lambda outputs, feeds: fed.append(feeds) or [np.zeros((1, 2), dtype=np.float32)]
+        encoder.encode(["theft"])
+        assert list(fed[0]) == ["input_ids"] and fed[0]["input_ids"].dtype == np.int64
@@ -0,0 +1,80 @@
+"""
+Unit tests for backend.app.services.query_expansion
+"""
+import pytest
+
+from app.services.bm25 import BM25Index
+from app.services.query_expansion import QueryExpansions, synonym_phrases
+
+
+SECTIONS = [
+    {"section_number": "303", "section_title": "Theft", "plain_language": "stealing chori pickpocket"},
+    {"section_number": "304", "section_title": "Snatching", "plain_language": "chain snatching, chori"},
+    {"section_number": "318(4)", "section_title": "Cheating", "plain_language": ""},
+]
+
+RECORDS = [
+    {"id": "BNS_303_0", "document": "BNS Section 303: Theft. Whoever takes movable property dishonestly."},
+    {"id": "BNS_304_0", "document": "BNS Section 304: Snatching. Theft is snatching if it is sudden."},
+    {"id": "BNS_318_0", "document": "BNS Section 318: Cheating. Whoever deceives any person."},
+]
+
+
+class TestSynonymPhrases:
+    def test_bag_of_words_cell(self):
+        assert synonym_phrases("rape sexual assault non-consensual intercourse") == [
+            "rape", "sexual", "assault", "consensual", "intercourse",
+        ]
+
+    def test_separated_cell_keeps_phrases(self):
+        assert synonym_phrases("chain snatching; chori, of") == ["chain snatching", "chori"]
+
+    def test_empty_cell(self):
+        assert synonym_phrases("") == []
+
+
+class TestQueryExpansions:
+    def test_table_maps_synonyms_to_section_terms(self):
+        table = QueryExpansions.from_sections(SECTIONS).table
+        assert table["stealing"] == {"303": 1.0, "theft": 0.5}
+        assert table["chain snatching"] == {"304": 1.0, "snatching": 0.5}
+        # shared synonyms split their weight between sections
+        assert table["chori"] == {"303": 0.5, "304": 0.5, "snatching": 0.25, "theft": 0.25}
+
+    def test_expand_caps_weights_and_term_count(self):
+        expansions = QueryExpansions.from_sections(SECTIONS, weight=0.5, max_terms=2)
+        expanded = expansions.expand(["stealing", "chori", "phone"])
+        assert expanded == [("303", 0.5), ("theft", pytest.approx(0.375))]
+
+    def test_expand_matches_phrases(self):
+        expansions = QueryExpansions.from_sections(SECTIONS)
+        assert dict(expansions.expand(["gold", "chain", "snatching"]))["304"] == pytest.approx(0.5)
+        assert expansions.expand(["chain"]) == []
+
+    def test_zero_weight_disables(self):
+        assert QueryExpansions.from_sections(SECTIONS, weight=0.0).expand(["stealing"]) == []
+
+    def test_round_trip_checks_index_version(self, tmp_path):
+        expansions = QueryExpansions.from_sections(SECTIONS)
+        expansions.save(str(tmp_path), "v1")
+        assert QueryExpansions.load(str(tmp_path), "v1").table == expansions.table
+        assert QueryExpansions.load(str(tmp_path), "v2") is None
+        assert QueryExpansions.load(str(tmp_path / "absent"), "v1") is None
+
+
+class TestBM25WithExpansions:
+    def test_synonym_adds_weighted_section_terms(self):
+        index = BM25Index(RECORDS)
+        assert index.top_k("someone did chori", 3)[0].size == 0
+
+        index.expansions = QueryExpansions.from_sections(SECTIONS)
+        documents, _ = index.top_k("stealing my phone", 3)
+        assert documents.tolist()[0] == 0
+
+    def test_synonyms_are_not_typo_corrected(self):
+        index = BM25Index(RECORDS + [{"id": "x", "document": "stealings"}])
+        assert index.query_terms("stealing")
+        index.expansions = QueryExpansions.from_sections(SECTIONS)
+        expanded = {term_id: weight for term_id, weight in index.query_terms("stealing")}
+        assert index.vocabulary["stealings"] not in expanded
+        assert expanded[index.vocabulary["303"]] == pytest.approx(0.5)
@@ -1,7 +1,8 @@
 """
 Unit tests for backend.app.services.rag_service
 """
-from unittest.mock import MagicMock, patch
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -67,3 +68,52 @@ class TestRAGServiceQuerySimilarDocuments:
         except (ValueError, Exception):
             pass
         mock_retriever.retrieve.assert_called_with("query", k=7)
+
+
+class TestRAGServiceQuerySimilarDocumentsAsync:
+    def test_awaits_async_retrieval(self):
+        mock_retriever = MagicMock()
+        mock_retriever.retrieve_async = AsyncMock(return_value={
+            "results": [{"document": "BNS Section 303: Theft.", "score": 0.90}],
+        })
+        svc = _make_service_with_retriever(mock_retriever)
+        docs = asyncio.run(svc.query_similar_documents_async("someone stole my phone", n_results=4))
+        assert docs == ["BNS Section 303: Theft."]
+        mock_retriever.retrieve_async.assert_awaited_once_with("someone stole my phone", k=4)
+
+    def test_propagates_valueerror_and_swallows_others(self):
+        mock_retriever = MagicMock()
+        mock_retriever.retrieve_async = AsyncMock(side_effect=ValueError("Only English queries are supported"))
+        svc = _make_service_with_retriever(mock_retriever)
+        with pytest.raises(ValueError, match="English"):
+            asyncio.run(svc.query_similar_documents_async("मेरा फोन"))
+
+        mock_retriever.retrieve_async.side_effect = RuntimeError("chromadb connection error")
+        assert asyncio.run(svc.query_similar_documents_async("query")) == []
+
+    def test_returns_empty_list_when_retriever_is_none(self):
+        svc = RAGService.__new__(RAGService)
+        svc.retriever = None
+        assert asyncio.run(svc.query_similar_documents_async("query")) == []
+
+
+class TestRAGServiceWarmUp:
+    def test_delegates_to_retriever(self):
+        mock_retriever = MagicMock()
+        svc = _make_service_with_retriever(mock_retriever)
+        svc.warm_up()
+        mock_retriever.warm_up.assert_called_once()
+
+    def test_raises_warm_up_errors(self):
+        mock_retriever = MagicMock()
+        mock_retriever.warm_up.side_effect = RuntimeError("model not downloaded")
+        svc = _make_service_with_retriever(mock_retriever)
+        with pytest.raises(RuntimeError, match="model not downloaded"):
+            svc.warm_up()
+
+    def test_raises_without_retriever(self):
+        svc = RAGService.__new__(RAGService)
+        svc.retriever = None
+        svc.retriever_error = ConnectionError("embedding server down")
+        with pytest.raises(RuntimeError, match="embedding server down"):
+            svc.warm_up()
@@ -0,0 +1,140 @@
+"""
+Unit tests for backend.app.services.rerank
+"""
+import builtins
+import time
+
+import pytest
+
+from app.services import rerank
+from app.services.rerank import CrossEncoderReranker
+
+
+class _Candidate:
+    def __init__(self, item_id, document):
+        self.id = item_id
+        self.document = document
+        self.rerank_score = None
+
+
+class _FakeCrossEncoder:
+    """Scores a pair by how often the query's first word occurs in the document."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.pairs = []
+
+    def predict(self, pairs, batch_size, show_progress_bar):
+        self.pairs.extend(pairs)
+        time.sleep(self.delay)
+        return [float(document.count(query.split()[0])) for query, document in pairs]
+
+
+def _reranker(model, budget_ms=1000, batch_size=2, cache_size=16):
+    reranker = CrossEncoderReranker("fake", budget_ms, batch_size=batch_size, cache_size=cache_size)
+    reranker._model = model
+    return reranker
+
+
+def _candidates():
+    return [
+        _Candidate("a", "robbery"),
+        _Candidate("b", "theft theft"),
+        _Candidate("c", "theft"),
+    ]
+
+
+class TestCrossEncoderReranker:
+    def test_reorders_by_cross_encoder_score(self):
+        reranked, applied = _reranker(_FakeCrossEncoder()).rerank("theft of phone", _candidates())
+
+        assert applied is True
+        assert [candidate.id for candidate in reranked] == ["b", "c", "a"]
+        assert [candidate.rerank_score for candidate in reranked] == [2.0, 1.0, 0.0]
+
+    def test_equal_scores_keep_fused_order(self):
+        candidates = [_Candidate("x", "none"), _Candidate("y", "none")]
+        reranked, _ = _reranker(_FakeCrossEncoder()).rerank("theft", candidates)
+        assert [candidate.id for candidate in reranked] == ["x", "y"]
+
+    def test_scores_are_cached_per_query_and_chunk(self):
+        model = _FakeCrossEncoder()
+        reranker = _reranker(model)
+
+        reranker.rerank("theft of phone", _candidates())
+        reranker.rerank("theft of phone", _candidates())
+        assert len(model.pairs) == 3
+
+        reranker.rerank("robbery at night", _candidates())
+        assert len(model.pairs) == 6
+
+    def test_cache_is_bounded(self):
+        reranker = _reranker(_FakeCrossEncoder(), cache_size=2)
+        reranker.rerank("theft", _candidates())
+        assert len(reranker._cache) == 2
+
+    def test_budget_exhaustion_returns_fused_order(self):
+        candidates = _candidates()
+        reranker = _reranker(_FakeCrossEncoder(delay=0.05), budget_ms=10, batch_size=1)
+
+        reranked, applied = reranker.rerank("theft", candidates)
+
+        assert applied is False
+        assert reranked == candidates
+        assert all(candidate.rerank_score is None for candidate in reranked)
+        # The batch scored before the deadline is kept for the next request.
+        assert len(reranker._cache) == 1
+
+    def test_batches_shrink_to_the_remaining_budget(self):
+        class _PerPairDelay(_FakeCrossEncoder):
+            def predict(self, pairs, batch_size, show_progress_bar):
+                time.sleep(0.02 * len(pairs))
+                return super().predict(pairs, batch_size, show_progress_bar)
+
+        model = _PerPairDelay()
+        reranker = _reranker(model, budget_ms=100, batch_size=8)
+        candidates = [_Candidate(str(index), "theft") for index in range(8)]
+        reranker.rerank("warm", candidates)
+
+        started = time.perf_counter()
+        _, applied = reranker.rerank("theft", candidates)
+
+        # A full batch of 8 would take 160ms; it is cut to what fits in 100ms.
+        assert applied is False
+        assert time.perf_counter() - started < 0.14
+        assert 1 <= len(model.pairs) - 8 <= 5
+
+    def test_single_candidate_skips_the_model(self):
+        model = _FakeCrossEncoder()
+        reranked, applied = _reranker(model).rerank("theft", [_Candidate("a", "theft")])
+        assert applied is False and len(reranked) == 1
+        assert model.pairs == []
+
+    def test_missing_sentence_transformers_disables_rerank(self, monkeypatch):
+        real_import = builtins.__import__
+
+        def fake_import(name, *args, **kwargs):
+            if name == "sentence_transformers":
+                raise ImportError("no sentence_transformers")
+            return real_import(name, *args, **kwargs)
+
+        monkeypatch.setattr(builtins, "__import__", fake_import)
+        reranker = CrossEncoderReranker("fake", 100)
+
+        candidates = _candidates()
+        reranked, applied = reranker.rerank("theft", candidates)
+
+        assert applied is False
+        assert reranked == candidates
+        assert reranker.load() is None
+
+    def test_clear_cache(self):
+        reranker = _reranker(_FakeCrossEncoder())
+        reranker.rerank("theft", _candidates())
+        reranker.clear_cache()
+        assert len(reranker._cache) == 0
+
+
+@pytest.fixture(autouse=True)
+def _model_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(rerank.settings, "MODEL_CACHE_DIR", str(tmp_path))
@@ -1,9 +1,19 @@
 """
 Unit tests for backend.app.services.retrieval
 """
+import asyncio
+import sys
+import threading
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
 import pytest
 
-from app.services.retrieval import _BM25Index, MultilingualLegalRetriever, _normalize_query, is_english
+from app.services import retrieval
+from app.services.bm25 import BM25Index
+from app.services.rerank import CrossEncoderReranker
+from app.services.retrieval import MultilingualLegalRetriever, _normalize_query, is_english
 
 
 # ─── _normalize_query ────────────────────────────────────────────────────────
@@ -137,7 +147,7 @@ class TestHybridRetrieval:
         retriever = MultilingualLegalRetriever.__new__(MultilingualLegalRetriever)
         retriever.embedding_service = self._FakeEmbeddingService()
         retriever.collection = self._FakeCollection([])
-        retriever._search_records = [
+        retriever._index_records([
             {
                 "id": "BNS_74_0",
                 "document": "BNS Section 74: assault modesty and harassment",
@@ -153,8 +163,7 @@ class TestHybridRetrieval:
                 "document": "BNS Section 308: extortion and intimidation",
                 "metadata": {"section_number": "308", "section_title": "Extortion"},
             },
-        ]
-        retriever._bm25_index = _BM25Index(retriever._search_records)
+        ])
 
         payload = retriever.retrieve("theft of phone", k=2)
         results = payload["results"]
@@ -162,3 +171,762 @@ class TestHybridRetrieval:
         assert len(results) == 2
         assert results[0]["metadata"]["section_number"] == "303"
         assert results[1]["metadata"]["section_number"] == "74"
+
+    def test_vector_hits_outside_lexical_corpus_are_interned(self):
+        retriever = MultilingualLegalRetriever.__new__(MultilingualLegalRetriever)
+        retriever.embedding_service = self._FakeEmbeddingService()
+        retriever.collection = self._FakeCollection([])
+        retriever._index_records([])
+
+        results = retriever.retrieve("theft of phone", k=2)["results"]
+
+        # BNS_308_0 (similarity 0.10) falls below the relevance threshold
+        assert [result["id"] for result in results] == ["BNS_74_0"]
+        assert results[0]["metadata"]["section_title"] == "Assault modesty"
+        assert results[0]["distance"] == pytest.approx(0.20)
+        assert results[0]["bm25_score"] == 0.0
+        # a second query reuses the interned positions
+        retriever.retrieve("assault at night", k=2)
+        assert len(retriever._interned_records) == 2
+
+    @pytest.mark.parametrize("method", ["probabilistic_or", "weighted", "rrf"])
+    def test_fusion_method_is_configurable(self, monkeypatch, method):
+        monkeypatch.setattr(retrieval.settings, "FUSION_METHOD", method)
+        monkeypatch.setattr(retrieval.settings, "MIN_RELEVANCE_SCORE", 0.0)
+        retriever = TestRetrieveMany()._retriever()
+
+        results = retriever.retrieve("theft of phone", k=4)["results"]
+
+        scores = [result["score"] for result in results]
+        assert scores == sorted(scores, reverse=True)
+        assert all(0.0 <= score <= 1.0 for score in scores)
+        assert {"id", "document", "metadata", "distance", "vector_score", "bm25_score"} <= set(results[0].keys())
+
+
+# ─── result objects ──────────────────────────────────────────────────────────
+
+
+class TestRetrievalResult:
+    def _results(self):
+        lookups, prefetches = [], []
+        records = {
+            3: {"id": "BNS_303_0", "document": "BNS Section 303: theft", "metadata": {"section_number": "303"}},
+            7: {"id": "BNS_74_0", "document": "BNS Section 74: assault", "metadata": {"section_number": "74"}},
+        }
+
+        def _resolve(position):
+            lookups.append(position)
+            return records[position]
+
+        shared = retrieval._ResultRecords(_resolve, lambda positions: prefetches.append(list(positions)), np.array([3, 7]))
+        results = [
+            retrieval.RetrievalResult(3, "BNS_303_0", 0.9, 0.8, 0.5, 0.2, shared),
+            retrieval.RetrievalResult(7, "BNS_74_0", 0.75, 0.75, 0.0, 0.25, shared),
+        ]
+        return results, lookups, prefetches
+
+    def test_document_and_metadata_resolve_lazily_in_one_batch(self):
+        results, lookups, prefetches = self._results()
+        assert results[0].id == "BNS_303_0" and results[0].score == 0.9
+        assert lookups == [] and prefetches == []
+
+        assert results[1].document == "BNS Section 74: assault"
+        assert results[0].metadata == {"section_number": "303"}
+        assert prefetches == [[3, 7]]
+        assert lookups == [7, 3]
+
+    def test_read_only_mapping_access(self):
+        result = self._results()[0][0]
+        assert result["document"] == "BNS Section 303: theft"
+        assert result.get("metadata") == {"section_number": "303"}
+        assert result.get("missing", "fallback") == "fallback"
+        with pytest.raises(KeyError):
+            result["position"]
+        assert result.to_dict()["distance"] == 0.2
+        assert result == result.to_dict()
+        assert not hasattr(result, "__dict__")
+
+    def test_heavy_metadata_is_dropped_when_loading_records(self):
+        collection = MagicMock()
+        collection.get.return_value = {
+            "ids": ["BNS_303_0"],
+            "documents": ["BNS Section 303: theft"],
+            "metadatas": [{"section_number": "303", "full_text": "entire section text"}],
+        }
+        retriever = MultilingualLegalRetriever.__new__(MultilingualLegalRetriever)
+        retriever.collection = collection
+        assert retriever._load_search_records()[0]["metadata"] == {"section_number": "303"}
+
+
+# ─── batched retrieval ───────────────────────────────────────────────────────
+
+
+class TestRetrieveMany:
+    RECORDS = [
+        {"id": "BNS_74_0", "document": "BNS Section 74: assault modesty and harassment of a woman",
+         "metadata": {"section_number": "74"}},
+        {"id": "BNS_303_0", "document": "BNS Section 303: theft of movable property",
+         "metadata": {"section_number": "303"}},
+        {"id": "BNS_308_0", "document": "BNS Section 308: extortion and intimidation",
+         "metadata": {"section_number": "308"}},
+        {"id": "BNS_329_0", "document": "BNS Section 329: criminal trespass and house trespass",
+         "metadata": {"section_number": "329"}},
+    ]
+    QUERIES = ["theft of phone", "!!!", "someone entered my house", "extortion of money by threat"]
+
+    class _FakeEmbeddingService:
+        def __init__(self):
+            self.batches = []
+
+        def _vector(self, query):
+            return [float(len(query) % 7), float(len(query.split())), 1.0]
+
+        def embed_query(self, query):
+            return self._vector(query)
+
+        def embed_queries(self, queries):
+            self.batches.append(list(queries))
+            return [self._vector(query) for query in queries]
+
+    class _FakeCollection:
+        def __init__(self, records):
+            self.records = records
+            self.calls = 0
+
+        def query(self, query_embeddings, n_results, include):
+            self.calls += 1
+            rows = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+            for embedding in query_embeddings:
+                # rotate the corpus by the embedding so every query gets a different ranking
+                offset = int(embedding[0]) % len(self.records)
+                ranked = self.records[offset:] + self.records[:offset]
+                rows["ids"].append([r["id"] for r in ranked])
+                rows["documents"].append([r["document"] for r in ranked])
+                rows["metadatas"].append([r["metadata"] for r in ranked])
+                rows["distances"].append([0.15 + 0.1 * i for i in range(len(ranked))])
+            return rows
+
+    def _retriever(self):
+        retriever = MultilingualLegalRetriever.__new__(MultilingualLegalRetriever)
+        retriever.embedding_service = self._FakeEmbeddingService()
+        retriever.collection = self._FakeCollection(self.RECORDS)
+        retriever._index_records(self.RECORDS)
+        return retriever
+
+    def test_matches_single_query_results(self):
+        single = self._retriever()
+        expected = [single.retrieve(query, k=2) for query in self.QUERIES]
+        assert self._retriever().retrieve_many(self.QUERIES, k=2) == expected
+
+    def test_matches_single_query_results_on_random_queries(self, monkeypatch):
+        monkeypatch.setattr(retrieval.settings, "MIN_RELEVANCE_SCORE", 0.0)
+        rng = np.random.default_rng(3)
+        vocabulary = [f"w{index}" for index in range(40)]
+        records = [
+            {"id": f"BNS_{index}_0", "document": " ".join(rng.choice(vocabulary, size=rng.integers(3, 20))),
+             "metadata": {"section_number": str(index)}}
+            for index in range(300)
+        ]
+        queries = [" ".join(rng.choice(vocabulary, size=rng.integers(1, 6))) for _ in range(300)]
+
+        def _retriever():
+            retriever = MultilingualLegalRetriever.__new__(MultilingualLegalRetriever)
+            retriever.embedding_service = self._FakeEmbeddingService()
+            retriever.collection = self._FakeCollection(records)
+            retriever._index_records(records)
+            return retriever
+
+        single = _retriever()
+        for k in (1, 3, 10):
+            expected = [single.retrieve(query, k=k) for query in queries]
+            assert _retriever().retrieve_many(queries, k=k) == expected
+
+    def test_issues_one_embedding_batch_and_one_vector_query(self):
+        retriever = self._retriever()
+        retriever.retrieve_many(self.QUERIES, k=2)
+        assert retriever.embedding_service.batches == [
+            ["theft of phone", "!!!", "someone entered my house", "extortion of money by threat"]
+        ]
+        assert retriever.collection.calls == 1
+
+    def test_rejects_non_english_query(self):
+        with pytest.raises(ValueError, match="English"):
+            self._retriever().retrieve_many(["theft", "मेरे घर में चोरी हुई"])
+
+
+# ─── metadata filters ────────────────────────────────────────────────────────
+
+
+class TestFilterPushDown:
+    class _FilteringCollection(TestRetrieveMany._FakeCollection):
+        def __init__(self, records):
+            super().__init__(records)
+            self.where_clauses = []
+
+        def query(self, query_embeddings, n_results, include, where=None):
+            self.where_clauses.append(where)
+            sections = set(where["section_number"]["$in"]) if where else None
+            full = self.records
+            self.records = [r for r in full if sections is None or r["metadata"]["section_number"] in sections]
+            try:
+                return super().query(query_embeddings, n_results, include)
+            finally:
+                self.records = full
+
+    def _retriever(self):
+        retriever = TestRetrieveMany()._retriever()
+        retriever.collection = self._FilteringCollection(TestRetrieveMany.RECORDS)
+        retriever.embedding_service = MagicMock(wraps=retriever.embedding_service)
+        return retriever
+
+    def _sections(self, payload):
+        return [result.metadata["section_number"] for result in payload["results"]]
+
+    def test_filter_reaches_chroma_and_bm25(self, monkeypatch):
+        monkeypatch.setattr(retrieval.settings, "MIN_RELEVANCE_SCORE", 0.0)
+        retriever = self._retriever()
+
+        payload = retriever.retrieve("theft of property", k=4, filters={"section_number": {"$gte": 300, "$lte": 310}})
+
+        assert retriever.collection.where_clauses == [{"section_number": {"$in": ["303", "308"]}}]
+        assert sorted(self._sections(payload)) == ["303", "308"]
+
+    def test_bm25_postings_are_masked(self):
+        retriever = self._retriever()
+        allowed = retriever._filter_scope(retrieval.MetadataFilter.parse({"section_number": "74"}))[0]
+        positions, _ = retriever._collect_bm25_candidates("theft property", 4, np.zeros(0, dtype=np.int64), allowed=allowed)
+        assert positions.size == 0
+
+    def test_filters_are_part_of_the_cache_key(self):
+        retriever = self._retriever()
+        retriever.retrieve("theft of property", k=2)
+        retriever.retrieve("theft of property", k=2, filters={"section_number": ["303", "74"]})
+        retriever.retrieve("theft of property", k=2, filters={"section_number": ["74", "303"]})
+        assert retriever.embedding_service.embed_query.call_count == 2
+
+    def test_filter_matching_nothing_skips_the_pipeline(self):
+        retriever = self._retriever()
+        payload = retriever.retrieve("theft of property", k=2, filters={"act_name": "BSA"})
+        assert payload["results"] == []
+        retriever.embedding_service.embed_query.assert_not_called()
+        assert retriever.collection.where_clauses == []
+
+    def test_retrieve_many_applies_filter_to_every_query(self, monkeypatch):
+        monkeypatch.setattr(retrieval.settings, "MIN_RELEVANCE_SCORE", 0.0)
+        retriever = self._retriever()
+        payloads = retriever.retrieve_many(["theft of phone", "house trespass"], k=4, filters={"section_number": "329"})
+        assert [self._sections(payload) for payload in payloads] == [["329"], ["329"]]
+
+    def test_flat_backend_masks_rows(self, monkeypatch):
+        monkeypatch.setattr(retrieval.settings, "MIN_RELEVANCE_SCORE", 0.0)
+        retriever = TestFlatVectorBackend()._retriever()
+        payload = retriever.retrieve("theft of phone", k=4, filters={"section_number": ["74", "308"]})
+        retriever.collection.query.assert_not_called()
+        assert sorted(self._sections(payload)) == ["308", "74"]
+
+    def test_snapshot_without_columns_fetches_metadata_once(self):
+        retriever = self._retriever()
+        collection = MagicMock()
+        collection.get.return_value = {
+            "ids": [r["id"] for r in TestRetrieveMany.RECORDS],
+            "metadatas": [r["metadata"] for r in TestRetrieveMany.RECORDS],
+        }
+        retriever._index_records(retrieval._CollectionRecords(collection, [r["id"] for r in TestRetrieveMany.RECORDS]),
+                                 retriever._bm25_index)
+        retriever.collection = collection
+
+        for section in ("74", "303"):
+            retriever._filter_scope(retrieval.MetadataFilter.parse({"section_number": section}))
+
+        collection.get.assert_called_once_with(ids=[r["id"] for r in TestRetrieveMany.RECORDS], include=["metadatas"])
+
+
+# ─── section lookup route ────────────────────────────────────────────────────
+
+
+class TestSectionLookupRoute:
+    def _retriever(self):
+        retriever = TestRetrieveMany()._retriever()
+        retriever.embedding_service = MagicMock(wraps=retriever.embedding_service)
+        retriever.collection = MagicMock(wraps=retriever.collection)
+        return retriever
+
+    def test_section_reference_skips_embedding_and_vector_search(self):
+        retriever = self._retriever()
+        timings = {}
+        payload = retriever.retrieve("Section 303", k=3, timings=timings)
+
+        assert [result.id for result in payload["results"]] == ["BNS_303_0"]
+        assert payload["results"][0].score == 1.0
+        assert payload["results"][0]["document"].startswith("BNS Section 303")
+        assert list(timings) == ["section_lookup"]
+        retriever.embedding_service.embed_query.assert_not_called()
+        retriever.collection.query.assert_not_called()
+
+    def test_other_queries_fall_back_to_hybrid_search(self):
+        retriever = self._retriever()
+        retriever.retrieve("section 999", k=2)
+        retriever.retrieve("theft of phone", k=2)
+        assert retriever.embedding_service.embed_query.call_count == 2
+
+    def test_filters_apply_to_lookups(self):
+        retriever = TestFilterPushDown()._retriever()
+        payload = retriever.retrieve("section 303", k=2, filters={"section_number": "74"})
+        assert all(result.id != "BNS_303_0" for result in payload["results"])
+        retriever.embedding_service.embed_query.assert_called_once()
+
+    def test_can_be_disabled(self, monkeypatch):
+        monkeypatch.setattr(retrieval.settings, "SECTION_LOOKUP_ENABLED", False)
+        retriever = self._retriever()
+        retriever.retrieve("section 303", k=2)
+        retriever.embedding_service.embed_query.assert_called_once()
+
+    def test_retrieve_many_routes_each_query(self):
+        retriever = self._retriever()
+        payloads = retriever.retrieve_many(["section 329", "theft of phone"], k=2)
+        assert [result.id for result in payloads[0]["results"]] == ["BNS_329_0"]
+        retriever.embedding_service.embed_queries.assert_called_once_with(["theft of phone"])
+
+
+# ─── concurrent branches ─────────────────────────────────────────────────────
+
+
+class TestRetrieveAsync:
+    class _SlowEmbeddingService(TestRetrieveMany._FakeEmbeddingService):
+        def __init__(self, delay):
+            super().__init__()
+            self.delay = delay
+            self.threads = set()
+
+        def embed_query(self, query):
+            self.threads.add(threading.current_thread().name)
+            time.sleep(self.delay)
+            return super().embed_query(query)
+
+    class _SlowBM25:
+        def __init__(self, index, delay):
+            self.index = index
+            self.delay = delay
+
+        def top_k(self, *args):
+            time.sleep(self.delay)
+            return self.index.top_k(*args)
+
+        def __getattr__(self, name):
+            return getattr(self.index, name)
+
+    def _retriever(self, dense_delay=0.0, lexical_delay=0.0):
+        retriever = TestRetrieveMany()._retriever()
+        retriever.embedding_service = self._SlowEmbeddingService(dense_delay)
+        retriever._bm25_index = self._SlowBM25(retriever._bm25_index, lexical_delay)
+        return retriever
+
+    def test_matches_sequential_retrieve(self):
+        expected = [TestRetrieveMany()._retriever().retrieve(q, k=2) for q in TestRetrieveMany.QUERIES]
+        retriever = self._retriever()
+        actual = [asyncio.run(retriever.retrieve_async(q, k=2)) for q in TestRetrieveMany.QUERIES]
+        assert actual == expected
+        assert all(name.startswith("retrieval-branch") for name in retriever.embedding_service.threads)
+
+    def test_branches_overlap(self):
+        retriever = self._retriever(dense_delay=0.2, lexical_delay=0.2)
+        timings = {}
+        started = time.perf_counter()
+        asyncio.run(retriever.retrieve_async("theft of phone", k=2, timings=timings))
+        assert time.perf_counter() - started < 0.35
+        assert {"embedding", "vector_query", "bm25", "merge"} <= set(timings)
+
+    def test_slow_dense_branch_degrades_to_bm25_only(self, monkeypatch):
+        monkeypatch.setattr(retrieval.settings, "RETRIEVAL_DENSE_TIMEOUT_MS", 50)
+        monkeypatch.setattr(retrieval.settings, "MIN_RELEVANCE_SCORE", 0.0)
+        retriever = self._retriever(dense_delay=0.3)
+        timings = {}
+
+        payload = asyncio.run(retriever.retrieve_async("theft property", k=2, timings=timings))
+
+        assert [result.id for result in payload["results"]] == ["BNS_303_0"]
+        assert payload["results"][0].vector_score == 0.0 and payload["results"][0].distance is None
+        assert "embedding" not in timings
+        assert retriever.cache_stats()["size"] == 0
+
+    def test_failing_dense_branch_degrades_to_bm25_only(self, monkeypatch):
+        monkeypatch.setattr(retrieval.settings, "MIN_RELEVANCE_SCORE", 0.0)
+        retriever = self._retriever()
+        retriever.embedding_service.embed_query = MagicMock(side_effect=ConnectionError("embedding server down"))
+
+        payload = asyncio.run(retriever.retrieve_async("theft property", k=2))
+
+        assert [result.id for result in payload["results"]] == ["BNS_303_0"]
+        assert payload["results"][0].distance is None
+        assert retriever.cache_stats()["size"] == 0
+
+    def test_slow_lexical_branch_degrades_to_vector_only(self, monkeypatch):
+        monkeypatch.setattr(retrieval.settings, "RETRIEVAL_LEXICAL_TIMEOUT_MS", 50)
+        monkeypatch.setattr(retrieval.settings, "MIN_RELEVANCE_SCORE", 0.0)
+        retriever = self._retriever(lexical_delay=0.3)
+
+        payload = asyncio.run(retriever.retrieve_async("theft of property", k=2))
+
+        assert payload["results"] and all(result.bm25_score == 0.0 for result in payload["results"])
+
+    def test_section_lookup_and_cache_short_circuit(self):
+        retriever = self._retriever()
+        asyncio.run(retriever.retrieve_async("section 303", k=2))
+        asyncio.run(retriever.retrieve_async("theft of phone", k=2))
+        asyncio.run(retriever.retrieve_async("theft  of phone", k=2))
+        assert retriever.cache_stats()["hits"] == 1
+        assert retriever.embedding_service.threads
+
+    def test_no_blocking_work_on_the_event_loop(self, monkeypatch):
+        monkeypatch.setattr(retrieval.settings, "MIN_RELEVANCE_SCORE", 0.0)
+        threads = []
+
+        def _recorded(method):
+            def wrapper(*args, **kwargs):
+                threads.append((method.__name__, threading.get_ident()))
+                return method(*args, **kwargs)
+            return wrapper
+
+        class _SnapshotCollection(TestFilterPushDown._FilteringCollection):
+            def get(self, ids=None, include=None):
+                threads.append(("get", threading.get_ident()))
+                selected = [record for record in self.records if ids is None or record["id"] in ids]
+                return {
+                    "ids": [record["id"] for record in selected],
+                    "documents": [record["document"] for record in selected],
+                    "metadatas": [record["metadata"] for record in selected],
+                }
+
+        # Snapshot-backed, with no saved columns or section index: filters,
+        # section lookups and result documents all have to reach the collection.
+        retriever = self._retriever()
+        retriever.collection = _SnapshotCollection(TestRetrieveMany.RECORDS)
+        record_ids = [record["id"] for record in TestRetrieveMany.RECORDS]
+        retriever._index_records(
+            retrieval._CollectionRecords(retriever.collection, record_ids), retriever._bm25_index.index
+        )
+        for name in ("_filter_scope", "_lookup_sections", "_collect_bm25_candidates", "_build_payload"):
+            setattr(retriever, name, _recorded(getattr(retriever, name)))
+
+        async def _query(query, filters=None):
+            payload = await retriever.retrieve_async(query, k=2, filters=filters)
+            return threading.get_ident(), [result["document"] for result in payload["results"]]
+
+        for query, filters in (("theft of phone", {"section_number": ["303", "329"]}), ("section 303", None)):
+            loop_thread, documents = asyncio.run(_query(query, filters))
+            assert documents
+        assert {name for name, _ in threads} == {
+            "get", "_filter_scope", "_lookup_sections", "_collect_bm25_candidates", "_build_payload"
+        }
+        assert all(thread != loop_thread for _, thread in threads)
+
+
+# ─── cross-encoder rerank ────────────────────────────────────────────────────
+
+class TestRerankStage:
+    class _PreferDocument:
+        """Fake cross-encoder that scores one document above everything else."""
+
+        def __init__(self, preferred, delay=0.0):
+            self.preferred = preferred
+            self.delay = delay
+
+        def predict(self, pairs, batch_size, show_progress_bar):
+            time.sleep(self.delay)
+            return [1.0 if self.preferred in document else 0.0 for _, document in pairs]
+
+    def _retriever(self, model, budget_ms=1000):
+        retriever = TestRetrieveMany()._retriever()
+        retriever._reranker = CrossEncoderReranker("fake", budget_ms, batch_size=1)
+        retriever._reranker._model = model
+        return retriever
+
+    def test_reranks_a_wider_window_then_cuts_to_k(self, monkeypatch):
+        monkeypatch.setattr(retrieval.settings, "MIN_RELEVANCE_SCORE", 0.0)
+        monkeypatch.setattr(retrieval.settings, "RERANK_TOP_N", 4)
+        fused = TestRetrieveMany()._retriever().retrieve("theft of phone", k=4)["results"]
+        last = fused[-1]
+
+        results = self._retriever(self._PreferDocument(last.document)).retrieve("theft of phone", k=1)["results"]
+
+        assert [result.id for result in results] == [last.id]
+        assert results[0].rerank_score == 1.0
+        assert results[0]["score"] == pytest.approx(last.score)
+
+    def test_budget_overrun_keeps_fused_order(self, monkeypatch):
+        monkeypatch.setattr(retrieval.settings, "MIN_RELEVANCE_SCORE", 0.0)
+        expected = TestRetrieveMany()._retriever().retrieve("theft of phone", k=2)["results"]
+        retriever = self._retriever(self._PreferDocument("trespass", delay=0.05), budget_ms=10)
+
+        results = retriever.retrieve("theft of phone", k=2)["results"]
+
+        assert [result.id for result in results] == [result.id for result in expected]
+        assert all(result.rerank_score is None for result in results)
+
+    def test_budget_overrun_is_not_cached(self, monkeypatch):
+        monkeypatch.setattr(retrieval.settings, "MIN_RELEVANCE_SCORE", 0.0)
+        retriever = self._retriever(self._PreferDocument("trespass", delay=0.05), budget_ms=10)
+
+        retriever.retrieve("theft of phone", k=2)
+        retriever.retrieve_many(["theft of phone"], k=2)
+
+        assert retriever.cache_stats()["size"] == 0
+
+    def test_completed_rerank_is_cached(self, monkeypatch):
+        monkeypatch.setattr(retrieval.settings, "MIN_RELEVANCE_SCORE", 0.0)
+        retriever = self._retriever(self._PreferDocument("trespass"))
+        retriever.retrieve("theft of phone", k=2)
+        assert retriever.cache_stats()["size"] == 1
+
+    def test_async_rerank_runs_off_the_event_loop(self, monkeypatch):
+        monkeypatch.setattr(retrieval.settings, "MIN_RELEVANCE_SCORE", 0.0)
+        model = self._PreferDocument("trespass")
+        threads = []
+        predict = model.predict
+        model.predict = lambda *args, **kwargs: threads.append(threading.get_ident()) or predict(*args, **kwargs)
+        retriever = self._retriever(model)
+
+        async def _query():
+            await retriever.retrieve_async("theft of phone", k=2)
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(_query())
+        assert threads and loop_thread not in threads
+
+    def test_reranker_cache_is_reset_with_the_index(self):
+        retriever = self._retriever(self._PreferDocument("theft"))
+        retriever.retrieve("theft of phone", k=2)
+        assert retriever._reranker._cache
+
+        retriever._index_records(TestRetrieveMany.RECORDS)
+        assert not retriever._reranker._cache
+
+
+# ─── flat vector backend ─────────────────────────────────────────────────────
+
+
+class TestFlatVectorBackend:
+    def _retriever(self):
+        from app.services.vector_index import FlatVectorIndex
+        retriever = TestRetrieveMany()._retriever()
+        retriever.collection = MagicMock()
+        embeddings = np.eye(4, 3, dtype=np.float32) + 0.01
+        # the flat index may list records in a different order than the retriever
+        retriever._set_vector_index(FlatVectorIndex(embeddings), ["BNS_329_0", "BNS_74_0", "BNS_303_0", "BNS_308_0"])
+        return retriever
+
+    def test_vector_search_bypasses_chroma(self):
+        retriever = self._retriever()
+        positions, similarities = retriever._collect_vector_candidates([1.0, 0.0, 0.0], k=2)
+
+        retriever.collection.query.assert_not_called()
+        assert retriever._record(positions[0])["id"] == "BNS_329_0"
+        assert retriever._record(positions[0])["metadata"] == {"section_number": "329"}
+        assert similarities.tolist() == sorted(similarities.tolist(), reverse=True)
+
+    def test_retrieve_many_uses_one_matrix_search(self):
+        retriever = self._retriever()
+        payloads = retriever.retrieve_many(["theft of phone", "house trespass"], k=2)
+        retriever.collection.query.assert_not_called()
+        assert all(payload["results"] for payload in payloads)
+
+
+# ─── result cache ────────────────────────────────────────────────────────────
+
+
+class TestResultCache:
+    def _retriever(self):
+        retriever = TestRetrieveMany()._retriever()
+        retriever.embedding_service = MagicMock(wraps=retriever.embedding_service)
+        return retriever
+
+    def test_repeated_normalized_query_skips_pipeline(self):
+        retriever = self._retriever()
+        first = retriever.retrieve("theft of phone", k=2)
+        second = retriever.retrieve("  theft   of phone ", k=2)
+
+        assert retriever.embedding_service.embed_query.call_count == 1
+        assert second["results"] == first["results"]
+        assert second["query"] == "  theft   of phone "
+        stats = retriever.cache_stats()
+        assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+
+    def test_cached_results_are_read_only_and_lists_are_copies(self):
+        retriever = self._retriever()
+        results = retriever.retrieve("theft of phone", k=2)["results"]
+        with pytest.raises(TypeError):
+            results[0]["score"] = -1.0
+        results.clear()
+        assert len(retriever.retrieve("theft of phone", k=2)["results"]) == 2
+
+    def test_key_includes_k_threshold_fusion_and_index_version(self, monkeypatch):
+        retriever = self._retriever()
+        retriever.retrieve("theft of phone", k=2)
+        retriever.retrieve("theft of phone", k=3)
+        monkeypatch.setattr(retrieval.settings, "MIN_RELEVANCE_SCORE", 0.1)
+        retriever.retrieve("theft of phone", k=2)
+        monkeypatch.setattr(retrieval.settings, "FUSION_METHOD", "rrf")
+        retriever.retrieve("theft of phone", k=2)
+        retriever._index_version = "reingested"
+        retriever.retrieve("theft of phone", k=2)
+
+        assert retriever.embedding_service.embed_query.call_count == 5
+
+    def test_reindexing_starts_a_fresh_cache(self):
+        retriever = self._retriever()
+        retriever.retrieve("theft of phone", k=2)
+        retriever._index_records(TestRetrieveMany.RECORDS, index_version="v2")
+        assert retriever.cache_stats() == {
+            "index_version": "v2", "size": 0, "max_entries": retriever._result_cache._max_entries,
+            "hits": 0, "misses": 0, "evictions": 0, "expirations": 0,
+        }
+
+    def test_use_cache_false_bypasses_cache(self):
+        retriever = self._retriever()
+        retriever.retrieve("theft of phone", k=2, use_cache=False)
+        retriever.retrieve("theft of phone", k=2, use_cache=False)
+        assert retriever.embedding_service.embed_query.call_count == 2
+        assert retriever.cache_stats()["size"] == 0
+
+    def test_retrieve_many_serves_cached_queries(self):
+        retriever = self._retriever()
+        retriever.retrieve("theft of phone", k=2)
+        retriever.retrieve_many(["theft of phone", "extortion of money by threat"], k=2)
+        retriever.embedding_service.embed_queries.assert_called_once_with(["extortion of money by threat"])
+
+    def test_lru_eviction_and_ttl_expiry(self, monkeypatch):
+        cache = retrieval._ResultCache(max_entries=2, ttl_seconds=10)
+        clock = [100.0]
+        monkeypatch.setattr(retrieval.time, "monotonic", lambda: clock[0])
+        cache.set(("a",), [{"id": "a"}])
+        cache.set(("b",), [{"id": "b"}])
+        assert cache.get(("a",)) == [{"id": "a"}]
+        cache.set(("c",), [{"id": "c"}])
+
+        assert cache.get(("b",)) is None
+        clock[0] += 11
+        assert cache.get(("a",)) is None
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["expirations"] == 1
+
+    def test_zero_size_disables_cache(self):
+        cache = retrieval._ResultCache(max_entries=0, ttl_seconds=0)
+        cache.set(("a",), [{"id": "a"}])
+        assert cache.get(("a",)) is None
+
+
+# ─── evaluation ──────────────────────────────────────────────────────────────
+
+
+class TestEvaluateTopK:
+    SAMPLES = [
+        {"query": "theft of phone", "expected_section": "303"},
+        {"query": "someone entered my house", "expected_sections": ["329", "999"]},
+        {"query": "extortion of money by threat", "expected_section": "63"},
+    ]
+
+    def _retriever(self):
+        return TestRetrieveMany()._retriever()
+
+    def test_reports_accuracy_recall_and_latency(self):
+        report = self._retriever().evaluate_top_k(self.SAMPLES, k=2)
+
+        assert report["total"] == 3
+        assert [detail["hit"] for detail in report["details"]] == [True, True, False]
+        assert report["accuracy"] == pytest.approx(2 / 3)
+        assert report["recall_at_k"] == pytest.approx((1.0 + 0.5 + 0.0) / 3)
+        assert set(report["latency_ms"]) == {"p50", "p95", "p99", "mean", "max"}
+        assert set(report["stage_latency_ms"]) == {"embedding", "vector_query", "bm25", "merge"}
+        assert report["throughput_qps"] > 0
+        for detail in report["details"]:
+            assert set(detail["stage_ms"]) == {"embedding", "vector_query", "bm25", "merge"}
+
+    def test_concurrent_run_preserves_sample_order(self):
+        retriever = self._retriever()
+        serial = retriever.evaluate_top_k(self.SAMPLES, k=2)
+        concurrent = retriever.evaluate_top_k(self.SAMPLES, k=2, max_workers=3)
+
+        assert concurrent["max_workers"] == 3
+        assert [d["query"] for d in concurrent["details"]] == [d["query"] for d in serial["details"]]
+        assert [d["hit"] for d in concurrent["details"]] == [d["hit"] for d in serial["details"]]
+
+    def test_report_is_json_serialisable(self):
+        import json
+        json.dumps(self._retriever().evaluate_top_k(self.SAMPLES, k=2))
+
+    def test_rejects_non_english_samples(self):
+        with pytest.raises(ValueError, match="English"):
+            self._retriever().evaluate_top_k([{"query": "मेरे घर में चोरी हुई", "expected_section": "303"}])
+
+
+# ─── BM25 snapshot loading ───────────────────────────────────────────────────
+
+
+class TestLexicalSnapshot:
+    RECORDS = [
+        {"id": "BNS_74_0", "document": "BNS Section 74: assault modesty", "metadata": {"section_number": "74"}},
+        {"id": "BNS_303_0", "document": "BNS Section 303: theft of movable property", "metadata": {"section_number": "303"}},
+        {"id": "BNS_308_0", "document": "BNS Section 308: extortion", "metadata": {"section_number": "308"}},
+    ]
+
+    def _make_retriever(self, monkeypatch, tmp_path, collection_version, expansions=None):
+        records = {record["id"]: record for record in self.RECORDS}
+
+        def _get(ids=None, include=None):
+            selected = [records[item_id] for item_id in (ids or records)]
+            return {
+                "ids": [record["id"] for record in selected],
+                "documents": [record["document"] for record in selected],
+                "metadatas": [record["metadata"] for record in selected],
+            }
+
+        collection = MagicMock()
+        collection.metadata = {"hnsw:space": "cosine", "index_version": collection_version}
+        collection.get.side_effect = _get
+        client = MagicMock()
+        client.get_or_create_collection.return_value = collection
+
+        BM25Index(self.RECORDS).save(str(tmp_path), index_version="v1", record_ids=list(records))
+        if expansions is not None:
+            expansions.save(str(tmp_path), "v1")
+        monkeypatch.setitem(sys.modules, "chromadb", MagicMock(PersistentClient=lambda path: client))
+        monkeypatch.setattr(retrieval, "InLegalBERTEmbeddingService", MagicMock)
+        monkeypatch.setattr(retrieval.settings, "LEXICAL_INDEX_DIR", str(tmp_path))
+        return MultilingualLegalRetriever(), collection
+
+    def test_matching_snapshot_skips_full_corpus_load(self, monkeypatch, tmp_path):
+        retriever, collection = self._make_retriever(monkeypatch, tmp_path, "v1")
+
+        collection.get.assert_not_called()
+        assert isinstance(retriever._bm25_index.weights, np.memmap)
+
+        positions, _ = retriever._collect_bm25_candidates("theft", 1, np.zeros(0, dtype=np.int64))
+        assert positions.tolist() == [1]
+        collection.get.assert_not_called()
+
+        result = retriever._build_payload(
+            "theft", "theft", retrieval._no_hits(), (positions, np.ones(1)), k=1
+        )[0]["results"][0]
+        assert result.id == "BNS_303_0"
+        collection.get.assert_not_called()
+        assert result.metadata == {"section_number": "303"}
+        collection.get.assert_called_once_with(ids=["BNS_303_0"], include=["documents", "metadatas"])
+
+    def test_stale_snapshot_rebuilds_from_collection(self, monkeypatch, tmp_path):
+        retriever, collection = self._make_retriever(monkeypatch, tmp_path, "v2")
+
+        collection.get.assert_called_once_with(include=["documents", "metadatas"])
+        assert not isinstance(retriever._bm25_index.weights, np.memmap)
+        positions, _ = retriever._collect_bm25_candidates("extortion", 1, np.zeros(0, dtype=np.int64))
+        assert [retriever._record(position)["id"] for position in positions] == ["BNS_308_0"]
+
+    def test_attaches_query_expansions_saved_for_the_index(self, monkeypatch, tmp_path):
+        from app.services.query_expansion import QueryExpansions
+        expansions = QueryExpansions.from_sections(
+            [{"section_number": "303", "section_title": "Theft", "plain_language": "stealing"}]
+        )
+
+        retriever, _ = self._make_retriever(monkeypatch, tmp_path, "v1", expansions)
+
+        positions, _ = retriever._collect_bm25_candidates("stealing", 1, np.zeros(0, dtype=np.int64))
+        assert positions.tolist() == [1]
@@ -0,0 +1,57 @@
+"""
+Unit tests for backend.app.services.section_lookup
+"""
+import pytest
+
+from app.services.filters import MetadataColumns
+from app.services.section_lookup import SECTION_QUERY_PATTERN, SectionIndex
+
+
+COLUMNS = MetadataColumns.from_metadatas([
+    {"act_name": "BNS", "section_number": "303", "section_title": "Theft", "chunk_index": 1},
+    {"act_name": "BNS", "section_number": "74", "section_title": "Assault or criminal force to woman with intent to outrage her modesty", "chunk_index": 0},
+    {"act_name": "BNS", "section_number": "303", "section_title": "Theft", "chunk_index": 0},
+    {"act_name": "BNS", "section_number": "318(4)", "section_title": "Cheating", "chunk_index": 0},
+    {"act_name": "BNSS", "section_number": "74", "section_title": "Arrest without warrant", "chunk_index": 0},
+])
+
+
+class TestSectionQueryPattern:
+    @pytest.mark.parametrize("query", [
+        "section 303", "Section 303", "sec. 74", "S. 74", "u/s 329", "BNS 318(4)", "bns section 318 (4)",
+        "303 of the BNS", "303", "section 74.",
+    ])
+    def test_matches_section_references(self, query):
+        assert SECTION_QUERY_PATTERN.match(query)
+
+    @pytest.mark.parametrize("query", [
+        "someone stole my phone", "punishment under section 303", "section", "BNS", "303 rupees stolen",
+    ])
+    def test_ignores_free_text(self, query):
+        assert not SECTION_QUERY_PATTERN.match(query)
+
+
+class TestSectionIndex:
+    def test_section_number_returns_chunks_in_order(self):
+        assert SectionIndex(COLUMNS).lookup("section 303").tolist() == [2, 0]
+
+    def test_subsection_prefers_exact_then_falls_back_to_section(self):
+        index = SectionIndex(COLUMNS)
+        assert index.lookup("BNS 318(4)").tolist() == [3]
+        assert index.lookup("section 303(2)").tolist() == [2, 0]
+
+    def test_act_narrows_only_when_labelled(self):
+        index = SectionIndex(COLUMNS)
+        assert index.lookup("section 74").tolist() == [1, 4]
+        assert index.lookup("BNSS 74").tolist() == [4]
+        assert index.lookup("74 of the BNS").tolist() == [1]
+
+    def test_exact_title_lookup_is_normalised(self):
+        index = SectionIndex(COLUMNS)
+        assert index.lookup("  theft ").tolist() == [2, 0]
+        assert index.lookup("Assault or criminal force to woman, with intent to outrage her modesty").tolist() == [1]
+
+    def test_unknown_references_return_none(self):
+        index = SectionIndex(COLUMNS)
+        assert index.lookup("section 999") is None
+        assert index.lookup("my phone was stolen") is None
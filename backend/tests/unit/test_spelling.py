@@ -0,0 +1,58 @@
+"""
+Unit tests for backend.app.services.spelling
+"""
+import pytest
+
+from app.services.spelling import SymSpellIndex, allowed_distance, edit_distance
+
+
+TERMS = ["theft", "assault", "intimidation", "trespass", "house", "horse", "of"]
+
+
+class TestEditDistance:
+    @pytest.mark.parametrize("source,target,expected", [
+        ("theift", "theft", 1),
+        ("assult", "assault", 1),
+        ("hosue", "house", 1),
+        ("intimdiaton", "intimidation", 2),
+        ("theft", "theft", 0),
+    ])
+    def test_distance(self, source, target, expected):
+        assert edit_distance(source, target, 2) == expected
+
+    def test_beyond_limit_is_none(self):
+        assert edit_distance("threat", "theft", 1) is None
+        assert edit_distance("a", "abcd", 2) is None
+
+
+class TestAllowedDistance:
+    def test_depends_on_length(self):
+        assert allowed_distance("of", 2) == 0
+        assert allowed_distance("theft", 2) == 1
+        assert allowed_distance("intimidaton", 2) == 2
+        assert allowed_distance("intimidaton", 1) == 1
+
+    def test_numbers_are_never_corrected(self):
+        assert allowed_distance("3030", 2) == 0
+
+
+class TestSymSpellIndex:
+    def test_candidates_within_distance(self):
+        index = SymSpellIndex(TERMS)
+        assert index.candidates("theift") == [(0, 1)]
+        assert index.candidates("intimdiaton") == [(2, 2)]
+
+    def test_ambiguous_misspelling_returns_every_match(self):
+        index = SymSpellIndex(TERMS)
+        assert sorted(index.candidates("hose")) == [(4, 1), (5, 1)]
+
+    def test_no_candidates_for_short_or_distant_terms(self):
+        index = SymSpellIndex(TERMS)
+        assert index.candidates("off") == []
+        assert index.candidates("robbery") == []
+
+    def test_round_trip_from_arrays(self):
+        index = SymSpellIndex(TERMS)
+        arrays = {field: getattr(index, field) for field in ("delete_keys", "delete_indptr", "delete_terms")}
+        restored = SymSpellIndex.from_arrays(TERMS, 2, arrays)
+        assert restored.candidates("assult") == index.candidates("assult")
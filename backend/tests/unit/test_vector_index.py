@@ -0,0 +1,129 @@
+"""
+Unit tests for backend.app.services.vector_index
+"""
+import numpy as np
+import pytest
+
+from app.services.vector_index import FlatVectorIndex, fit_pca
+
+
+@pytest.fixture(scope="module")
+def embeddings():
+    rng = np.random.default_rng(11)
+    return rng.normal(size=(500, 32)).astype(np.float32)
+
+
+def _brute_force(embeddings, queries, n):
+    matrix = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    similarities = queries @ matrix.T
+    return np.argsort(-similarities, axis=1, kind="stable")[:, :n], similarities
+
+
+class TestFlatVectorIndex:
+    def test_exact_top_k_matches_brute_force(self, embeddings):
+        queries = embeddings[[3, 42, 499]] + 0.05
+        expected_rows, similarities = _brute_force(embeddings, queries, 10)
+
+        rows, scores = FlatVectorIndex(embeddings).search(queries, 10)
+
+        assert rows.tolist() == expected_rows.tolist()
+        np.testing.assert_allclose(scores, np.take_along_axis(similarities, expected_rows, axis=1), rtol=1e-5)
+
+    def test_single_query_vector_accepted(self, embeddings):
+        rows, scores = FlatVectorIndex(embeddings).search(embeddings[7], 1)
+        assert rows.tolist() == [[7]]
+        assert scores[0, 0] == pytest.approx(1.0, abs=1e-5)
+
+    def test_float16_storage_halves_memory_and_keeps_ranking(self, embeddings, monkeypatch):
+        from app.services import vector_index
+        monkeypatch.setattr(vector_index, "_UPCAST_BLOCK_ROWS", 64)
+        full = FlatVectorIndex(embeddings)
+        half = FlatVectorIndex(embeddings, dtype="float16")
+
+        assert half.nbytes * 2 == full.nbytes
+        queries = embeddings[[1, 2, 3]]
+        np.testing.assert_allclose(half.similarities(queries), full.similarities(queries), atol=2e-3)
+        assert half.search(queries, 1)[0].tolist() == [[1], [2], [3]]
+
+    def test_n_larger_than_corpus_returns_everything_sorted(self, embeddings):
+        rows, scores = FlatVectorIndex(embeddings[:5]).search(embeddings[0], 50)
+        assert sorted(rows[0].tolist()) == [0, 1, 2, 3, 4]
+        assert (np.diff(scores[0]) <= 0).all()
+
+    def test_allowed_bitmap_restricts_rows(self, embeddings):
+        allowed = np.zeros(len(embeddings), dtype=bool)
+        allowed[[5, 17, 230]] = True
+        rows, scores = FlatVectorIndex(embeddings).search(embeddings[[17, 0]], 10, allowed)
+
+        assert rows.shape == (2, 3)
+        assert set(rows[0].tolist()) == set(rows[1].tolist()) == {5, 17, 230}
+        assert rows[0, 0] == 17
+        assert np.isfinite(scores).all()
+
+    def test_rejects_unknown_dtype(self, embeddings):
+        with pytest.raises(ValueError):
+            FlatVectorIndex(embeddings, dtype="int4")
+
+    def test_snapshot_round_trip_and_version_check(self, embeddings, tmp_path):
+        ids = [f"chunk_{i}" for i in range(len(embeddings))]
+        FlatVectorIndex.save(str(tmp_path / "flat"), embeddings, index_version="v1", record_ids=ids)
+
+        loaded, loaded_ids = FlatVectorIndex.load(str(tmp_path / "flat"), "v1", dtype="float16")
+        assert loaded_ids == ids
+        assert loaded.matrix.dtype == np.float16
+        assert loaded.search(embeddings[9], 1)[0].tolist() == [[9]]
+        assert FlatVectorIndex.load(str(tmp_path / "flat"), "v2") is None
+        assert FlatVectorIndex.load(str(tmp_path / "missing"), "v1") is None
+
+
+class TestCompressedFlatVectorIndex:
+    def test_int8_uses_a_quarter_of_the_memory(self, embeddings):
+        full = FlatVectorIndex(embeddings)
+        quantized = FlatVectorIndex(embeddings, dtype="int8")
+
+        assert quantized.matrix.dtype == np.int8
+        assert quantized.matrix.nbytes * 4 == full.nbytes
+        np.testing.assert_allclose(quantized.similarities(embeddings[:3]), full.similarities(embeddings[:3]), atol=0.05)
+
+    @pytest.mark.parametrize("dtype", ["int8", "pca"])
+    def test_rescored_scores_are_exact(self, embeddings, dtype):
+        queries = embeddings[[3, 42, 499]] + 0.05
+        expected_rows, similarities = _brute_force(embeddings, queries, 5)
+
+        rows, scores = FlatVectorIndex(embeddings, dtype=dtype, pca_dimension=16, rescore_factor=8).search(queries, 5)
+
+        assert rows[:, 0].tolist() == [3, 42, 499]
+        np.testing.assert_allclose(scores, np.take_along_axis(similarities, rows, axis=1), rtol=1e-5)
+        recall = np.mean([len(set(got) & set(want)) / 5 for got, want in zip(rows.tolist(), expected_rows.tolist())])
+        assert recall >= 0.8
+
+    def test_pca_keeps_requested_components(self, embeddings):
+        index = FlatVectorIndex(embeddings, dtype="pca", pca_dimension=8)
+        assert index.matrix.shape == (500, 8)
+        assert index.components.shape == (32, 8)
+
+    def test_fit_pca_recovers_dominant_axis(self):
+        rng = np.random.default_rng(3)
+        matrix = np.outer(rng.normal(size=200), [3.0, 0.0, 0.0]) + rng.normal(scale=0.01, size=(200, 3))
+        _, components = fit_pca(matrix.astype(np.float32), 1)
+        assert abs(components[0, 0]) == pytest.approx(1.0, abs=1e-3)
+
+    def test_allowed_bitmap_applies_before_rescoring(self, embeddings):
+        allowed = np.zeros(len(embeddings), dtype=bool)
+        allowed[[5, 17, 230]] = True
+        rows, _ = FlatVectorIndex(embeddings, dtype="int8").search(embeddings[[0]], 10, allowed)
+        assert set(rows[0].tolist()) == {5, 17, 230}
+
+    def test_snapshot_keeps_full_precision_on_disk(self, embeddings, tmp_path):
+        ids = [f"chunk_{i}" for i in range(len(embeddings))]
+        FlatVectorIndex.save(str(tmp_path / "flat"), embeddings, index_version="v1", record_ids=ids, pca_dimension=8)
+        saved = np.load(str(tmp_path / "flat" / "projection.npz"))
+
+        # random data has no low-rank structure, so over-fetch generously
+        loaded, _ = FlatVectorIndex.load(str(tmp_path / "flat"), "v1", dtype="pca", pca_dimension=8, rescore_factor=50)
+
+        assert isinstance(loaded.full, np.memmap)
+        np.testing.assert_array_equal(loaded.components, saved["components"])
+        assert loaded.nbytes == loaded.matrix.nbytes + loaded.mean.nbytes + loaded.components.nbytes
+        assert loaded.search(embeddings[9], 1)[0].tolist() == [[9]]